@@ -4,7 +4,9 @@ let isLoading = false;
 let hasMore = GAME_CONFIG.hasNext;
 let currentFilters = {
     search: '',
-    sort: 'default'
+    sort: 'default',
+    min_price: '',
+    max_price: ''
 };
 
 // Функции для бокового меню
@@ -21,7 +23,9 @@ function applyFilters() {
 
     currentFilters = {
         search: searchValue,
-        sort: sortValue
+        sort: sortValue,
+        min_price: document.getElementById('minPriceInput').value,
+        max_price: document.getElementById('maxPriceInput').value
     };
 
     // Очищаем контейнер и загружаем заново с фильтрами
@@ -39,10 +43,14 @@ function applyFilters() {
 function resetFilters() {
     document.getElementById('searchInput').value = '';
     document.getElementById('sortSelect').value = 'default';
+    document.getElementById('minPriceInput').value = '';
+    document.getElementById('maxPriceInput').value = '';
 
     currentFilters = {
         search: '',
-        sort: 'default'
+        sort: 'default',
+        min_price: '',
+        max_price: ''
     };
 
     // Очищаем и загружаем заново
@@ -70,7 +78,9 @@ function loadMoreGames() {
     const params = new URLSearchParams({
         page: currentPage,
         search: currentFilters.search,
-        sort: currentFilters.sort
+        sort: currentFilters.sort,
+        min_price: currentFilters.min_price,
+        max_price: currentFilters.max_price
     });
 
     fetch(`${GAME_CONFIG.loadMoreUrl}?${params}`)
@@ -263,6 +263,9 @@ class SteamGames(models.Model):
     original_price = models.CharField(max_length=50)
     discount_percent = models.IntegerField()
     discount_amount = models.CharField(max_length=50, blank=True, null=True)
+    current_price_minor = models.IntegerField(blank=True, null=True)
+    original_price_minor = models.IntegerField(blank=True, null=True)
+    discount_amount_minor = models.IntegerField(blank=True, null=True)
     url = models.CharField(unique=True, max_length=500)
     image_url = models.TextField(blank=True, null=True)
     capsule_image = models.TextField(blank=True, null=True)
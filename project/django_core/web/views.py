@@ -2,30 +2,54 @@ from django.views.generic import TemplateView
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.db.models import Q
+from project.src.utils.prices import parse_price
 from .models import SteamGames
-import re
 
 
-def parse_price(price_str):
-    """Парсинг цен с запятыми и разными форматами"""
-    if not price_str:
-        return 0.0
+def parse_price_filter(value):
+    """Граница фильтра цены в рублях из GET-параметра ("1 299", "1299,50") -> копейки (None, если не задана)"""
+    return parse_price(value) if value else None
 
-    price_str = str(price_str).strip()
-    price_str = price_str.replace(',', '.')  # Заменяем запятые на точки
 
-    # Удаляем все символы кроме цифр и точки
-    clean_price = re.sub(r'[^\d.]', '', price_str)
+def filter_games(params):
+    """Фильтры, поиск и сортировка списка игр по GET-параметрам - все в БД"""
+    search = params.get('search', '')
+    sort = params.get('sort', 'default')
+    min_price = parse_price_filter(params.get('min_price'))
+    max_price = parse_price_filter(params.get('max_price'))
 
-    # Удаляем лишние точки (оставляем только первую)
-    parts = clean_price.split('.')
-    if len(parts) > 1:
-        clean_price = parts[0] + '.' + ''.join(parts[1:])
+    queryset = SteamGames.objects.filter(is_discounted=True)
 
-    try:
-        return float(clean_price) if clean_price else 0.0
-    except ValueError:
-        return 0.0
+    # Поиск
+    if search:
+        queryset = queryset.filter(
+            Q(title__icontains=search) |
+            Q(clean_title__icontains=search) |
+            Q(description__icontains=search) |
+            Q(short_description__icontains=search)
+        )
+
+    # Диапазон цен по числовой колонке (индекс is_discounted, current_price_minor, id)
+    if min_price is not None:
+        queryset = queryset.filter(current_price_minor__gte=min_price)
+    if max_price is not None:
+        queryset = queryset.filter(current_price_minor__lte=max_price)
+
+    if sort == 'price_low':
+        queryset = queryset.filter(current_price_minor__isnull=False).order_by('current_price_minor', 'id')
+    elif sort == 'price_high':
+        queryset = queryset.filter(current_price_minor__isnull=False).order_by('-current_price_minor', '-id')
+    elif sort == 'discount_high':
+        queryset = queryset.order_by('-discount_percent')
+    elif sort == 'discount_low':
+        queryset = queryset.order_by('discount_percent')
+    elif sort == 'rating_high':
+        queryset = queryset.order_by('-review_score', '-positive_reviews')
+    elif sort == 'rating_low':
+        queryset = queryset.order_by('review_score', 'positive_reviews')
+    # Для 'popularity' и 'default' - порядок из БД
+
+    return queryset
 
 
 class GameListView(TemplateView):
@@ -48,71 +72,16 @@ class GameListView(TemplateView):
         return context
 
     def get_filtered_queryset(self):
-        search = self.request.GET.get('search', '')
-        sort = self.request.GET.get('sort', 'default')
-
-        queryset = SteamGames.objects.filter(is_discounted=True)
-
-        # Поиск
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(clean_title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(short_description__icontains=search)
-            )
-
-        # Для сортировки по ценам - используем Python сортировку
-        # Для остальных случаев - сортируем в БД
-        if sort == 'discount_high':
-            queryset = queryset.order_by('-discount_percent')
-        elif sort == 'discount_low':
-            queryset = queryset.order_by('discount_percent')
-        elif sort == 'rating_high':
-            queryset = queryset.order_by('-review_score', '-positive_reviews')
-        elif sort == 'rating_low':
-            queryset = queryset.order_by('review_score', 'positive_reviews')
-        # Для 'price_low', 'price_high', 'popularity', 'default' - сортировка в Python
-
-        return queryset
+        return filter_games(self.request.GET)
 
 
 def load_more_games(request):
     page = int(request.GET.get('page', 1))
-    search = request.GET.get('search', '')
-    sort = request.GET.get('sort', 'default')
-
-    # Получаем базовый queryset
-    games = SteamGames.objects.filter(is_discounted=True)
-
-    # Поиск
-    if search:
-        games = games.filter(
-            Q(title__icontains=search) |
-            Q(clean_title__icontains=search) |
-            Q(description__icontains=search) |
-            Q(short_description__icontains=search)
-        )
-
-    # Конвертируем в список для сложной сортировки
-    games_list = list(games)
-
-    if sort == 'price_low':
-        games_list.sort(key=lambda x: parse_price(x.current_price))
-    elif sort == 'price_high':
-        games_list.sort(key=lambda x: parse_price(x.current_price), reverse=True)
-    elif sort == 'popularity':
-        # Не сортируем, оставляем исходный порядок
-        pass
-    elif sort == 'default':
-        # По умолчанию - тоже порядок из БД
-        pass
-    else:
-        # Для остальных сортировок уже отсортировано в БД
-        pass
+    # Сортировка и фильтры выполняются в БД, Paginator забирает только нужную страницу (LIMIT/OFFSET)
+    games = filter_games(request.GET)
 
     # Пагинация
-    paginator = Paginator(games_list, 12)
+    paginator = Paginator(games, 12)
     try:
         page_obj = paginator.get_page(page)
     except:
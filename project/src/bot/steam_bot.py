@@ -150,12 +150,12 @@ class SteamBot:
         try:
             # Выбор метода получения игр в зависимости от режима
             if game_mode == GameMode.POPULAR:
-                games = self.db_manager.get_most_popular_games(limit=settings.games_count.value)
-                total_count = self.db_manager.get_total_games_count()
+                games = await self.db_manager.get_most_popular_games_async(limit=settings.games_count.value)
+                total_count = await self.db_manager.get_total_games_count_async()
                 mode_name = "популярные"
             else:
-                games = self.db_manager.get_highest_discount_games(limit=settings.games_count.value)
-                total_count = self.db_manager.get_total_discounted_games_count()
+                games = await self.db_manager.get_highest_discount_games_async(limit=settings.games_count.value)
+                total_count = await self.db_manager.get_total_discounted_games_count_async()
                 mode_name = "со скидками"
 
             # Проверка наличия игр
@@ -188,7 +188,7 @@ class SteamBot:
 
         try:
             # Получаем категории с количеством игр
-            categories_with_count = self.db_manager.get_categories_with_count()
+            categories_with_count = await self.db_manager.get_categories_with_count_async()
 
             if not categories_with_count:
                 await message.answer(
@@ -246,12 +246,12 @@ class SteamBot:
 
         try:
             # Получаем игры по категории
-            games = self.db_manager.get_games_by_category(
+            games = await self.db_manager.get_games_by_category_async(
                 category_name,
                 limit=settings.games_count.value
             )
 
-            total_count = self.db_manager.get_games_count_by_category(category_name)
+            total_count = await self.db_manager.get_games_count_by_category_async(category_name)
 
             if not games:
                 await message.answer(
@@ -306,17 +306,17 @@ class SteamBot:
 
         try:
             if settings.pagination.game_mode == GameMode.POPULAR:
-                new_games = self.db_manager.get_most_popular_games(
+                new_games = await self.db_manager.get_most_popular_games_async(
                     offset=settings.pagination.offset,
                     limit=settings.games_count.value
                 )
             elif settings.pagination.game_mode == GameMode.DISCOUNTED:
-                new_games = self.db_manager.get_highest_discount_games(
+                new_games = await self.db_manager.get_highest_discount_games_async(
                     offset=settings.pagination.offset,
                     limit=settings.games_count.value
                 )
             elif settings.pagination.game_mode == GameMode.CATEGORY:
-                new_games = self.db_manager.get_games_by_category(
+                new_games = await self.db_manager.get_games_by_category_async(
                     settings.pagination.current_category,
                     offset=settings.pagination.offset,
                     limit=settings.games_count.value
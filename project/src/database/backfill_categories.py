@@ -0,0 +1,68 @@
+"""
+Переход на нормализованные категории: заполняет game_categories и game_category_association
+по JSON-колонке steam_games.categories и строит индекс для выборок по категории.
+Повторный запуск безопасен: связи каждой игры перезаписываются.
+
+Запуск: python -m project.src.database.backfill_categories [--batch 1000]
+"""
+import argparse
+import time
+
+from sqlalchemy import select, text
+
+from project.src.database.db_manager import DatabaseManager
+from project.src.database.models import Base, SteamGame, category_names
+
+
+def create_category_tables(db_manager: DatabaseManager):
+    """Таблицы категорий (если их нет) и индекс idx_category_game"""
+    Base.metadata.create_all(
+        db_manager.engine,
+        tables=[Base.metadata.tables['game_categories'], Base.metadata.tables['game_category_association']]
+    )
+    with db_manager.engine.begin() as connection:
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_category_game ON game_category_association (category_id, game_id)"
+        ))
+    print("📇 Индекс idx_category_game готов")
+
+
+def backfill_categories(db_manager: DatabaseManager, batch_size: int = 1000) -> int:
+    """Переносит категории игр из JSON в связи пачками по id; возвращает число обработанных игр"""
+    table = SteamGame.__table__
+    started = time.time()
+    processed = 0
+    last_id = 0
+    while True:
+        with db_manager.engine.connect() as connection:
+            rows = connection.execute(
+                select(table.c.id, table.c.categories)
+                .where(table.c.id > last_id)
+                .order_by(table.c.id).limit(batch_size)
+            ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        processed += db_manager.update_game_categories({row.id: category_names(row.categories) for row in rows})
+        print(f"   Обработано {processed} игр")
+
+    print(f"✅ Категории перенесены для {processed} игр за {time.time() - started:.1f} с, "
+          f"категорий: {len(db_manager.get_all_categories())}")
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заполнение таблиц категорий")
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    try:
+        create_category_tables(db_manager)
+        backfill_categories(db_manager, args.batch)
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Переход на числовые цены: добавляет колонки цен в копейках в steam_games, заполняет их
+для уже сохраненных игр по строковым ценам и строит индекс для сортировки и фильтров по цене.
+Повторный запуск безопасен: дозаполняются только строки с пустой current_price_minor.
+
+Запуск: python -m project.src.database.backfill_prices [--batch 1000]
+"""
+import argparse
+import time
+
+from sqlalchemy import bindparam, inspect, select, text, update
+
+from project.src.database.db_manager import DatabaseManager
+from project.src.database.models import SteamGame, price_columns_batch
+
+PRICE_COLUMNS = ('current_price_minor', 'original_price_minor', 'discount_amount_minor')
+
+
+def add_price_columns(db_manager: DatabaseManager):
+    """Добавляет недостающие колонки (create_all не меняет существующие таблицы)"""
+    existing = {column['name'] for column in inspect(db_manager.engine).get_columns('steam_games')}
+    with db_manager.engine.begin() as connection:
+        for column in PRICE_COLUMNS:
+            if column not in existing:
+                connection.execute(text(f"ALTER TABLE steam_games ADD COLUMN {column} INTEGER"))
+                print(f"➕ Добавлена колонка {column}")
+
+
+def create_price_indexes(db_manager: DatabaseManager):
+    """Индекс для сортировки и диапазона по цене вместо индекса по строке цены"""
+    with db_manager.engine.begin() as connection:
+        connection.execute(text("DROP INDEX IF EXISTS idx_price"))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_discounted_price "
+            "ON steam_games (is_discounted, current_price_minor, id)"
+        ))
+    print("📇 Индекс idx_discounted_price готов")
+
+
+def backfill_prices(db_manager: DatabaseManager, batch_size: int = 1000) -> int:
+    """Заполняет цены в копейках пачками по id; возвращает число обновленных строк"""
+    table = SteamGame.__table__
+    # updated_at оставляем как есть: данные игры не менялись
+    stmt = update(table).where(table.c.id == bindparam('row_id')).values(
+        **{column: bindparam(f'new_{column}') for column in PRICE_COLUMNS}, updated_at=table.c.updated_at
+    )
+
+    started = time.time()
+    updated = 0
+    last_id = 0
+    while True:
+        with db_manager.engine.begin() as connection:
+            rows = connection.execute(
+                select(table.c.id, table.c.current_price, table.c.original_price)
+                .where(table.c.id > last_id, table.c.current_price_minor.is_(None))
+                .order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            columns = price_columns_batch([(row.current_price, row.original_price) for row in rows])
+            connection.execute(stmt, [
+                {'row_id': row.id, **{f'new_{column}': value for column, value in row_columns.items()}}
+                for row, row_columns in zip(rows, columns)
+            ])
+        last_id = rows[-1].id
+        updated += len(rows)
+        print(f"   Обновлено {updated} строк")
+
+    print(f"✅ Цены в копейках заполнены для {updated} игр за {time.time() - started:.1f} с")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заполнение числовых колонок цен")
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    try:
+        add_price_columns(db_manager)
+        backfill_prices(db_manager, args.batch)
+        create_price_indexes(db_manager)
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Накладные расходы async-методов DatabaseManager: пул потоков на каждый вызов (как было раньше)
+против общего долгоживущего пула. Меряет задержку одиночного вызова и пропускную способность
+при множестве одновременных вызовов. Работает с базой из настроек DB_*.
+
+Запуск: python -m project.src.database.bench_async [вызовов] [одновременно]
+"""
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from project.src.database.db_manager import DatabaseManager
+from project.src.parser.stats import percentile
+
+
+async def per_call_executor(func, *args):
+    """Прежняя схема: новый ThreadPoolExecutor на каждый вызов"""
+    loop = asyncio.get_event_loop()
+    with ThreadPoolExecutor() as executor:
+        return await loop.run_in_executor(executor, func, *args)
+
+
+async def measure(name: str, call, calls: int, concurrency: int):
+    # Последовательные вызовы: задержка одного вызова
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+
+    # Одновременные вызовы: пропускная способность
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited_call():
+        async with semaphore:
+            await call()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[limited_call() for _ in range(calls)])
+    elapsed = time.perf_counter() - started
+
+    print(f"{name:>16} {percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 95) * 1000:>9.2f} "
+          f"{calls / elapsed:>12.0f}")
+
+
+async def run(calls: int, concurrency: int):
+    db_manager = DatabaseManager()
+    db_manager.init_database()
+    print(f"{'схема':>16} {'p50, мс':>9} {'p95, мс':>9} {'вызовов/с':>12}  ({calls} вызовов, {concurrency} одновременно)")
+    try:
+        await measure("пул на вызов", lambda: per_call_executor(db_manager.get_total_games_count), calls, concurrency)
+        await measure("общий пул", db_manager.get_total_games_count_async, calls, concurrency)
+    finally:
+        db_manager.close()
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(run(calls, concurrency))
+
+
+if __name__ == "__main__":
+    main()
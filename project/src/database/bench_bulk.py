@@ -0,0 +1,83 @@
+"""
+Сравнение построчной записи (save_game) и массовой (save_games_bulk) на синтетических играх.
+Пишет в базу из настроек DB_*, использует app_id от BENCH_APP_ID_START и удаляет их после замера.
+
+Запуск: python -m project.src.database.bench_bulk [1000 10000]
+"""
+import contextlib
+import io
+import sys
+import time
+from typing import Dict, List
+
+from project.src.database.db_manager import DatabaseManager
+from project.src.database.models import GameCategoryAssociation, GamePriceHistory, SteamGame
+
+BENCH_APP_ID_START = 900_000_000
+
+
+def make_games(count: int, price: int) -> List[Dict]:
+    return [
+        {
+            'title': f"Bench Game {i}",
+            'url': f"https://store.steampowered.com/app/{BENCH_APP_ID_START + i}/Bench_Game_{i}/",
+            'current_price': f"{price + i % 100} руб",
+            'original_price': f"{price * 2} руб",
+            'discount': "-50%",
+            'description': "Синтетическая игра для замера записи",
+            'categories': ["Экшен", "Инди"],
+        }
+        for i in range(count)
+    ]
+
+
+def cleanup(db_manager: DatabaseManager):
+    session = db_manager.Session()
+    try:
+        session.query(GamePriceHistory).filter(GamePriceHistory.app_id >= BENCH_APP_ID_START).delete()
+        bench_games = session.query(SteamGame.id).filter(SteamGame.app_id >= BENCH_APP_ID_START)
+        session.query(GameCategoryAssociation).filter(
+            GameCategoryAssociation.game_id.in_(bench_games.scalar_subquery())
+        ).delete(synchronize_session=False)
+        session.query(SteamGame).filter(SteamGame.app_id >= BENCH_APP_ID_START).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+def run_per_row(db_manager: DatabaseManager, games: List[Dict]) -> float:
+    started = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):  # save_game подробно печатает каждую игру
+        for game in games:
+            db_manager.save_game(game)
+    return time.time() - started
+
+
+def run_bulk(db_manager: DatabaseManager, games: List[Dict], batch_size: int = 1000) -> float:
+    started = time.time()
+    for i in range(0, len(games), batch_size):
+        db_manager.save_games_bulk(games[i:i + batch_size])
+    return time.time() - started
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    db_manager = DatabaseManager()
+    db_manager.init_database()
+
+    print(f"{'строк':>8} {'режим':>10} {'вставка, с':>12} {'обновление, с':>14} {'строк/с':>10}")
+    try:
+        for size in sizes:
+            for name, runner in (('save_game', run_per_row), ('bulk', run_bulk)):
+                cleanup(db_manager)
+                insert_time = runner(db_manager, make_games(size, 100))
+                # Повторная запись с новыми ценами: путь обновления и истории цен
+                update_time = runner(db_manager, make_games(size, 200))
+                rate = size * 2 / (insert_time + update_time)
+                print(f"{size:>8} {name:>10} {insert_time:>12.2f} {update_time:>14.2f} {rate:>10.0f}")
+    finally:
+        cleanup(db_manager)
+
+
+if __name__ == "__main__":
+    main()
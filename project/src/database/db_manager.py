@@ -1,14 +1,47 @@
 import json
-import re
 from typing import List, Dict, Optional
 from datetime import datetime
-from sqlalchemy import create_engine, text, select, desc, func
+from sqlalchemy import create_engine, select, desc, func, exists, case, cast, literal, union_all, values
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker
 import asyncio
+import functools
 from concurrent.futures import ThreadPoolExecutor
-from .models import Base, SteamGame, GamePriceHistory, create_tables, get_session
+from .models import (
+    Base, SteamGame, GamePriceHistory, GameCategory, GameCategoryAssociation, create_tables, get_session,
+    price_columns, price_columns_batch, category_slug, category_names
+)
+from project.src.utils.prices import discount_amount, parse_discount, parse_price, split_price
+from project.src.utils.steam_urls import extract_app_id
 from .config import get_database_config
 
+# Строк в одном INSERT: PostgreSQL ограничивает число параметров запроса (65535)
+BULK_CHUNK_SIZE = 1000
+# Строк в одном UPDATE ... FROM для цен: в SQLite источник строк - UNION ALL, а он ограничен 500 SELECT
+PRICE_UPDATE_CHUNK_SIZE = 500
+# Колонки steam_games, которые массовое обновление цен берет из карточки списка
+PRICE_UPDATE_COLUMNS = (
+    'app_id', 'current_price', 'original_price', 'discount_percent', 'discount_amount',
+    'current_price_minor', 'original_price_minor', 'discount_amount_minor', 'is_discounted',
+)
+# Необязательные поля: новая строка получает значение по умолчанию (как в save_game),
+# а существующая сохраняет прежнее, если ключа нет в данных игры или он равен None
+BULK_OPTIONAL_DEFAULTS = {
+    'image_url': '',
+    'review_rating': '',
+    'review_count': '',
+    'categories': '[]',
+    'description': '',
+    'release_date': '',
+    'genres': '[]',
+    'developer': None,
+    'publisher': None,
+    'platforms': '[]',
+    'metacritic_score': None,
+    'is_free': False,
+}
+BULK_JSON_COLUMNS = {'categories', 'genres', 'platforms'}
+
 
 class DatabaseManager:
     """Менеджер для работы с базой данных Steam игр"""
@@ -22,6 +55,22 @@ class DatabaseManager:
             echo=self.config.echo
         )
         self.Session = sessionmaker(bind=self.engine)
+        # Один долгоживущий пул потоков для всех async-методов, по размеру пула соединений:
+        # больше потоков все равно ждали бы свободное соединение
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.pool_size + self.config.max_overflow,
+            thread_name_prefix="db"
+        )
+
+    async def _run(self, func, *args, **kwargs):
+        """Выполняет синхронный метод в общем пуле потоков"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        """Останавливает пул потоков и закрывает соединения"""
+        self._executor.shutdown(wait=True)
+        self.engine.dispose()
 
     def init_database(self):
         """Инициализирует базу данных (создает таблицы)"""
@@ -33,49 +82,21 @@ class DatabaseManager:
         Извлекает app_id из URL игры Steam
         Пример: https://store.steampowered.com/app/123456/Game_Name/ -> 123456
         """
-        try:
-            match = re.search(r'/app/(\d+)/', url)
-            if match:
-                return int(match.group(1))
-        except:
-            pass
-        return None
+        return extract_app_id(url)
 
     def parse_price(self, price_str: str) -> tuple:
         """
         Парсит строку цены в числовое значение
         Возвращает: (цена_в_рублях, валюта)
         """
-        try:
-            if not price_str:
-                return 0.0, 'RUB'
-
-            # Убираем пробелы и символы валюты
-            clean_price = price_str.replace(' ', '').replace('руб', '').replace('₽', '').replace('р.', '')
-
-            # Заменяем запятую на точку
-            clean_price = clean_price.replace(',', '.')
-
-            return float(clean_price), 'RUB'
-        except:
-            return 0.0, 'RUB'
+        return split_price(price_str)
 
     def parse_discount_percent(self, discount_str: str) -> int:
         """
         Парсит строку скидки в процент
         Пример: "-50%" -> 50
         """
-        try:
-            if not discount_str:
-                return 0
-
-            # Извлекаем числа из строки
-            match = re.search(r'(\d+)', discount_str)
-            if match:
-                return int(match.group(1))
-        except:
-            pass
-        return 0
+        return parse_discount(discount_str)
 
     def save_game(self, game_data: Dict) -> Optional[SteamGame]:
         """Сохраняет игру в базу данных"""
@@ -106,6 +127,9 @@ class DatabaseManager:
                 game = self._create_new_game(game_data, app_id)
 
             session.add(game)
+            session.flush()
+            # Связи с категориями в той же транзакции, что и игра
+            self._sync_categories(session, {game.id: category_names(game_data.get('categories', []))})
             session.commit()
 
             print(f"   ✅ Успешно сохранено! ID: {game.id}")
@@ -138,6 +162,7 @@ class DatabaseManager:
             original_price=game_data.get('original_price', ''),
             discount_percent=discount_percent,
             discount_amount=self._calculate_discount_amount(game_data),
+            **price_columns(game_data.get('current_price', ''), game_data.get('original_price', '')),
             url=game_data.get('url', ''),
             image_url=game_data.get('image_url', ''),
             review_rating=game_data.get('review_rating', ''),
@@ -145,6 +170,12 @@ class DatabaseManager:
             categories=json.dumps(game_data.get('categories', [])),
             description=game_data.get('description', ''),
             release_date=game_data.get('release_date', ''),
+            genres=json.dumps(game_data.get('genres', [])),
+            developer=game_data.get('developer'),
+            publisher=game_data.get('publisher'),
+            platforms=json.dumps(game_data.get('platforms', [])),
+            metacritic_score=game_data.get('metacritic_score'),
+            is_free=game_data.get('is_free', False),
             is_discounted=discount_percent > 0,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow(),
@@ -153,16 +184,10 @@ class DatabaseManager:
 
     def _calculate_discount_amount(self, game_data: Dict) -> str:
         """Вычисляет сумму скидки"""
-        try:
-            current_price, _ = self.parse_price(game_data.get('current_price', ''))
-            original_price, _ = self.parse_price(game_data.get('original_price', ''))
-
-            if current_price and original_price and original_price > current_price:
-                discount_amount = original_price - current_price
-                return f"{discount_amount:.0f} руб"
-        except:
-            pass
-        return ""
+        amount = discount_amount(
+            parse_price(game_data.get('current_price', '')), parse_price(game_data.get('original_price', ''))
+        )
+        return f"{amount / 100:.0f} руб" if amount else ""
 
     def _update_existing_game(self, game: SteamGame, game_data: Dict) -> SteamGame:
         """Обновляет существующую запись об игре"""
@@ -173,21 +198,344 @@ class DatabaseManager:
         game.description = game_data.get('description', game.description)
         game.discount_percent = discount_percent
         game.discount_amount = self._calculate_discount_amount(game_data)
+        self._set_price_columns(game)
         game.review_rating = game_data.get('review_rating', game.review_rating)
         game.review_count = game_data.get('review_count', game.review_count)
         game.categories = json.dumps(game_data.get('categories', []))
         game.image_url = game_data.get('image_url', game.image_url)
+        game.release_date = game_data.get('release_date', game.release_date)
+        game.developer = game_data.get('developer', game.developer)
+        game.publisher = game_data.get('publisher', game.publisher)
+        game.metacritic_score = game_data.get('metacritic_score', game.metacritic_score)
+        game.is_free = game_data.get('is_free', game.is_free)
+        if 'genres' in game_data:
+            game.genres = json.dumps(game_data['genres'])
+        if 'platforms' in game_data:
+            game.platforms = json.dumps(game_data['platforms'])
         game.updated_at = datetime.utcnow()
         game.last_checked = datetime.utcnow()
         game.is_discounted = discount_percent > 0
 
         return game
 
+    def _set_price_columns(self, game: SteamGame):
+        """Пересчитывает цены в копейках по строковым ценам игры"""
+        for column, value in price_columns(game.current_price, game.original_price).items():
+            setattr(game, column, value)
+
+    def get_known_games_last_checked(self) -> Dict[int, datetime]:
+        """Возвращает {app_id: last_checked} для всех игр в базе (для режима обновления цен)"""
+        session = self.Session()
+        try:
+            rows = session.query(SteamGame.app_id, SteamGame.last_checked).filter(
+                SteamGame.app_id.isnot(None)
+            ).all()
+            return {app_id: last_checked for app_id, last_checked in rows}
+        finally:
+            session.close()
+
+    def update_prices(self, game_data: Dict) -> bool:
+        """
+        Обновляет только цены известной игры по данным карточки списка и пишет историю цен.
+        Детали (описание, категории, отзывы) и last_checked не трогает
+        """
+        app_id = self.extract_app_id_from_url(game_data.get('url', ''))
+        if not app_id:
+            return False
+
+        session = self.Session()
+        try:
+            game = session.query(SteamGame).filter(SteamGame.app_id == app_id).first()
+            if not game:
+                return False
+
+            discount_percent = self.parse_discount_percent(game_data.get('discount', ''))
+            game.current_price = game_data.get('current_price') or game.current_price
+            game.original_price = game_data.get('original_price', '')
+            game.discount_percent = discount_percent
+            game.discount_amount = self._calculate_discount_amount(game_data)
+            self._set_price_columns(game)
+            game.is_discounted = discount_percent > 0
+            game.updated_at = datetime.utcnow()
+            session.commit()
+
+            self._save_price_history(game, session)
+            return True
+
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Ошибка обновления цен игры {game_data.get('title')}: {e}")
+            return False
+        finally:
+            session.close()
+
+    def update_games_details(self, details_by_app_id: Dict[int, Dict]) -> int:
+        """
+        Обновляет детали (описание, категории, отзывы, картинку) существующих игр одной транзакцией.
+        Пустые значения не затирают сохраненные; цены не трогает. Возвращает число обновленных игр
+        """
+        fields = ('description', 'review_rating', 'review_count', 'image_url')
+        session = self.Session()
+        try:
+            games = session.query(SteamGame).filter(SteamGame.app_id.in_(list(details_by_app_id))).all()
+            for game in games:
+                details = details_by_app_id[game.app_id]
+                for field in fields:
+                    if details.get(field):
+                        setattr(game, field, details[field])
+                if details.get('categories'):
+                    game.categories = json.dumps(details['categories'])
+                game.updated_at = datetime.utcnow()
+            self._sync_categories(session, {
+                game.id: category_names(details_by_app_id[game.app_id]['categories'])
+                for game in games if details_by_app_id[game.app_id].get('categories')
+            })
+            session.commit()
+            return len(games)
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Ошибка обновления деталей игр: {e}")
+            return 0
+        finally:
+            session.close()
+
+    async def update_prices_async(self, game_data: Dict) -> bool:
+        """Асинхронно обновляет цены игры"""
+        return await self._run(self.update_prices, game_data)
+
+    def _rows_source(self, table, columns: tuple, rows: List[tuple], name: str):
+        """
+        Пачка строк как таблица для UPDATE ... FROM: VALUES в PostgreSQL.
+        SQLite не принимает имена колонок у (VALUES ...) AS v (...), поэтому там строки собираются UNION ALL
+        """
+        if self.engine.dialect.name == 'postgresql':
+            return values(*[table.c[column]._copy() for column in columns], name=name).data(rows)
+        if self.engine.dialect.name == 'sqlite':
+            return union_all(*[
+                select(*[literal(value, table.c[column].type).label(column) for column, value in zip(columns, row)])
+                for row in rows
+            ]).subquery(name)
+        raise ValueError(f"Массовое обновление не поддерживается для {self.engine.dialect.name}")
+
+    def update_prices_bulk(self, games_data: List[Dict]) -> Dict[int, int]:
+        """
+        Обновляет только цены пачки известных игр одной транзакцией: одна вставка в историю цен
+        (INSERT ... SELECT для игр, у которых цена изменилась) и один UPDATE ... FROM (VALUES ...).
+        Как update_prices: пустая текущая цена не затирает сохраненную, детали и last_checked не трогает.
+        Возвращает {app_id: id} обновленных игр
+        """
+        now = datetime.utcnow()
+        rows = {}
+        for game_data in games_data:
+            app_id = self.extract_app_id_from_url(game_data.get('url', ''))
+            if app_id:
+                # Одну строку нельзя обновить дважды в одном UPDATE - оставляем последнюю карточку
+                rows[app_id] = game_data
+        if not rows:
+            return {}
+
+        app_ids = list(rows)
+        prices = price_columns_batch(
+            [(rows[app_id].get('current_price', ''), rows[app_id].get('original_price', '')) for app_id in app_ids]
+        )
+        values_rows = []
+        for app_id, columns in zip(app_ids, prices):
+            game_data = rows[app_id]
+            discount_percent = self.parse_discount_percent(game_data.get('discount', ''))
+            values_rows.append((
+                app_id,
+                game_data.get('current_price') or None,
+                game_data.get('original_price', ''),
+                discount_percent,
+                self._calculate_discount_amount(game_data),
+                columns['current_price_minor'],
+                columns['original_price_minor'],
+                columns['discount_amount_minor'],
+                discount_percent > 0,
+            ))
+
+        table = SteamGame.__table__
+        history_table = GamePriceHistory.__table__
+        session = self.Session()
+        try:
+            updated_ids = {}
+            for i in range(0, len(values_rows), PRICE_UPDATE_CHUNK_SIZE):
+                source = self._rows_source(
+                    table, PRICE_UPDATE_COLUMNS, values_rows[i:i + PRICE_UPDATE_CHUNK_SIZE], 'prices'
+                )
+                # Типы из VALUES в PostgreSQL выводятся по параметрам - приводим к типам колонок
+                new = {column: cast(source.c[column], table.c[column].type) for column in PRICE_UPDATE_COLUMNS}
+
+                # История пишется до UPDATE, пока в steam_games еще прежняя цена
+                session.execute(history_table.insert().from_select(
+                    ['app_id', 'game_id', 'current_price', 'original_price', 'discount_percent', 'recorded_at'],
+                    select(
+                        table.c.app_id, table.c.id, new['current_price'], new['original_price'],
+                        new['discount_percent'], literal(now, history_table.c.recorded_at.type)
+                    ).join(source, table.c.app_id == new['app_id']).where(
+                        new['current_price'].isnot(None), table.c.current_price != new['current_price']
+                    )
+                ))
+
+                keep_current = new['current_price'].is_(None)
+                stmt = table.update().where(table.c.app_id == new['app_id']).values(
+                    current_price=func.coalesce(new['current_price'], table.c.current_price),
+                    original_price=new['original_price'],
+                    discount_percent=new['discount_percent'],
+                    discount_amount=new['discount_amount'],
+                    current_price_minor=case(
+                        (keep_current, table.c.current_price_minor), else_=new['current_price_minor']
+                    ),
+                    original_price_minor=new['original_price_minor'],
+                    discount_amount_minor=new['discount_amount_minor'],
+                    is_discounted=new['is_discounted'],
+                    updated_at=now,
+                )
+                updated_ids.update(session.execute(stmt.returning(table.c.app_id, table.c.id)).all())
+
+            session.commit()
+            return updated_ids
+
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Ошибка массового обновления цен {len(rows)} игр: {e}")
+            return {}
+        finally:
+            session.close()
+
+    async def update_prices_bulk_async(self, games_data: List[Dict]) -> Dict[int, int]:
+        """Асинхронно обновляет цены пачки игр одной транзакцией"""
+        return await self._run(self.update_prices_bulk, games_data)
+
+    def _normalize_game_row(self, game_data: Dict, app_id: int, now: datetime) -> Dict:
+        """Строка steam_games для массовой записи; отсутствующие необязательные поля - по умолчанию"""
+        discount_percent = self.parse_discount_percent(game_data.get('discount', ''))
+        title = game_data.get('title', '')
+
+        row = {
+            'app_id': app_id,
+            'title': title,
+            'clean_title': title.lower().strip(),
+            'current_price': game_data.get('current_price', ''),
+            'original_price': game_data.get('original_price', ''),
+            'discount_percent': discount_percent,
+            'discount_amount': self._calculate_discount_amount(game_data),
+            'url': game_data.get('url', ''),
+            'is_discounted': discount_percent > 0,
+            'created_at': now,
+            'updated_at': now,
+            'last_checked': now,
+        }
+        for column, default in BULK_OPTIONAL_DEFAULTS.items():
+            if column not in game_data:
+                row[column] = default
+            elif column in BULK_JSON_COLUMNS and game_data[column] is not None:
+                row[column] = json.dumps(game_data[column])
+            else:
+                row[column] = game_data[column]
+        return row
+
+    def _insert_for_dialect(self, table):
+        """INSERT с поддержкой ON CONFLICT для текущего диалекта"""
+        if self.engine.dialect.name == 'postgresql':
+            return postgresql.insert(table)
+        if self.engine.dialect.name == 'sqlite':
+            return sqlite.insert(table)
+        raise ValueError(f"Массовая запись не поддерживается для {self.engine.dialect.name}")
+
+    def save_games_bulk(self, games_data: List[Dict]) -> Dict[int, int]:
+        """
+        Сохраняет пачку игр одной транзакцией: INSERT ... ON CONFLICT (app_id) DO UPDATE ... RETURNING
+        и одна вставка в историю цен для игр, у которых цена изменилась.
+        Возвращает {app_id: id} сохраненных игр
+        """
+        now = datetime.utcnow()
+        rows = {}
+        missing = {}  # app_id -> необязательные поля без ключа в данных (при обновлении не меняются)
+        categories = {}  # app_id -> категории; игры без ключа 'categories' сохраняют прежние связи
+        for game_data in games_data:
+            app_id = self.extract_app_id_from_url(game_data.get('url', ''))
+            if app_id:
+                # Одну строку нельзя обновить дважды в одном INSERT ... ON CONFLICT - оставляем последнюю
+                rows[app_id] = self._normalize_game_row(game_data, app_id, now)
+                missing[app_id] = frozenset(column for column in BULK_OPTIONAL_DEFAULTS if column not in game_data)
+                if 'categories' in game_data:
+                    categories[app_id] = category_names(game_data['categories'])
+                else:
+                    categories.pop(app_id, None)
+        if not rows:
+            return {}
+        # Цены в копейках для всей пачки за один проход
+        for row, columns in zip(rows.values(), price_columns_batch(
+                [(row['current_price'], row['original_price']) for row in rows.values()])):
+            row.update(columns)
+
+        table = SteamGame.__table__
+        # Игры с одинаковым набором отсутствующих полей пишутся одним INSERT с общим DO UPDATE
+        groups = {}
+        for app_id, keys in missing.items():
+            groups.setdefault(keys, []).append(app_id)
+
+        session = self.Session()
+        try:
+            app_ids = list(rows)
+            old_prices = {}
+            for i in range(0, len(app_ids), BULK_CHUNK_SIZE):
+                chunk = app_ids[i:i + BULK_CHUNK_SIZE]
+                old_prices.update(session.execute(
+                    select(table.c.app_id, table.c.current_price).where(table.c.app_id.in_(chunk))
+                ).all())
+
+            saved_ids = {}
+            for keys, group in groups.items():
+                for i in range(0, len(group), BULK_CHUNK_SIZE):
+                    chunk_rows = [rows[app_id] for app_id in group[i:i + BULK_CHUNK_SIZE]]
+                    stmt = self._insert_for_dialect(table).values(chunk_rows)
+                    update_columns = {
+                        column: func.coalesce(stmt.excluded[column], table.c[column])
+                        if column in BULK_OPTIONAL_DEFAULTS else stmt.excluded[column]
+                        for column in chunk_rows[0]
+                        if column not in keys and column not in ('app_id', 'created_at')
+                    }
+                    stmt = stmt.on_conflict_do_update(index_elements=[table.c.app_id], set_=update_columns)
+                    saved_ids.update(session.execute(stmt.returning(table.c.app_id, table.c.id)).all())
+
+            history = [
+                {
+                    'app_id': app_id,
+                    'game_id': game_id,
+                    'current_price': rows[app_id]['current_price'],
+                    'original_price': rows[app_id]['original_price'],
+                    'discount_percent': rows[app_id]['discount_percent'],
+                    'recorded_at': now,
+                }
+                for app_id, game_id in saved_ids.items()
+                if old_prices.get(app_id) != rows[app_id]['current_price']
+            ]
+            if history:
+                session.execute(GamePriceHistory.__table__.insert(), history)
+
+            self._sync_categories(session, {
+                saved_ids[app_id]: names for app_id, names in categories.items() if app_id in saved_ids
+            })
+
+            session.commit()
+            return saved_ids
+
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Ошибка массового сохранения {len(rows)} игр: {e}")
+            return {}
+        finally:
+            session.close()
+
+    async def save_games_bulk_async(self, games_data: List[Dict]) -> Dict[int, int]:
+        """Асинхронно сохраняет пачку игр одной транзакцией"""
+        return await self._run(self.save_games_bulk, games_data)
+
     async def save_game_async(self, game_data: Dict) -> Optional[SteamGame]:
         """Асинхронно сохраняет игру в базу данных"""
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(executor, self.save_game, game_data)
+        return await self._run(self.save_game, game_data)
 
     async def save_games_batch_async(self, games_data: List[Dict]) -> List[Optional[SteamGame]]:
         """Асинхронно сохраняет пачку игр"""
@@ -308,27 +656,19 @@ class DatabaseManager:
     # Асинхронные версии методов
     async def get_games_batch_async(self, offset: int = 0, limit: int = 12) -> List[Dict]:
         """Асинхронно получает пачку игр из базы"""
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(executor, self.get_games_batch, offset, limit)
+        return await self._run(self.get_games_batch, offset, limit)
 
     async def get_total_games_count_async(self) -> int:
         """Асинхронно возвращает общее количество игр"""
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(executor, self.get_total_games_count)
+        return await self._run(self.get_total_games_count)
 
     async def search_games_async(self, query: str, limit: int = 20) -> List[Dict]:
         """Асинхронно ищет игры по названию"""
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(executor, self.search_games, query, limit)
+        return await self._run(self.search_games, query, limit)
 
     async def get_games_by_discount_async(self, min_discount: int = 0, limit: int = 20) -> List[Dict]:
         """Асинхронно получает игры со скидкой"""
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(executor, self.get_games_by_discount, min_discount, limit)
+        return await self._run(self.get_games_by_discount, min_discount, limit)
 
     def get_game_by_url(self, url: str) -> Optional[SteamGame]:
         """Находит игру по URL"""
@@ -351,202 +691,143 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def get_all_categories(self) -> List[str]:
-        """Получает все уникальные категории из БД"""
+    def _ensure_categories(self, session, names) -> Dict[str, int]:
+        """{название: id} категорий; недостающие создаются одним INSERT ... ON CONFLICT DO NOTHING"""
+        names = sorted(set(names))
+        if not names:
+            return {}
+        table = GameCategory.__table__
+
+        def load(column, values) -> list:
+            rows = []
+            for i in range(0, len(values), BULK_CHUNK_SIZE):
+                rows.extend(session.execute(
+                    select(column, table.c.id).where(column.in_(values[i:i + BULK_CHUNK_SIZE]))
+                ).all())
+            return rows
+
+        ids = dict(load(table.c.name, names))
+        missing = [name for name in names if name not in ids]
+        if missing:
+            session.execute(
+                self._insert_for_dialect(table).on_conflict_do_nothing(),
+                [{'name': name, 'slug': category_slug(name)} for name in missing]
+            )
+            ids.update(load(table.c.name, missing))
+            # Название, чей slug уже занят другим написанием ("Экшен" и "экшен"), относим к той категории
+            by_slug = dict(load(table.c.slug, sorted({category_slug(name) for name in missing if name not in ids})))
+            for name in missing:
+                if name not in ids and category_slug(name) in by_slug:
+                    ids[name] = by_slug[category_slug(name)]
+        return ids
+
+    def _sync_categories(self, session, categories_by_game_id: Dict[int, List[str]]):
+        """Перезаписывает связи переданных игр с категориями (в транзакции вызывающего)"""
+        if not categories_by_game_id:
+            return
+        category_ids = self._ensure_categories(
+            session, (name for names in categories_by_game_id.values() for name in names)
+        )
+        table = GameCategoryAssociation.__table__
+        game_ids = list(categories_by_game_id)
+        for i in range(0, len(game_ids), BULK_CHUNK_SIZE):
+            session.execute(table.delete().where(table.c.game_id.in_(game_ids[i:i + BULK_CHUNK_SIZE])))
+
+        links = {
+            (game_id, category_ids[name])
+            for game_id, names in categories_by_game_id.items()
+            for name in names if name in category_ids
+        }
+        if links:
+            session.execute(table.insert(), [
+                {'game_id': game_id, 'category_id': category_id} for game_id, category_id in links
+            ])
+
+    def update_game_categories(self, categories_by_game_id: Dict[int, List[str]]) -> int:
+        """Перезаписывает категории игр {id игры: [категории]} одной транзакцией; возвращает число игр"""
         session = self.Session()
         try:
-            # Для PostgreSQL используем jsonb_array_elements_text
-            result = session.execute(text("""
-                SELECT DISTINCT jsonb_array_elements_text(
-                    categories::jsonb
-                ) as category
-                FROM steam_games 
-                WHERE categories != '[]' 
-                AND categories IS NOT NULL
-                AND jsonb_typeof(categories::jsonb) = 'array'
-                ORDER BY category
-            """))
-
-            categories = [row[0] for row in result if row[0]]
-            return categories
-
+            self._sync_categories(session, categories_by_game_id)
+            session.commit()
+            return len(categories_by_game_id)
         except Exception as e:
-            print(f"❌ Ошибка получения категорий: {e}")
-
-            # Fallback: попробуем простой способ
-            try:
-                return self._get_categories_fallback(session)
-            except Exception as fallback_error:
-                print(f"❌ Fallback также не сработал: {fallback_error}")
-                return []
+            session.rollback()
+            print(f"❌ Ошибка сохранения категорий игр: {e}")
+            return 0
         finally:
             session.close()
 
-    def _get_games_by_category_fallback(self, session, category: str, offset: int, limit: int) -> List[Dict]:
-        """Резервный метод поиска по категории"""
-        try:
-            # Получаем все игры с категориями
-            all_games = session.query(SteamGame).filter(
-                SteamGame.categories != None,
-                SteamGame.categories != '[]',
-                SteamGame.categories != ''
-            ).order_by(SteamGame.created_at.desc()).all()
-
-            # Фильтруем по категории
-            filtered_games = []
-            for game in all_games:
-                try:
-                    if game.categories:
-                        # Парсим JSON
-                        if game.categories.startswith('['):
-                            categories_list = json.loads(game.categories)
-                            if isinstance(categories_list, list) and category in categories_list:
-                                filtered_games.append(self._game_to_dict(game))
-                        # Или ищем в строке
-                        elif category in game.categories:
-                            filtered_games.append(self._game_to_dict(game))
-                except Exception as e:
-                    print(f"⚠️ Ошибка проверки категорий игры {game.title}: {e}")
-                    continue
-
-            # Применяем offset и limit
-            start_idx = min(offset, len(filtered_games))
-            end_idx = min(offset + limit, len(filtered_games))
-
-            return filtered_games[start_idx:end_idx]
+    # Запросы по категориям идут по game_categories и индексу idx_category_game, а не по JSON в steam_games
+    def _category_names_stmt(self):
+        return select(GameCategory.name).where(
+            exists().where(GameCategoryAssociation.category_id == GameCategory.id)
+        ).order_by(GameCategory.name)
+
+    def _category_games_stmt(self, category: str):
+        return select(SteamGame).join(
+            GameCategoryAssociation, GameCategoryAssociation.game_id == SteamGame.id
+        ).join(
+            GameCategory, GameCategory.id == GameCategoryAssociation.category_id
+        ).where(GameCategory.name == category).order_by(SteamGame.created_at.desc())
+
+    def _category_counts_stmt(self):
+        game_count = func.count(GameCategoryAssociation.game_id).label('game_count')
+        return select(GameCategory.name, game_count).join(
+            GameCategoryAssociation, GameCategoryAssociation.category_id == GameCategory.id
+        ).group_by(GameCategory.id, GameCategory.name).order_by(desc(game_count), GameCategory.name)
+
+    def _category_count_stmt(self, category: str):
+        return select(func.count()).select_from(GameCategoryAssociation).join(
+            GameCategory, GameCategory.id == GameCategoryAssociation.category_id
+        ).where(GameCategory.name == category)
 
+    def get_all_categories(self) -> List[str]:
+        """Получает все категории, в которых есть игры"""
+        session = self.Session()
+        try:
+            return list(session.execute(self._category_names_stmt()).scalars())
         except Exception as e:
-            print(f"❌ Fallback поиск по категории также не сработал: {e}")
+            print(f"❌ Ошибка получения категорий: {e}")
             return []
+        finally:
+            session.close()
 
     def get_games_by_category(self, category: str, offset: int = 0, limit: int = 12) -> List[Dict]:
         """Получает игры по категории"""
         session = self.Session()
         try:
-            # Для PostgreSQL - получаем игры
-            result = session.execute(text("""
-                SELECT sg.* 
-                FROM steam_games sg
-                WHERE sg.categories::jsonb ? :category
-                ORDER BY sg.created_at DESC
-                LIMIT :limit 
-                OFFSET :offset
-            """), {
-                'category': category,
-                'limit': limit,
-                'offset': offset
-            })
-
-            games = []
-            for row in result:
-                # Конвертируем результат в словарь
-                game_dict = self._row_to_dict(row)
-                games.append(game_dict)
-
-            return games
-
+            result = session.execute(
+                self._category_games_stmt(category).offset(offset).limit(limit)
+            ).scalars().all()
+            return [self._game_to_dict(game) for game in result]
         except Exception as e:
             print(f"❌ Ошибка получения игр по категории {category}: {e}")
-            # Fallback на простой поиск
-            return self._get_games_by_category_fallback(session, category, offset, limit)
+            return []
         finally:
             session.close()
 
-    def _row_to_dict(self, row) -> Dict:
-        """Конвертирует SQL результат в словарь"""
-        return {
-            'id': row.id,
-            'title': row.title,
-            'current_price': row.current_price,
-            'original_price': row.original_price,
-            'discount': f"-{row.discount_percent}%" if getattr(row, 'discount_percent', 0) > 0 else "",
-            'url': row.url,
-            'image_url': row.image_url,
-            'categories': row.categories,
-            'review_rating': row.review_rating,
-            'review_count': row.review_count,
-            'description': row.description,
-            'timestamp': row.created_at.isoformat() if row.created_at else None
-        }
-
     def get_categories_with_count(self) -> List[Dict]:
         """Получает категории с количеством игр в каждой, отсортированные по убыванию"""
         session = self.Session()
         try:
-            # Для PostgreSQL - получаем категории с количеством игр
-            result = session.execute(text("""
-                SELECT 
-                    jsonb_array_elements_text(categories::jsonb) as category,
-                    COUNT(*) as game_count
-                FROM steam_games 
-                WHERE categories != '[]' 
-                AND categories IS NOT NULL
-                AND jsonb_typeof(categories::jsonb) = 'array'
-                GROUP BY category
-                ORDER BY game_count DESC, category
-            """))
-
-            categories_with_count = []
-            for row in result:
-                if row[0]:  # Проверяем, что категория не пустая
-                    categories_with_count.append({
-                        'name': row[0],
-                        'count': row[1]
-                    })
-
-            return categories_with_count
-
+            return [
+                {'name': name, 'count': count}
+                for name, count in session.execute(self._category_counts_stmt())
+            ]
         except Exception as e:
             print(f"❌ Ошибка получения категорий с количеством: {e}")
-            # Fallback: получаем просто категории и считаем вручную
-            return self._get_categories_with_count_fallback(session)
+            return []
         finally:
             session.close()
 
-    def _get_categories_with_count_fallback(self, session) -> List[Dict]:
-        """Резервный метод получения категорий с количеством"""
-        categories = self.get_all_categories()
-        categories_with_count = []
-
-        for category in categories:
-            count = self.get_games_count_by_category(category)
-            categories_with_count.append({
-                'name': category,
-                'count': count
-            })
-
-        # Сортируем по количеству (убывание), затем по названию
-        categories_with_count.sort(key=lambda x: (-x['count'], x['name']))
-        return categories_with_count
-
     def get_games_count_by_category(self, category: str) -> int:
         """Возвращает количество игр в категории"""
         session = self.Session()
         try:
-            result = session.execute(text("""
-                SELECT COUNT(*) 
-                FROM steam_games 
-                WHERE categories::jsonb ? :category
-            """), {
-                'category': category
-            })
-
-            return result.scalar() or 0
-
+            return session.execute(self._category_count_stmt(category)).scalar() or 0
         except Exception as e:
             print(f"❌ Ошибка подсчета игр по категории {category}: {e}")
-            # Fallback
-            all_games = session.query(SteamGame).filter(
-                SteamGame.categories != None,
-                SteamGame.categories != '[]',
-                SteamGame.categories != ''
-            ).all()
-
-            count = 0
-            for game in all_games:
-                if game.categories and category in game.categories:
-                    count += 1
-            return count
+            return 0
         finally:
             session.close()
 
@@ -567,6 +848,34 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def get_games_by_price(self, offset: int = 0, limit: int = 12, descending: bool = False,
+                           min_price: Optional[float] = None, max_price: Optional[float] = None) -> List[Dict]:
+        """
+        Игры со скидкой, отсортированные по цене, с фильтром по диапазону цены в рублях.
+        Сортировка и фильтр идут по индексу (is_discounted, current_price_minor, id)
+        """
+        session = self.Session()
+        try:
+            query = session.query(SteamGame).filter(
+                SteamGame.is_discounted == True,
+                SteamGame.current_price_minor.isnot(None)
+            )
+            if min_price is not None:
+                query = query.filter(SteamGame.current_price_minor >= round(min_price * 100))
+            if max_price is not None:
+                query = query.filter(SteamGame.current_price_minor <= round(max_price * 100))
+
+            order = [SteamGame.current_price_minor, SteamGame.id]
+            if descending:
+                order = [desc(column) for column in order]
+            result = query.order_by(*order).offset(offset).limit(limit).all()
+            return [self._game_to_dict(game) for game in result]
+        except Exception as e:
+            print(f"Ошибка получения игр по цене: {e}")
+            return []
+        finally:
+            session.close()
+
     def get_total_discounted_games_count(self) -> int:
         """Возвращает количество игр со скидкой"""
         session = self.Session()
@@ -580,6 +889,49 @@ class DatabaseManager:
         finally:
             session.close()
 
+    # Асинхронные версии остальных методов (выполняются в общем пуле потоков)
+
+    async def get_known_games_last_checked_async(self) -> Dict[int, datetime]:
+        return await self._run(self.get_known_games_last_checked)
+
+    async def update_games_details_async(self, details_by_app_id: Dict[int, Dict]) -> int:
+        return await self._run(self.update_games_details, details_by_app_id)
+
+    async def get_discounted_games_async(self, min_discount: int = 0) -> List[SteamGame]:
+        return await self._run(self.get_discounted_games, min_discount)
+
+    async def get_game_by_url_async(self, url: str) -> Optional[SteamGame]:
+        return await self._run(self.get_game_by_url, url)
+
+    async def get_most_popular_games_async(self, offset: int = 0, limit: int = 12) -> List[Dict]:
+        return await self._run(self.get_most_popular_games, offset, limit)
+
+    async def get_all_categories_async(self) -> List[str]:
+        return await self._run(self.get_all_categories)
+
+    async def get_games_by_category_async(self, category: str, offset: int = 0, limit: int = 12) -> List[Dict]:
+        return await self._run(self.get_games_by_category, category, offset, limit)
+
+    async def get_categories_with_count_async(self) -> List[Dict]:
+        return await self._run(self.get_categories_with_count)
+
+    async def get_games_count_by_category_async(self, category: str) -> int:
+        return await self._run(self.get_games_count_by_category, category)
+
+    async def get_highest_discount_games_async(self, offset: int = 0, limit: int = 12) -> List[Dict]:
+        return await self._run(self.get_highest_discount_games, offset, limit)
+
+    async def get_total_discounted_games_count_async(self) -> int:
+        return await self._run(self.get_total_discounted_games_count)
+
+    async def update_game_categories_async(self, categories_by_game_id: Dict[int, List[str]]) -> int:
+        return await self._run(self.update_game_categories, categories_by_game_id)
+
+    async def get_games_by_price_async(self, offset: int = 0, limit: int = 12, descending: bool = False,
+                                       min_price: Optional[float] = None,
+                                       max_price: Optional[float] = None) -> List[Dict]:
+        return await self._run(self.get_games_by_price, offset, limit, descending, min_price, max_price)
+
 
 # Синглтон для глобального доступа к менеджеру БД
 db_manager = DatabaseManager()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Планы запросов по категориям на синтетическом наборе игр.
+Заполняет базу из настроек DB_* играми с app_id от EXPLAIN_APP_ID_START (через save_games_bulk, как парсер),
+выводит EXPLAIN каждого запроса DatabaseManager по категориям и время выполнения,
+отмечает полный просмотр steam_games и удаляет синтетические данные.
+
+Запуск: python -m project.src.database.explain_categories [--games 100000] [--keep]
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import text
+
+from project.src.database.db_manager import BULK_CHUNK_SIZE, DatabaseManager
+from project.src.database.models import GameCategory, GameCategoryAssociation, GamePriceHistory, SteamGame
+
+EXPLAIN_APP_ID_START = 910_000_000
+CATEGORY_PREFIX = "Explain "
+# Популярные категории встречаются часто, редкие - у малой доли игр
+CATEGORY_WEIGHTS = [(f"{CATEGORY_PREFIX}{i:02d}", 1 / (i + 1)) for i in range(40)]
+
+
+def seed(db_manager: DatabaseManager, games: int):
+    rng = random.Random(0)
+    names = [name for name, _ in CATEGORY_WEIGHTS]
+    weights = [weight for _, weight in CATEGORY_WEIGHTS]
+    started = time.time()
+    for start in range(0, games, BULK_CHUNK_SIZE):
+        db_manager.save_games_bulk([
+            {
+                'title': f"Explain Game {i}",
+                'url': f"https://store.steampowered.com/app/{EXPLAIN_APP_ID_START + i}/Explain_Game_{i}/",
+                'current_price': f"{rng.randrange(50, 5000)} руб",
+                'original_price': "5 000 руб",
+                'discount': f"-{rng.randrange(5, 90)}%",
+                'categories': sorted(set(rng.choices(names, weights, k=3))),
+            }
+            for i in range(start, min(start + BULK_CHUNK_SIZE, games))
+        ])
+    print(f"🌱 Добавлено {games} игр за {time.time() - started:.1f} с")
+
+
+def cleanup(db_manager: DatabaseManager):
+    session = db_manager.Session()
+    try:
+        seeded = session.query(SteamGame.id).filter(SteamGame.app_id >= EXPLAIN_APP_ID_START).scalar_subquery()
+        session.query(GameCategoryAssociation).filter(
+            GameCategoryAssociation.game_id.in_(seeded)
+        ).delete(synchronize_session=False)
+        session.query(GamePriceHistory).filter(GamePriceHistory.app_id >= EXPLAIN_APP_ID_START).delete()
+        session.query(SteamGame).filter(SteamGame.app_id >= EXPLAIN_APP_ID_START).delete()
+        session.query(GameCategory).filter(GameCategory.name.like(f"{CATEGORY_PREFIX}%")).delete(
+            synchronize_session=False
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def explain(db_manager: DatabaseManager, name: str, stmt):
+    dialect = db_manager.engine.dialect
+    sql = str(stmt.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    prefix = "EXPLAIN (ANALYZE, BUFFERS)" if dialect.name == 'postgresql' else "EXPLAIN QUERY PLAN"
+
+    with db_manager.engine.connect() as connection:
+        started = time.perf_counter()
+        connection.execute(text(sql)).all()
+        elapsed = time.perf_counter() - started
+        plan = [" ".join(str(value) for value in row if isinstance(value, str))
+                for row in connection.execute(text(f"{prefix} {sql}"))]
+
+    full_scan = any(line.strip().startswith(("Seq Scan on steam_games", "SCAN steam_games")) for line in plan)
+    print(f"\n{'⚠️' if full_scan else '✅'} {name}: {elapsed * 1000:.1f} мс"
+          f"{' - полный просмотр steam_games' if full_scan else ''}")
+    for line in plan:
+        print(f"   {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN запросов по категориям")
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--keep', action='store_true', help="Не удалять синтетические игры")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    db_manager.init_database()
+    cleanup(db_manager)
+    try:
+        seed(db_manager, args.games)
+        with db_manager.engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+        popular, rare = CATEGORY_WEIGHTS[0][0], CATEGORY_WEIGHTS[-1][0]
+        explain(db_manager, "get_all_categories", db_manager._category_names_stmt())
+        explain(db_manager, "get_categories_with_count", db_manager._category_counts_stmt())
+        explain(db_manager, f"get_games_by_category({popular})",
+                db_manager._category_games_stmt(popular).offset(0).limit(12))
+        explain(db_manager, f"get_games_by_category({rare})",
+                db_manager._category_games_stmt(rare).offset(0).limit(12))
+        explain(db_manager, f"get_games_count_by_category({popular})", db_manager._category_count_stmt(popular))
+    finally:
+        if not args.keep:
+            cleanup(db_manager)
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
+import json
+import re
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 import sqlalchemy as sa
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from project.src.utils.prices import (
+    discount_amount, parse_discount, parse_price as parse_price_minor, parse_prices, split_price
+)
+from project.src.utils.steam_urls import extract_app_id
+
 Base = declarative_base()
 
 
@@ -24,6 +31,10 @@ class SteamGame(Base):
     original_price = sa.Column(sa.String(50), nullable=False)  # Оригинальная цена
     discount_percent = sa.Column(sa.Integer, nullable=False)  # Процент скидки
     discount_amount = sa.Column(sa.String(50))  # Сумма скидки в валюте
+    # Те же цены в копейках: по ним идут сортировка и фильтры по цене (NULL - цену не удалось разобрать)
+    current_price_minor = sa.Column(sa.Integer)
+    original_price_minor = sa.Column(sa.Integer)
+    discount_amount_minor = sa.Column(sa.Integer)
 
     # Ссылки
     url = sa.Column(sa.String(500), nullable=False, unique=True)  # URL игры
@@ -80,7 +91,7 @@ class SteamGame(Base):
     # Индексы для быстрого поиска
     __table_args__ = (
         sa.Index('idx_discount', 'discount_percent'),
-        sa.Index('idx_price', 'current_price'),
+        sa.Index('idx_discounted_price', 'is_discounted', 'current_price_minor', 'id'),
         sa.Index('idx_reviews', 'review_score'),
         sa.Index('idx_created', 'created_at'),
         sa.Index('idx_updated', 'updated_at'),
@@ -139,6 +150,8 @@ class GameCategoryAssociation(Base):
 
     __table_args__ = (
         sa.UniqueConstraint('game_id', 'category_id', name='uq_game_category'),
+        # Игры категории и число игр в категории берутся из этого индекса, без чтения steam_games
+        sa.Index('idx_category_game', 'category_id', 'game_id'),
     )
 
 
@@ -160,34 +173,40 @@ def extract_app_id_from_url(url: str) -> Optional[int]:
     Извлекает app_id из URL игры Steam
     Пример: https://store.steampowered.com/app/123456/Game_Name/ -> 123456
     """
-    try:
-        import re
-        match = re.search(r'/app/(\d+)/', url)
-        if match:
-            return int(match.group(1))
-    except:
-        pass
-    return None
+    return extract_app_id(url)
 
 
-def parse_price(price_str: str) -> tuple:
+def category_slug(name: str) -> str:
     """
-    Парсит строку цены в числовое значение
-    Возвращает: (цена_в_рублях, валюта)
+    Slug категории для game_categories
+    Пример: "Ролевые игры" -> "ролевые-игры"
     """
-    try:
-        if not price_str:
-            return 0.0, 'RUB'
-
-        # Убираем пробелы и символы валюты
-        clean_price = price_str.replace(' ', '').replace('руб', '').replace('₽', '').replace('р.', '')
+    return re.sub(r'[\W_]+', '-', name.lower()).strip('-')[:100]
+
+
+def category_names(categories) -> List[str]:
+    """Категории игры (список или JSON-строка) -> очищенный список названий без повторов"""
+    if isinstance(categories, str):
+        try:
+            categories = json.loads(categories)
+        except ValueError:
+            return []
+    if not isinstance(categories, list):
+        return []
+    names = []
+    for category in categories:
+        name = category.strip()[:100] if isinstance(category, str) else ''
+        if name and name not in names:
+            names.append(name)
+    return names
 
-        # Заменяем запятую на точку
-        clean_price = clean_price.replace(',', '.')
 
-        return float(clean_price), 'RUB'
-    except:
-        return 0.0, 'RUB'
+def parse_price(price_str: str) -> tuple:
+    """
+    Парсит строку цены в числовое значение
+    Возвращает: (цена_в_единицах_валюты, валюта)
+    """
+    return split_price(price_str)
 
 
 def parse_discount_percent(discount_str: str) -> int:
@@ -195,75 +214,27 @@ def parse_discount_percent(discount_str: str) -> int:
     Парсит строку скидки в процент
     Пример: "-50%" -> 50
     """
-    try:
-        if not discount_str:
-            return 0
-
-        # Извлекаем числа из строки
-        import re
-        match = re.search(r'(\d+)', discount_str)
-        if match:
-            return int(match.group(1))
-    except:
-        pass
-    return 0
-
-
-@staticmethod
-def extract_app_id_from_url(url: str) -> Optional[int]:
-    """
-    Извлекает app_id из URL игры Steam
-    Пример: https://store.steampowered.com/app/123456/Game_Name/ -> 123456
-    """
-    try:
-        import re
-        match = re.search(r'/app/(\d+)/', url)
-        if match:
-            return int(match.group(1))
-    except:
-        pass
-    return None
+    return parse_discount(discount_str)
 
 
-@staticmethod
-def parse_price(price_str: str) -> tuple:
-    """
-    Парсит строку цены в числовое значение
-    Возвращает: (цена_в_рублях, валюта)
-    """
-    try:
-        if not price_str:
-            return 0.0, 'RUB'
+def _price_columns(current: Optional[int], original: Optional[int]) -> dict:
+    return {
+        'current_price_minor': current,
+        'original_price_minor': original,
+        'discount_amount_minor': discount_amount(current, original),
+    }
 
-        # Убираем пробелы и символы валюты
-        clean_price = price_str.replace(' ', '').replace('руб', '').replace('₽', '').replace('р.', '')
 
-        # Заменяем запятую на точку
-        clean_price = clean_price.replace(',', '.')
+def price_columns(current_price: str, original_price: str) -> dict:
+    """Числовые колонки цен steam_games (в копейках) по строкам текущей и исходной цены"""
+    return _price_columns(parse_price_minor(current_price), parse_price_minor(original_price))
 
-        return float(clean_price), 'RUB'
-    except:
-        return 0.0, 'RUB'
 
-
-@staticmethod
-def parse_discount_percent(discount_str: str) -> int:
-    """
-    Парсит строку скидки в процент
-    Пример: "-50%" -> 50
-    """
-    try:
-        if not discount_str:
-            return 0
-
-        # Извлекаем числа из строки
-        import re
-        match = re.search(r'(\d+)', discount_str)
-        if match:
-            return int(match.group(1))
-    except:
-        pass
-    return 0
+def price_columns_batch(prices: List[Tuple[str, str]]) -> List[dict]:
+    """То же для пачки пар (текущая, исходная цена) - разбор всех строк за один проход"""
+    currents = parse_prices(current for current, _ in prices)
+    originals = parse_prices(original for _, original in prices)
+    return [_price_columns(current, original) for current, original in zip(currents, originals)]
 
 
 # Пример использования
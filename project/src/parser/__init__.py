@@ -1,3 +0,0 @@
-from .steam_discountes_selenium_db2 import  SteamDiscountsEnhancedParser
-
-__all__ = ['SteamDiscountsEnhancedParser']
\ No newline at end of file
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+from project.src.parser.http_details import DEFAULT_HEADERS
+from project.src.parser.rate_limiter import AdaptiveRateLimiter, RateLimitedError, limited, raise_for_throttling
+from project.src.parser.stats import WorkerStats
+from project.src.utils.steam_urls import extract_app_id
+
+STORE_URL = "https://store.steampowered.com"
+
+# Steam отдает данные по нескольким appids за один запрос только с filters=price_overview
+PRICE_BATCH_SIZE = 50
+
+
+def normalize_appdetails(data: Dict) -> Dict:
+    """Преобразует ответ appdetails в словарь полей игры (как у parse_game_details + доп. поля)"""
+    release = data.get('release_date') or {}
+    platforms = data.get('platforms') or {}
+    metacritic = data.get('metacritic') or {}
+    recommendations = data.get('recommendations') or {}
+
+    details = {
+        'categories': [c['description'] for c in data.get('categories', []) if c.get('description')],
+        'genres': [g['description'] for g in data.get('genres', []) if g.get('description')],
+        'description': data.get('short_description', ''),
+        'image_url': data.get('header_image', ''),
+        'release_date': release.get('date', ''),
+        'developer': ', '.join(data.get('developers', [])),
+        'publisher': ', '.join(data.get('publishers', [])),
+        'platforms': [name for name, supported in platforms.items() if supported],
+        'metacritic_score': metacritic.get('score'),
+        'is_free': bool(data.get('is_free', False)),
+    }
+    if recommendations.get('total'):
+        details['review_count'] = str(recommendations['total'])
+
+    # Пустые значения не должны затирать данные с карточки списка
+    return {key: value for key, value in details.items() if value not in (None, '', [])}
+
+
+def normalize_price_overview(price: Optional[Dict]) -> Dict:
+    """Преобразует price_overview в строки цен, как на карточке списка"""
+    if not price:
+        return {}
+
+    discount = price.get('discount_percent', 0)
+    return {
+        'current_price': price.get('final_formatted', ''),
+        'original_price': price.get('initial_formatted', '') if discount else '',
+        'discount': f"-{discount}%" if discount else '',
+    }
+
+
+class AppDetailsFetcher:
+    """Загрузка деталей игр через JSON-эндпоинт магазина appdetails"""
+
+    def __init__(self, concurrency: int = 16, base_url: Optional[str] = None,
+                 country: str = 'ru', language: str = 'russian', timeout: float = 20.0,
+                 limiter: Optional[AdaptiveRateLimiter] = None):
+        self.concurrency = concurrency
+        self.base_url = (base_url or STORE_URL).rstrip('/')
+        self.country = country
+        self.language = language
+        self.timeout = timeout
+        self.limiter = limiter
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = WorkerStats("appdetails")
+
+    async def start(self):
+        if self.session:
+            return
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=DEFAULT_HEADERS,
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def _request(self, app_ids: str, filters: Optional[str] = None) -> Dict:
+        await self.start()
+        params = {'appids': app_ids, 'cc': self.country, 'l': self.language}
+        if filters:
+            params['filters'] = filters
+
+        async with limited(self.limiter):
+            async with self.session.get(f"{self.base_url}/api/appdetails", params=params) as response:
+                raise_for_throttling(response.status)
+                response.raise_for_status()
+                payload = await response.json(content_type=None)
+            # При превышении лимита appdetails отвечает 200 с телом null
+            if payload is None:
+                raise RateLimitedError("пустой ответ appdetails")
+            return payload
+
+    async def fetch_app(self, app_id: int) -> Optional[Dict]:
+        """Возвращает сырые данные appdetails по одной игре (None если Steam не отдал данные)"""
+        payload = await self._request(str(app_id))
+        entry = payload.get(str(app_id)) or {}
+        return entry.get('data') if entry.get('success') else None
+
+    async def fetch_details(self, game_url: str) -> Dict:
+        """
+        Загружает детали игры по URL (интерфейс как у HttpDetailFetcher).
+        Ошибки запроса пробрасываются; {} - только если Steam ответил, что данных по игре нет
+        """
+        started = time.time()
+        app_id = extract_app_id(game_url)
+        try:
+            data = await self.fetch_app(app_id) if app_id else None
+        except Exception:
+            self.stats.record(time.time() - started, False)
+            raise
+        self.stats.record(time.time() - started, data is not None)
+        return normalize_appdetails(data) if data else {}
+
+    async def _fetch_price_batch(self, batch: List[int]) -> Dict[int, Dict]:
+        started = time.time()
+        try:
+            payload = await self._request(','.join(map(str, batch)), filters='price_overview')
+        except Exception as e:
+            self.stats.record(time.time() - started, False)
+            print(f"❌ Ошибка загрузки цен appdetails: {e}")
+            return {}
+
+        prices = {}
+        for app_id in batch:
+            entry = payload.get(str(app_id)) or {}
+            data = entry.get('data') if entry.get('success') else None
+            # У бесплатных игр Steam отдает data: [] - цены нет
+            if isinstance(data, dict):
+                prices[app_id] = normalize_price_overview(data.get('price_overview'))
+        self.stats.record(time.time() - started, True)
+        return prices
+
+    async def fetch_prices_batch(self, app_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Загружает цены пачками app_id (по PRICE_BATCH_SIZE за запрос, пачки - параллельно
+        в пределах ограничителя). Возвращает {app_id: цены как на карточке списка}
+        """
+        app_ids: List[int] = list(app_ids)
+        batches = [app_ids[i:i + PRICE_BATCH_SIZE] for i in range(0, len(app_ids), PRICE_BATCH_SIZE)]
+        prices = {}
+        for batch_prices in await asyncio.gather(*[self._fetch_price_batch(batch) for batch in batches]):
+            prices.update(batch_prices)
+        return prices
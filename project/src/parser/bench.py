@@ -0,0 +1,128 @@
+"""
+Замер скорости парсера на сервере воспроизведения (replay_server) без доступа к сети.
+
+Запуск:
+    python -m project.src.parser.replay_server replay fixtures --latency 0.2 --jitter 0.1 &
+    python -m project.src.parser.bench --base-url http://127.0.0.1:8770 --games 300 --backend http
+Остальные настройки парсера берутся из переменных PARSER_*. Ограничитель запросов тоже действует:
+время страницы включает ожидание разрешения, для замера без него поднимите PARSER_RATE_LIMIT_*
+
+Игры пишутся не в рабочую базу, а во временную SQLite, которая удаляется после замера.
+SQLite пишет в один поток, поэтому для замера записи в PostgreSQL укажите --db-name: отдельную пустую базу
+на сервере из настроек DB_* (не DB_NAME); ее таблицы удаляются после замера
+"""
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+from typing import Optional
+
+from sqlalchemy import inspect
+
+from project.src.database.config import DatabaseConfig, get_database_config
+from project.src.database.db_manager import DatabaseManager
+from project.src.database.models import Base
+from project.src.parser.config import get_parser_config
+from project.src.parser.stats import percentile
+from project.src.parser.steam_parser_finally import SteamParserFinal
+
+DEFAULT_LISTING_URL = "https://store.steampowered.com/specials/?l=russian&flavor=contenthub_topsellers"
+
+
+def _cpu_seconds() -> float:
+    """CPU процесса парсера и завершенных дочерних процессов (geckodriver/Firefox)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def create_bench_db(tmp_dir: str, db_name: Optional[str]) -> DatabaseManager:
+    """Временная SQLite в tmp_dir или отдельная база db_name на сервере DB_* (но не рабочая DB_NAME)"""
+    if db_name:
+        db_config = get_database_config()
+        if db_name == db_config.database:
+            raise SystemExit(f"❌ --db-name {db_name} совпадает с рабочей базой DB_NAME: укажите отдельную базу")
+        db_config.database = db_name
+    else:
+        db_config = DatabaseConfig(dialect='sqlite', database=os.path.join(tmp_dir, 'bench.db'))
+
+    db_manager = DatabaseManager(db_config)
+    existing = inspect(db_manager.engine).get_table_names()
+    if existing:
+        db_manager.close()
+        raise SystemExit(f"❌ В базе {db_config.database} уже есть таблицы ({', '.join(existing)}): нужна пустая база")
+    db_manager.init_database()
+    return db_manager
+
+
+def drop_bench_db(db_manager: DatabaseManager):
+    """Удаляет таблицы замера (файл временной SQLite удалится вместе с каталогом)"""
+    try:
+        Base.metadata.drop_all(db_manager.engine)
+    finally:
+        db_manager.close()
+
+
+async def run_bench(base_url: str, games: int, backend: str, listing_mode: str, url: str,
+                    db_name: Optional[str] = None) -> dict:
+    config = get_parser_config()
+    config.store_base_url = base_url
+    config.detail_backend = backend
+    config.listing_mode = listing_mode
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Отдельный чекпоинт на каждый прогон, чтобы игры не отсеивались как уже обработанные
+        config.checkpoint_path = os.path.join(tmp_dir, 'checkpoint.db')
+        db_manager = create_bench_db(tmp_dir, db_name)
+        parser = SteamParserFinal(config, db_manager=db_manager)
+
+        cpu_started = _cpu_seconds()
+        started = time.time()
+        try:
+            saved, errors = await parser.parse_page_and_save_immediate(url, games)
+        finally:
+            await parser.close_driver()
+            parser.checkpoint.close()
+            drop_bench_db(db_manager)
+        elapsed = time.time() - started
+        cpu = _cpu_seconds() - cpu_started
+
+    page_times = []
+    if parser.pipeline:
+        page_times = [t for stats in parser.pipeline.stages[0].workers for t in stats.times]
+
+    return {
+        'saved': saved,
+        'errors': errors,
+        'elapsed': elapsed,
+        'pages_per_second': saved / elapsed if elapsed > 0 else 0.0,
+        'p50': percentile(page_times, 50),
+        'p95': percentile(page_times, 95),
+        'cpu_seconds': cpu,
+        'cpu_per_page_ms': cpu / saved * 1000 if saved else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер скорости парсера на записанных ответах")
+    parser.add_argument('--base-url', default="http://127.0.0.1:8770")
+    parser.add_argument('--games', type=int, default=300)
+    parser.add_argument('--backend', default='http', choices=['selenium', 'http', 'appdetails'])
+    parser.add_argument('--listing', default='search', choices=['click', 'offset', 'search'])
+    parser.add_argument('--url', default=DEFAULT_LISTING_URL)
+    parser.add_argument('--db-name', help="Отдельная пустая база на сервере DB_* вместо временной SQLite")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_bench(args.base_url, args.games, args.backend, args.listing, args.url, args.db_name))
+
+    print("\n⏱️ Результат замера:")
+    print(f"   Сохранено: {result['saved']}, ошибок: {result['errors']}, время: {result['elapsed']:.1f} с")
+    print(f"   Скорость: {result['pages_per_second']:.2f} стр/с")
+    print(f"   Страница игры: p50 {result['p50']:.3f} с, p95 {result['p95']:.3f} с")
+    print(f"   CPU: {result['cpu_seconds']:.1f} с ({result['cpu_per_page_ms']:.1f} мс/стр)")
+
+
+if __name__ == "__main__":
+    main()
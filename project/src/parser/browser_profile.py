@@ -0,0 +1,124 @@
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+from selenium.webdriver.firefox.options import Options
+
+# Хосты аналитики и рекламы, запросы к которым не нужны парсеру.
+# Только имена хостов: PAC сравнивает домен (dnsDomainIs), путь в записи не учитывается
+BLOCKED_HOSTS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'facebook.net',
+    'connect.facebook.net',
+    'hotjar.com',
+    'scorecardresearch.com',
+    'mc.yandex.ru',
+]
+
+# Считает объем и время загрузки страницы по Navigation/Resource Timing API.
+# transferSize равен 0 для сторонних ресурсов без Timing-Allow-Origin (у них и decodedBodySize 0),
+# поэтому bytes - нижняя оценка; такие ресурсы считаются в unsized (взятые из кеша - нет)
+PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? (nav.transferSize || 0) : 0;
+let unsized = 0;
+for (const r of resources) {
+    bytes += r.transferSize || 0;
+    if (!r.transferSize && !r.decodedBodySize) unsized += 1;
+}
+return {
+    bytes: bytes,
+    unsized: unsized,
+    load_ms: nav ? Math.max(nav.loadEventEnd, nav.domContentLoadedEventEnd) - nav.startTime : 0,
+    requests: resources.length + 1
+};
+"""
+
+
+def build_pac_script(hosts: List[str]) -> str:
+    """PAC-скрипт, который отправляет запросы к заблокированным хостам в несуществующий прокси"""
+    checks = " || ".join(f'dnsDomainIs(host, "{host}")' for host in hosts)
+    return (
+        "function FindProxyForURL(url, host) {"
+        f" if ({checks}) return 'PROXY 127.0.0.1:9';"
+        " return 'DIRECT'; }"
+    )
+
+
+def build_firefox_options(headless: bool = True, lean: bool = False,
+                          cache_dir: Optional[str] = None) -> Options:
+    """
+    Настройки Firefox. В режиме lean не загружаются картинки, видео и шрифты,
+    запросы к аналитике блокируются, а дисковый кеш хранится в cache_dir между запусками
+    """
+    firefox_options = Options()
+    if headless:
+        firefox_options.add_argument("--headless")
+    firefox_options.add_argument("--no-sandbox")
+    firefox_options.add_argument("--disable-dev-shm-usage")
+    firefox_options.add_argument("--window-size=1920,1080")
+
+    if not lean:
+        return firefox_options
+
+    # Картинки, видео (трейлеры на страницах игр) и шрифты
+    firefox_options.set_preference("permissions.default.image", 2)
+    firefox_options.set_preference("media.autoplay.default", 5)
+    firefox_options.set_preference("media.autoplay.blocking_policy", 2)
+    firefox_options.set_preference("media.preload.default", 0)
+    firefox_options.set_preference("media.preload.auto", 0)
+    firefox_options.set_preference("gfx.downloadable_fonts.enabled", False)
+    firefox_options.set_preference("browser.display.use_document_fonts", 0)
+
+    # Аналитика
+    firefox_options.set_preference("network.proxy.type", 2)
+    firefox_options.set_preference(
+        "network.proxy.autoconfig_url",
+        "data:application/x-ns-proxy-autoconfig," + quote(build_pac_script(BLOCKED_HOSTS))
+    )
+
+    # Постоянный дисковый кеш (CSS/JS магазина не скачиваются заново в каждой сессии)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        firefox_options.set_preference("browser.cache.disk.enable", True)
+        firefox_options.set_preference("browser.cache.disk.parent_directory", os.path.abspath(cache_dir))
+        firefox_options.set_preference("browser.cache.disk.smart_size.enabled", False)
+        firefox_options.set_preference("browser.cache.disk.capacity", 1024 * 1024)  # КБ
+
+    return firefox_options
+
+
+def collect_page_metrics(driver) -> Dict:
+    """Объем переданных данных и время загрузки текущей страницы"""
+    return driver.execute_script(PAGE_METRICS_JS) or {}
+
+
+class PageLoadMetrics:
+    """Статистика объема и времени загрузки страниц по типам (список, игра)"""
+
+    def __init__(self):
+        self.pages = defaultdict(list)
+
+    def record(self, kind: str, metrics: Dict) -> Dict:
+        if metrics:
+            self.pages[kind].append(metrics)
+        return metrics
+
+    def print_summary(self):
+        if not self.pages:
+            return
+
+        print("\n📦 Загрузка страниц (объем - нижняя оценка):")
+        for kind, pages in self.pages.items():
+            total_bytes = sum(page.get('bytes', 0) for page in pages)
+            unsized = sum(page.get('unsized', 0) for page in pages)
+            requests = sum(page.get('requests', 0) for page in pages)
+            avg_ms = sum(page.get('load_ms', 0) for page in pages) / len(pages)
+            print(f"   {kind}: {len(pages)} стр, ≥{total_bytes / 1024 / 1024:.1f} МБ всего, "
+                  f"≥{total_bytes / len(pages) / 1024:.0f} КБ/стр, {avg_ms:.0f} мс/стр, "
+                  f"без размера {unsized} из {requests} запросов")
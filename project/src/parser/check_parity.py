@@ -0,0 +1,308 @@
+"""
+Сверка браузерных и безбраузерных извлекателей на записанных страницах магазина (каталог fixtures).
+
+Страницы отдает локальный сервер fake_store. Страницы игр: HttpDetailFetcher (lxml) сверяется с сохраненным
+ожидаемым результатом (fixtures/expected.json), а SteamParserFinal.parse_game_details (Selenium) - с lxml.
+appdetails: AppDetailsFetcher (normalize_appdetails, normalize_price_overview) на данных fixtures/appdetails.json.
+Поиск: results_html из fixtures/search_results.json (parse_search_results_html) сверяется с ожидаемым результатом
+и с build_game_from_card на тех же строках; SearchResultsListing.iter_games не загружает лишние пачки.
+Ответ 429 на странице игры и в appdetails - исключение, а не пустые детали.
+Карточки списка (только с браузером): снимок ListingScanner (build_game_from_card) сверяется с ожидаемым
+результатом, а обход элементов _find_game_blocks_by_elements (_parse_game_block) - со снимком.
+
+Запуск: python -m project.src.parser.check_parity [--no-browser]
+С --no-browser Firefox не запускается и проверяются только безбраузерные извлекатели.
+Код выхода 1, если хоть одна проверка не сошлась
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+
+from aiohttp import web
+from lxml import html as lxml_html
+
+from project.src.parser.appdetails import PRICE_BATCH_SIZE, AppDetailsFetcher
+from project.src.parser.fake_store import create_fake_store_app
+from project.src.parser.http_details import HttpDetailFetcher, extract_game_details
+from project.src.parser.listing import ListingScanner, build_game_from_card
+from project.src.parser.search_listing import SEARCH_PAGES_MARGIN, SearchResultsListing, parse_search_results_html
+from project.src.utils.steam_urls import extract_app_id
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# app_id -> страница игры: обычная, проверка возраста, без обзоров, без меток
+DETAIL_FIXTURES = {
+    620: 'detail_normal.html',
+    1174180: 'detail_agegate.html',
+    2954170: 'detail_no_reviews.html',
+    1803450: 'detail_no_tags.html',
+}
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_expected() -> dict:
+    return json.loads(load_fixture('expected.json'))
+
+
+def compare(name: str, got, expected) -> int:
+    """Печатает результат сравнения; возвращает 1 при расхождении"""
+    if got == expected:
+        print(f"✅ {name}")
+        return 0
+    print(f"❌ {name}:\n   получено  {got!r}\n   ожидалось {expected!r}")
+    return 1
+
+
+async def check_http_details(base_url: str, expected: dict) -> int:
+    """HttpDetailFetcher загружает страницы с локального сервера и разбирает их через lxml"""
+    fetcher = HttpDetailFetcher(concurrency=4, base_url=base_url)
+    failures = 0
+    try:
+        for app_id, name in DETAIL_FIXTURES.items():
+            details = await fetcher.fetch_details(f"https://store.steampowered.com/app/{app_id}/")
+            failures += compare(f"lxml {name}", details, expected['details'][str(app_id)])
+    finally:
+        await fetcher.close()
+    return failures
+
+
+async def check_appdetails(base_url: str, expected: dict) -> int:
+    """AppDetailsFetcher против fake_store: детали по одной игре и цены пачками по PRICE_BATCH_SIZE"""
+    fetcher = AppDetailsFetcher(concurrency=4, base_url=base_url)
+    failures = 0
+    try:
+        for app_id, details in expected['appdetails'].items():
+            got = await fetcher.fetch_details(f"https://store.steampowered.com/app/{app_id}/")
+            failures += compare(f"appdetails {app_id}", got, details)
+
+        # Известные игры вперемешку с отсутствующими в магазине: 3 запроса на 120 app_id
+        app_ids = [int(app_id) for app_id in expected['appdetails']] + list(range(10 ** 6, 10 ** 6 + 116))
+        requests_before = fetcher.stats.total
+        prices = await fetcher.fetch_prices_batch(app_ids)
+        failures += compare("appdetails цены пачкой", {str(k): v for k, v in prices.items()}, expected['prices'])
+        failures += compare(f"appdetails запросов на {len(app_ids)} app_id", fetcher.stats.total - requests_before,
+                            math.ceil(len(app_ids) / PRICE_BATCH_SIZE))
+    finally:
+        await fetcher.close()
+    return failures
+
+
+def search_result_rows(fragment: str) -> list:
+    return lxml_html.fragment_fromstring(fragment, create_parent='div').xpath(
+        "//a[contains(@class, 'search_result_row')]")
+
+
+def card_from_search_row(row) -> dict:
+    """Сырая карточка, какой ее вернул бы LISTING_SNAPSHOT_JS для строки поиска (innerText без nbsp)"""
+    titles = row.xpath(".//span[contains(@class, 'title')]")
+    images = row.xpath(".//div[contains(@class, 'search_capsule')]//img")
+    return {
+        'url': row.get('href', ''),
+        'title': titles[0].text_content().strip() if titles else '',
+        'image': images[0].get('src', '') if images else '',
+        'text': '\n'.join(part.strip() for part in row.itertext() if part.strip()).replace('\u00a0', ' '),
+    }
+
+
+def check_search_results(expected: dict) -> int:
+    """results_html: lxml-разбор строк поиска против ожидаемого и против разбора текста карточки"""
+    fragment = json.loads(load_fixture('search_results.json'))['results_html']
+    games = without_timestamps(parse_search_results_html(fragment))
+    failures = compare("Поиск search_results.json", games, expected['search'])
+
+    # Наборы, пропущенные parse_search_results_html, пропускаем и здесь; бесплатные игры карточка списка
+    # не распознает (цены нет), их покрывает только сверка с ожидаемым
+    cards = [build_game_from_card(card_from_search_row(row)) for row in search_result_rows(fragment)
+             if '/app/' in row.get('href', '')]
+    cards = without_timestamps([card for card in cards if card and card['current_price']])
+    priced = [game for game in games if any(card['app_id'] == game['app_id'] for card in cards)]
+    failures += compare("parse_search_results_html = build_game_from_card", priced, cards)
+    return failures
+
+
+def synthetic_search_rows(count: int) -> list:
+    """count строк поиска по образцу первой строки фикстуры, app_id с 10**6"""
+    row = search_result_rows(json.loads(load_fixture('search_results.json'))['results_html'])[0]
+    rows = []
+    for app_id in range(10 ** 6, 10 ** 6 + count):
+        row.set('href', f"https://store.steampowered.com/app/{app_id}/Game_{app_id}/?snr=1_7_7_2300_150_1")
+        row.set('data-ds-appid', str(app_id))
+        rows.append(lxml_html.tostring(row, encoding='unicode'))
+    return rows
+
+
+async def check_search_requests() -> int:
+    """iter_games загружает пачки по мере нужды, а не весь каталог (1000 строк = 100 пачек)"""
+    app = create_fake_store_app({}, search_rows=synthetic_search_rows(1000))
+    runner = await start_runner(app)
+    failures = 0
+    try:
+        # Без обработанных игр и с каждой второй уже обработанной (нужно вдвое больше пачек)
+        for max_games, skip_every in ((25, 0), (25, 2)):
+            listing = SearchResultsListing(base_url=store_url(runner), page_size=10, concurrency=4)
+            is_processed = (lambda url: extract_app_id(url) % skip_every == 0) if skip_every else None
+            app['search_starts'].clear()
+            try:
+                games = [game async for game in listing.iter_games(max_games, is_processed)]
+            finally:
+                await listing.close()
+
+            needed = max_games * (skip_every or 1)
+            limit = math.ceil(needed / listing.page_size) + SEARCH_PAGES_MARGIN
+            requests = len(app['search_starts'])
+            failures += compare(f"search: {len(games)} игр (пропуск каждой {skip_every or '-'}), "
+                                f"запросов {requests} из не более {limit}",
+                                (len(games), requests <= limit), (max_games, True))
+    finally:
+        await runner.cleanup()
+    return failures
+
+
+async def check_fetch_errors() -> int:
+    """Ответ 429 - ошибка загрузки, а не пустые детали (иначе игра сохранилась бы без деталей)"""
+    async def throttled(request: web.Request) -> web.Response:
+        return web.Response(status=429)
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', throttled)
+    runner = await start_runner(app)
+    failures = 0
+    try:
+        for fetcher in (HttpDetailFetcher(concurrency=1, base_url=store_url(runner)),
+                        AppDetailsFetcher(concurrency=1, base_url=store_url(runner))):
+            try:
+                got = await fetcher.fetch_details("https://store.steampowered.com/app/620/")
+            except Exception as e:
+                got = type(e).__name__
+            finally:
+                await fetcher.close()
+            failures += compare(f"{type(fetcher).__name__}: 429 -> исключение", got, 'RateLimitedError')
+    finally:
+        await runner.cleanup()
+    return failures
+
+
+async def start_runner(app: web.Application) -> web.AppRunner:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner
+
+
+async def start_fake_store(pages: dict, apps: dict) -> web.AppRunner:
+    """Поднимает fake_store на свободном порту 127.0.0.1"""
+    return await start_runner(
+        create_fake_store_app(apps, pages, listing_page=load_fixture('listing_specials.html'))
+    )
+
+
+def store_url(runner: web.AppRunner) -> str:
+    host, port = runner.addresses[0][:2]
+    return f"http://{host}:{port}"
+
+
+def create_browser_parser(tmp_dir: str):
+    """SteamParserFinal с Firefox, временной базой SQLite и временным чекпоинтом - для вызова извлекателей"""
+    from project.src.database.config import DatabaseConfig
+    from project.src.database.db_manager import DatabaseManager
+    from project.src.parser.config import get_parser_config
+    from project.src.parser.driver_pool import create_firefox_driver
+    from project.src.parser.steam_parser_finally import SteamParserFinal
+
+    config = get_parser_config()
+    config.checkpoint_path = os.path.join(tmp_dir, 'checkpoint.db')
+    db_manager = DatabaseManager(DatabaseConfig(dialect='sqlite', database=os.path.join(tmp_dir, 'parity.db')))
+    parser = SteamParserFinal(config, db_manager=db_manager)
+    parser.driver = create_firefox_driver(headless=True)
+    return parser
+
+
+def close_browser_parser(parser):
+    parser.driver.quit()
+    parser.checkpoint.close()
+    parser.db_manager.close()
+
+
+async def check_browser_details(parser, base_url: str) -> int:
+    failures = 0
+    for app_id, name in DETAIL_FIXTURES.items():
+        game_url = f"{base_url}/app/{app_id}/"
+        await asyncio.to_thread(parser.driver.get, game_url)
+        selenium_details = await asyncio.to_thread(parser.parse_game_details, game_url)
+        failures += compare(f"Selenium = lxml {name}", selenium_details, extract_game_details(load_fixture(name)))
+    return failures
+
+
+def without_timestamps(games: list) -> list:
+    return [{key: value for key, value in game.items() if key != 'timestamp'} for game in games]
+
+
+async def check_browser_listing(parser, base_url: str, expected: dict) -> int:
+    """Карточки списка: снимок одним execute_script (build_game_from_card) и обход элементов (_parse_game_block)"""
+    await asyncio.to_thread(parser.driver.get, f"{base_url}/specials/")
+    snapshot = without_timestamps(await asyncio.to_thread(ListingScanner().scan, parser.driver))
+    by_elements = without_timestamps(await asyncio.to_thread(parser._find_game_blocks_by_elements))
+    failures = compare("Снимок карточек listing_specials.html", snapshot, expected['listing'])
+    failures += compare("_parse_game_block = снимок карточек", by_elements, snapshot)
+    return failures
+
+
+async def check_browser(base_url: str, tmp_dir: str, expected: dict) -> int:
+    try:
+        # Чекпоинт открывает SQLite-соединение - создаем и закрываем парсер в потоке event loop
+        parser = create_browser_parser(tmp_dir)
+    except Exception as e:
+        print(f"❌ Не удалось запустить Firefox (для проверки без браузера: --no-browser): {e}")
+        return 1
+
+    try:
+        failures = await check_browser_details(parser, base_url)
+        failures += await check_browser_listing(parser, base_url, expected)
+        return failures
+    finally:
+        close_browser_parser(parser)
+
+
+async def run(no_browser: bool, tmp_dir: str) -> int:
+    expected = load_expected()
+    apps = {int(app_id): data for app_id, data in json.loads(load_fixture('appdetails.json')).items()}
+    runner = await start_fake_store({app_id: load_fixture(name) for app_id, name in DETAIL_FIXTURES.items()}, apps)
+    base_url = store_url(runner)
+    try:
+        failures = await check_http_details(base_url, expected)
+        failures += await check_appdetails(base_url, expected)
+        failures += check_search_results(expected)
+        failures += await check_search_requests()
+        failures += await check_fetch_errors()
+
+        if no_browser:
+            print("⏭️ Сверка с Selenium пропущена (--no-browser)")
+        else:
+            failures += await check_browser(base_url, tmp_dir, expected)
+        return failures
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сверка извлекателей на записанных страницах магазина")
+    parser.add_argument('--no-browser', action='store_true', help="Не запускать Firefox")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        failures = asyncio.run(run(args.no_browser, tmp_dir))
+
+    print(f"\n{'✅' if not failures else '❌'} Расхождений: {failures}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
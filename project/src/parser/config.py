@@ -0,0 +1,90 @@
+# parser/config.py
+import os
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+
+# Загружаем переменные окружения
+load_dotenv()
+
+
+@dataclass
+class ParserConfig:
+    """Конфигурация парсера"""
+    detail_workers: int = 3  # Количество драйверов для страниц игр (0 - один драйвер, как раньше)
+    headless: bool = True
+    browser_profile: str = "default"  # default - обычный Firefox, lean - без картинок/видео/шрифтов/аналитики
+    browser_cache_dir: str = ".browser_cache"  # Постоянный дисковый кеш для профиля lean
+    driver_max_pages: int = 300  # Перезапуск драйвера после стольких страниц (0 - без ограничения)
+    driver_max_rss_mb: int = 1500  # Перезапуск драйвера при такой памяти браузера, МБ (0 - без ограничения)
+    driver_check_every: int = 10  # Проверять память каждые N страниц
+    checkpoint_path: str = "crawl_checkpoint.db"  # SQLite-чекпоинт обхода (обработанные app_id, курсор)
+    dedupe_set: str = "bitmap"  # Множество обработанных app_id в памяти: "bitmap" или "bloom"
+    dedupe_capacity: int = 1_000_000  # Вместимость фильтра Блума
+    crawl_mode: str = "stream"  # stream - обход по ходу списка, frontier - сначала весь список, затем игры
+    # selenium - страницы игр в браузере, http - HTML без браузера (lxml), appdetails - JSON API магазина
+    detail_backend: str = "selenium"
+    http_concurrency: int = 16  # Параллельных HTTP-запросов для detail_backend == 'http'
+    store_base_url: Optional[str] = None  # Подмена хоста магазина (локальный тестовый сервер)
+    # click - 'Показать больше', offset - параллельные окна offset=, search - JSON /search/results/ без браузера
+    listing_mode: str = "click"
+    listing_workers: int = 4  # Драйверов (или HTTP-запросов для search) для параллельной загрузки списка
+    listing_page_size: int = 12  # Игр в одном окне offset=
+    search_page_size: int = 50  # Игр в одной пачке /search/results/
+    # Адаптивный ограничитель запросов к магазину (начальные значения и пределы)
+    rate_limit_rps: float = 4.0
+    rate_limit_max_rps: float = 20.0
+    rate_limit_concurrency: int = 4
+    rate_limit_max_concurrency: int = 16
+    rate_limit_latency_target: float = 5.0  # Выше этой задержки (с) параллельность не растет
+    snapshot_dir: Optional[str] = None  # Каталог снимков сырых страниц (None - не сохранять)
+    write_batch_size: int = 20  # Игр в одной пачке записи в базу
+    write_workers: int = 2  # Параллельных записей в базу
+    write_flush_interval: float = 2.0  # Неполная пачка записывается не позже чем через N секунд
+    write_buffer_max: int = 200  # Игр в буфере записи, после которых обход ждет освобождения места
+    pipeline_report_interval: float = 30  # Печатать глубину очередей конвейера раз в N секунд (0 - не печатать)
+    # Обновление цен: известные игры обновляются по карточке списка (с бэкендом appdetails - пачками
+    # по app_id через appdetails), без страницы игры
+    refresh_mode: bool = False
+    detail_ttl_hours: float = 168  # Страницу известной игры открываем, только если детали старше TTL
+
+    @property
+    def lean_browser(self) -> bool:
+        return self.browser_profile == 'lean'
+
+
+def get_parser_config() -> ParserConfig:
+    """Получает конфигурацию парсера из переменных окружения"""
+    return ParserConfig(
+        detail_workers=int(os.getenv("PARSER_DETAIL_WORKERS", "3")),
+        headless=os.getenv("PARSER_HEADLESS", "true").lower() == "true",
+        browser_profile=os.getenv("PARSER_BROWSER_PROFILE", "default"),
+        browser_cache_dir=os.getenv("PARSER_BROWSER_CACHE_DIR", ".browser_cache"),
+        driver_max_pages=int(os.getenv("PARSER_DRIVER_MAX_PAGES", "300")),
+        driver_max_rss_mb=int(os.getenv("PARSER_DRIVER_MAX_RSS_MB", "1500")),
+        driver_check_every=int(os.getenv("PARSER_DRIVER_CHECK_EVERY", "10")),
+        checkpoint_path=os.getenv("PARSER_CHECKPOINT_PATH", "crawl_checkpoint.db"),
+        dedupe_set=os.getenv("PARSER_DEDUPE_SET", "bitmap"),
+        dedupe_capacity=int(os.getenv("PARSER_DEDUPE_CAPACITY", "1000000")),
+        crawl_mode=os.getenv("PARSER_CRAWL_MODE", "stream"),
+        detail_backend=os.getenv("PARSER_DETAIL_BACKEND", "selenium"),
+        http_concurrency=int(os.getenv("PARSER_HTTP_CONCURRENCY", "16")),
+        store_base_url=os.getenv("PARSER_STORE_BASE_URL"),
+        listing_mode=os.getenv("PARSER_LISTING_MODE", "click"),
+        listing_workers=int(os.getenv("PARSER_LISTING_WORKERS", "4")),
+        listing_page_size=int(os.getenv("PARSER_LISTING_PAGE_SIZE", "12")),
+        search_page_size=int(os.getenv("PARSER_SEARCH_PAGE_SIZE", "50")),
+        rate_limit_rps=float(os.getenv("PARSER_RATE_LIMIT_RPS", "4")),
+        rate_limit_max_rps=float(os.getenv("PARSER_RATE_LIMIT_MAX_RPS", "20")),
+        rate_limit_concurrency=int(os.getenv("PARSER_RATE_LIMIT_CONCURRENCY", "4")),
+        rate_limit_max_concurrency=int(os.getenv("PARSER_RATE_LIMIT_MAX_CONCURRENCY", "16")),
+        rate_limit_latency_target=float(os.getenv("PARSER_RATE_LIMIT_LATENCY_TARGET", "5")),
+        snapshot_dir=os.getenv("PARSER_SNAPSHOT_DIR") or None,
+        write_batch_size=int(os.getenv("PARSER_WRITE_BATCH_SIZE", "20")),
+        write_workers=int(os.getenv("PARSER_WRITE_WORKERS", "2")),
+        write_flush_interval=float(os.getenv("PARSER_WRITE_FLUSH_INTERVAL", "2")),
+        write_buffer_max=int(os.getenv("PARSER_WRITE_BUFFER_MAX", "200")),
+        pipeline_report_interval=float(os.getenv("PARSER_PIPELINE_REPORT_INTERVAL", "30")),
+        refresh_mode=os.getenv("PARSER_REFRESH_MODE", "false").lower() == "true",
+        detail_ttl_hours=float(os.getenv("PARSER_DETAIL_TTL_HOURS", "168"))
+    )
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # Без psutil перезапуск только по количеству страниц
+    psutil = None
+
+
+def browser_rss_mb(driver) -> Optional[float]:
+    """Суммарная память (RSS) geckodriver и всех процессов Firefox драйвера, МБ"""
+    if psutil is None:
+        return None
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except Exception:
+        return None
+
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / 1024 / 1024
+
+
+class DriverWatchdog:
+    """
+    Следит за памятью браузера и количеством загруженных страниц каждого драйвера
+    и перезапускает драйвер после превышения порогов
+    """
+
+    def __init__(self, max_pages: int = 300, max_rss_mb: float = 1500, check_every: int = 10):
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.check_every = check_every
+        self.pages: Dict[int, int] = {}  # id(driver) -> страниц с последнего запуска
+        self.page_times: List[float] = []
+        self.restart_times: List[float] = []
+        self.restart_reasons: List[str] = []
+
+    def note_page(self, driver, elapsed: Optional[float] = None):
+        """Учитывает загруженную драйвером страницу"""
+        self.pages[id(driver)] = self.pages.get(id(driver), 0) + 1
+        if elapsed is not None:
+            self.page_times.append(elapsed)
+
+    def should_recycle(self, driver) -> Optional[str]:
+        """Возвращает причину перезапуска или None"""
+        pages = self.pages.get(id(driver), 0)
+        if self.max_pages and pages >= self.max_pages:
+            return f"{pages} страниц"
+
+        # Память проверяем не на каждой странице: обход дерева процессов не бесплатный
+        if self.max_rss_mb and pages and pages % self.check_every == 0:
+            rss = browser_rss_mb(driver)
+            if rss is not None and rss >= self.max_rss_mb:
+                return f"RSS {rss:.0f} МБ"
+
+        return None
+
+    async def restart(self, driver, factory: Callable, reason: str):
+        """Закрывает драйвер и создает новый через factory (оба шага вне event loop)"""
+        started = time.time()
+        self.pages.pop(id(driver), None)
+        try:
+            await asyncio.to_thread(driver.quit)
+        except Exception as e:
+            print(f"⚠️ Ошибка закрытия драйвера: {e}")
+
+        new_driver = await asyncio.to_thread(factory)
+        elapsed = time.time() - started
+        self.restart_times.append(elapsed)
+        self.restart_reasons.append(reason)
+        print(f"♻️ Драйвер перезапущен ({reason}) за {elapsed:.1f} с")
+        return new_driver
+
+    def print_summary(self):
+        if not self.page_times and not self.restart_times:
+            return
+
+        print("\n♻️ Жизненный цикл драйверов:")
+        if self.page_times:
+            avg_page = sum(self.page_times) / len(self.page_times)
+            print(f"   Страниц: {len(self.page_times)}, в среднем {avg_page:.2f} с/стр")
+        if self.restart_times:
+            avg_restart = sum(self.restart_times) / len(self.restart_times)
+            print(f"   Перезапусков: {len(self.restart_times)}, в среднем {avg_restart:.1f} с "
+                  f"({', '.join(self.restart_reasons)})")
@@ -0,0 +1,108 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from selenium import webdriver
+
+from project.src.parser.browser_profile import build_firefox_options
+
+
+def create_firefox_driver(headless: bool = True, lean: bool = False, cache_dir: Optional[str] = None):
+    """Создает Firefox драйвер с настройками парсера (lean - без картинок, видео, шрифтов и аналитики)"""
+    return webdriver.Firefox(options=build_firefox_options(headless, lean, cache_dir))
+
+
+class DriverPool:
+    """Пул Firefox драйверов для параллельной загрузки страниц игр"""
+
+    def __init__(self, size: int, headless: bool = True, lean: bool = False, cache_dir: Optional[str] = None,
+                 watchdog=None):
+        self.size = size
+        self.headless = headless
+        self.lean = lean
+        self.cache_dir = cache_dir
+        self.watchdog = watchdog  # DriverWatchdog: перезапуск драйверов по памяти/количеству страниц
+        self.drivers: List = []
+        self._slots = {}  # id(driver) -> номер слота (для каталога кеша)
+        self._dead = set()  # id(driver) слотов, чей перезапуск не удался: перезапускаются при следующей выдаче
+        self._available: asyncio.Queue = asyncio.Queue()
+
+    async def start(self):
+        """Запускает все драйверы пула параллельно (каждый в своем потоке)"""
+        if self.drivers:
+            return
+
+        self.drivers = list(await asyncio.gather(*[
+            asyncio.to_thread(create_firefox_driver, self.headless, self.lean, self._slot_cache_dir(i))
+            for i in range(self.size)
+        ]))
+        for slot, driver in enumerate(self.drivers):
+            self._slots[id(driver)] = slot
+            self._available.put_nowait(driver)
+        print(f"✅ Пул драйверов запущен: {self.size} шт.")
+
+    def _slot_cache_dir(self, slot: int) -> Optional[str]:
+        """У каждого драйвера свой каталог кеша: Firefox не делит кеш между процессами"""
+        return os.path.join(self.cache_dir, f"pool-{slot}") if self.cache_dir else None
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Выдает свободный драйвер и возвращает его в пул после использования.
+        Слот возвращается в очередь всегда, даже если перезапуск драйвера не удался
+        """
+        driver = await self._available.get()
+        if id(driver) in self._dead:
+            try:
+                driver = await self._recycle(driver, "повтор после неудачного перезапуска")
+            finally:
+                if id(driver) in self._dead:
+                    self._available.put_nowait(driver)
+            if id(driver) in self._dead:
+                raise RuntimeError(f"Драйвер слота {self._slots[id(driver)]} не запущен")
+
+        try:
+            yield driver
+        finally:
+            try:
+                if self.watchdog:
+                    reason = self.watchdog.should_recycle(driver)
+                    if reason:
+                        driver = await self._recycle(driver, reason)
+            finally:
+                self._available.put_nowait(driver)
+
+    async def _recycle(self, driver, reason: str):
+        """
+        Перезапускает драйвер слота, сохраняя его каталог кеша.
+        Если новый драйвер не запустился, возвращает старый, помеченный мертвым
+        """
+        slot = self._slots[id(driver)]
+        # Помечаем до перезапуска: старый драйвер закрывается первым, а задачу могут отменить
+        self._dead.add(id(driver))
+        try:
+            new_driver = await self.watchdog.restart(
+                driver, lambda: create_firefox_driver(self.headless, self.lean, self._slot_cache_dir(slot)), reason
+            )
+        except Exception as e:
+            print(f"❌ Не удалось перезапустить драйвер слота {slot} ({reason}): {e}")
+            return driver
+
+        self._dead.discard(id(driver))
+        del self._slots[id(driver)]
+        self._slots[id(new_driver)] = slot
+        self.drivers[slot] = new_driver
+        return new_driver
+
+    async def close(self):
+        """Закрывает все драйверы пула"""
+        for driver in self.drivers:
+            try:
+                await asyncio.to_thread(driver.quit)
+            except Exception as e:
+                print(f"⚠️ Ошибка закрытия драйвера: {e}")
+        self.drivers = []
+        self._slots = {}
+        self._dead = set()
+        self._available = asyncio.Queue()
+        print("✅ Пул драйверов закрыт")
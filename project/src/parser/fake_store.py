@@ -0,0 +1,91 @@
+"""
+Локальный заменитель магазина Steam для проверки HTTP-бэкендов парсера без сети.
+Отдает /api/appdetails, /app/<id>/, /search/results/ и /specials/ из данных в памяти.
+
+Запуск: python -m project.src.parser.fake_store apps.json [port]
+где apps.json - {"<app_id>": {"data": {...appdetails...}, "html": "<страница игры>", "search_row": "<a ...>"}}
+"""
+import json
+import sys
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+
+def create_fake_store_app(apps: Dict[int, Dict], pages: Optional[Dict[int, str]] = None,
+                          search_rows: Optional[List[str]] = None,
+                          listing_page: Optional[str] = None) -> web.Application:
+    """
+    Создает aiohttp-приложение с эндпоинтами магазина (listing_page - страница /specials/).
+    app['search_starts'] - значения start всех запросов /search/results/ (для проверки числа запросов)
+    """
+    pages = pages or {}
+    search_rows = search_rows or []
+
+    async def appdetails(request: web.Request) -> web.Response:
+        filters = request.query.get('filters')
+        payload = {}
+        for raw_id in request.query.get('appids', '').split(','):
+            if not raw_id.strip().isdigit():
+                continue
+            data = apps.get(int(raw_id))
+            if data is None:
+                payload[raw_id] = {'success': False}
+            elif filters:
+                # Как Steam: если отфильтрованных полей нет (бесплатная игра), data - пустой список
+                filtered = {key: data[key] for key in filters.split(',') if key in data}
+                payload[raw_id] = {'success': True, 'data': filtered or []}
+            else:
+                payload[raw_id] = {'success': True, 'data': data}
+        return web.json_response(payload)
+
+    async def app_page(request: web.Request) -> web.Response:
+        page = pages.get(int(request.match_info['app_id']))
+        if page is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=page, content_type='text/html')
+
+    async def specials(request: web.Request) -> web.Response:
+        if listing_page is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=listing_page, content_type='text/html')
+
+    async def search_results(request: web.Request) -> web.Response:
+        start = int(request.query.get('start', 0))
+        count = int(request.query.get('count', 50))
+        request.app['search_starts'].append(start)
+        return web.json_response({
+            'success': 1,
+            'results_html': ''.join(search_rows[start:start + count]),
+            'total_count': len(search_rows),
+            'start': start,
+        })
+
+    app = web.Application()
+    app['search_starts'] = []
+    app.router.add_get('/api/appdetails', appdetails)
+    app.router.add_get('/search/results/', search_results)
+    app.router.add_get('/specials/', specials)
+    app.router.add_get(r'/app/{app_id:\d+}/{tail:.*}', app_page)
+    return app
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python -m project.src.parser.fake_store apps.json [port]")
+        return
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    apps = {int(app_id): entry.get('data', {}) for app_id, entry in raw.items()}
+    pages = {int(app_id): entry['html'] for app_id, entry in raw.items() if entry.get('html')}
+    search_rows = [entry['search_row'] for entry in raw.values() if entry.get('search_row')]
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+
+    print(f"🧪 Тестовый магазин: http://127.0.0.1:{port} ({len(apps)} игр)")
+    web.run_app(create_fake_store_app(apps, pages, search_rows), host='127.0.0.1', port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+from lxml import html as lxml_html
+
+from project.src.utils.steam_urls import extract_app_id
+from project.src.parser.rate_limiter import AdaptiveRateLimiter, limited, raise_for_throttling
+from project.src.parser.stats import WorkerStats
+
+# Куки, чтобы Steam не показывал страницу проверки возраста
+AGE_GATE_COOKIES = {
+    'birthtime': '470682001',
+    'lastagecheckage': '1-0-1985',
+    'wants_mature_content': '1',
+}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
+}
+
+TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+DESCRIPTION_SELECTORS = [
+    "//div[contains(@class, 'game_description')]",
+    "//div[contains(@class, 'description')]",
+    "//div[contains(@class, 'game_review_description')]",
+    "//div[contains(@data-featuretarget, 'description')]",
+    "//meta[contains(@property, 'og:description')]",
+]
+
+CATEGORY_SELECTOR_GROUPS = [
+    [
+        "//div[contains(@class, 'details_block')]//a[contains(@href, '/category/')]",
+        "//div[contains(@class, 'game_details')]//a[contains(@href, '/category/')]",
+        "//div[contains(@class, 'details')]//a[contains(@href, '/category/')]",
+    ],
+    [
+        "//div[contains(@class, 'glance_tags')]//a",
+        "//div[contains(@class, 'tags')]//a",
+        "//div[contains(@class, 'game_tags')]//a",
+    ],
+    [
+        "//div[contains(@class, 'genre')]//a",
+        "//div[contains(@class, 'genres')]//a",
+        "//div[contains(@id, 'genres')]//a",
+    ],
+]
+
+_HIDDEN_STYLE = re.compile(r'display\s*:\s*none', re.IGNORECASE)
+# Браузер не показывает текст этих элементов, а блочные элементы и <br> отделяет переносом строки
+_SKIPPED_TAGS = {'script', 'style', 'template', 'noscript'}
+_BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'table', 'td', 'th', 'tr', 'ul',
+}
+
+
+def rebase_url(url: str, base_url: Optional[str]) -> str:
+    """Переносит URL магазина на другой хост (например, на локальный тестовый сервер)"""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+def _is_visible(element) -> bool:
+    """Грубая проверка видимости: ни элемент, ни его предки не скрыты через style"""
+    while element is not None:
+        if _HIDDEN_STYLE.search(element.get('style', '')):
+            return False
+        element = element.getparent()
+    return True
+
+
+def _collect_text(element, parts: List[str]):
+    """Видимый текст элемента и его потомков; хвост (tail) виден, даже если сам элемент скрыт"""
+    if isinstance(element.tag, str) and element.tag not in _SKIPPED_TAGS \
+            and not _HIDDEN_STYLE.search(element.get('style', '')):
+        separator = ' ' if element.tag in _BLOCK_TAGS else ''
+        parts.append(separator)
+        parts.append(element.text or '')
+        for child in element:
+            _collect_text(child, parts)
+        parts.append(separator)
+    parts.append(element.tail or '')
+
+
+def _element_text(element) -> str:
+    """Видимый текст элемента (аналог WebElement.text, пробелы схлопнуты)"""
+    if not _is_visible(element):
+        return ""
+    parts = [element.text or '']
+    for child in element:
+        _collect_text(child, parts)
+    return re.sub(r'\s+', ' ', ''.join(parts)).strip()
+
+
+def _meta_content(tree, xpath: str) -> str:
+    elements = tree.xpath(xpath)
+    return elements[0].get('content', '') if elements else ""
+
+
+def _extract_description(tree) -> str:
+    for selector in DESCRIPTION_SELECTORS:
+        elements = tree.xpath(selector)
+        if not elements:
+            continue
+
+        if selector.startswith("//meta"):
+            desc = elements[0].get('content', '')
+        else:
+            desc = _element_text(elements[0])
+
+        if desc and len(desc) > 10:
+            clean_desc = re.sub(r'\s+', ' ', desc).strip()
+            return clean_desc[:300] + "..." if len(clean_desc) > 300 else clean_desc
+
+    return ""
+
+
+def _extract_categories(tree) -> List[str]:
+    categories = []
+
+    for selectors in CATEGORY_SELECTOR_GROUPS:
+        for selector in selectors:
+            for element in tree.xpath(selector):
+                category = _element_text(element)
+                if category and len(category) > 2 and category not in categories:
+                    categories.append(category)
+            if categories:
+                return categories
+
+    for element in tree.xpath("//meta[contains(@property, 'genre')]"):
+        content = element.get('content')
+        if content:
+            meta_categories = [cat.strip() for cat in content.split(',')]
+            categories.extend([cat for cat in meta_categories if cat and len(cat) > 2])
+
+    return categories
+
+
+def _page_title(page_html: str) -> str:
+    match = TITLE_PATTERN.search(page_html[:20000])
+    return match.group(1) if match else ''
+
+
+def extract_game_details(page_html: str) -> Dict:
+    """Извлекает детали игры из HTML страницы (те же поля, что и SteamParserFinal.parse_game_details)"""
+    tree = lxml_html.fromstring(page_html)
+
+    return {
+        'categories': _extract_categories(tree),
+        'review_rating': _meta_content(tree, "//meta[contains(@itemprop, 'ratingValue')]"),
+        'review_count': _meta_content(tree, "//meta[contains(@itemprop, 'reviewCount')]"),
+        'image_url': _meta_content(tree, "//meta[contains(@property, 'og:image')]"),
+        'description': _extract_description(tree),
+    }
+
+
+class HttpDetailFetcher:
+    """Загрузка страниц игр по HTTP без браузера"""
+
+    def __init__(self, concurrency: int = 16, base_url: Optional[str] = None, timeout: float = 20.0,
+                 limiter: Optional[AdaptiveRateLimiter] = None, snapshots=None):
+        self.concurrency = concurrency
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limiter = limiter
+        self.snapshots = snapshots  # SnapshotStore: сохранять сырые страницы для повторного разбора
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = WorkerStats("http")
+
+    async def start(self):
+        """Создает HTTP-сессию с пулом соединений"""
+        if self.session:
+            return
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=DEFAULT_HEADERS,
+            cookies=AGE_GATE_COOKIES,
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def fetch_html(self, game_url: str) -> str:
+        """Загружает HTML страницы игры"""
+        await self.start()
+        async with limited(self.limiter):
+            async with self.session.get(rebase_url(game_url, self.base_url)) as response:
+                raise_for_throttling(response.status)
+                response.raise_for_status()
+                page_html = await response.text()
+            # Капча отдается с кодом 200, поэтому проверяем и содержимое
+            raise_for_throttling(response.status, _page_title(page_html))
+            return page_html
+
+    async def fetch_details(self, game_url: str) -> Dict:
+        """
+        Загружает страницу игры и извлекает детали.
+        Ошибки загрузки (ограничение запросов, 4xx/5xx, таймауты) пробрасываются: игра считается
+        необработанной, а не сохраняется без деталей
+        """
+        started = time.time()
+        try:
+            page_html = await self.fetch_html(game_url)
+            if self.snapshots:
+                await asyncio.to_thread(self.snapshots.save, 'detail', page_html, game_url, extract_app_id(game_url))
+            details = await asyncio.to_thread(extract_game_details, page_html)
+        except Exception:
+            self.stats.record(time.time() - started, False)
+            raise
+        self.stats.record(time.time() - started, True)
+        return details
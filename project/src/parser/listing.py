@@ -0,0 +1,172 @@
+import re
+import time
+from typing import Dict, List, Optional
+
+from project.src.utils.prices import find_discount, find_prices
+from project.src.utils.steam_urls import extract_app_id
+
+NON_GAME_URL_PARTS = ['/reviews', '/news', '/discussions', '/workshop']
+NON_GAME_TITLE_WORDS = ['отзыв', 'review', 'обзор', 'discussion', 'новость']
+PRICE_MARKERS = ['руб', '₽', 'р.', '$', '€', '%']
+UNKNOWN_TITLE = "Неизвестно"
+
+# Снимок карточек списка за один вызов execute_script.
+# Повторяет логику _find_game_blocks/_find_game_container/_extract_title/_extract_image,
+# но выполняется внутри страницы и возвращает только сырые данные карточек.
+# Разбирает только ссылки начиная с индекса arguments[2] (карточки, добавленные после прошлого скана);
+# если ссылка перед этим индексом не совпадает с arguments[3], DOM перестроен и скан идет с начала
+LISTING_SNAPSHOT_JS = r"""
+const nonGameParts = arguments[0];
+const priceMarkers = arguments[1];
+let start = arguments[2] || 0;
+const expectedLast = arguments[3] || '';
+const skipTitleWords = ['отзыв', 'review'];
+
+// Как WebElement.text: неразрывные пробелы заменяются обычными
+const visibleText = (el) => (el.innerText || '').replace(/\u00a0/g, ' ');
+
+const goodText = (text) => {
+    text = (text || '').trim();
+    if (text.length <= 3) return '';
+    const lower = text.toLowerCase();
+    return skipTitleWords.some((w) => lower.includes(w)) ? '' : text;
+};
+
+const findTitle = (container) => {
+    for (const tag of ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']) {
+        for (const el of container.getElementsByTagName(tag)) {
+            const text = goodText(visibleText(el));
+            if (text) return text;
+        }
+    }
+    for (const el of container.querySelectorAll("[class*='Title'], [class*='title']")) {
+        const text = goodText(visibleText(el));
+        if (text) return text;
+    }
+    for (const el of container.querySelectorAll("a[href*='/app/']")) {
+        const text = goodText(visibleText(el));
+        if (text) return text;
+    }
+    return '';
+};
+
+const findImage = (container) => {
+    for (const img of container.getElementsByTagName('img')) {
+        const src = img.src || '';
+        if (src.includes('header.jpg') || src.includes('capsule') || src.includes('steamstatic.com')) return src;
+    }
+    return '';
+};
+
+const links = document.querySelectorAll("a[href*='/app/']");
+let reset = false;
+if (start > links.length || (start > 0 && links[start - 1].href !== expectedLast)) {
+    start = 0;
+    reset = true;
+}
+
+const cards = [];
+for (let i = start; i < links.length; i++) {
+    const link = links[i];
+    const url = link.href || '';
+    if (!url.includes('steampowered.com/app/')) continue;
+    if (nonGameParts.some((part) => url.includes(part))) continue;
+
+    let container = link;
+    let found = null;
+    for (let level = 0; level < 3 && container.parentElement; level++) {
+        container = container.parentElement;
+        const text = visibleText(container).toLowerCase();
+        if (priceMarkers.some((marker) => text.includes(marker))) {
+            found = container;
+            break;
+        }
+    }
+    if (!found) continue;
+
+    cards.push({url: url, title: findTitle(found), text: visibleText(found), image: findImage(found)});
+}
+return {cards: cards, total: links.length, last: links.length ? links[links.length - 1].href : '', reset: reset};
+"""
+
+
+def extract_prices_from_text(text: str) -> Dict:
+    """Извлекает текущую/старую цену и скидку из текста карточки"""
+    prices = find_prices(text)
+    return {
+        'current_price': prices[-1] if prices else "",
+        'original_price': prices[0] if len(prices) > 1 else "",
+        'discount': find_discount(text)
+    }
+
+
+def clean_game_title(title: str) -> str:
+    """Очищает название игры от лишних символов"""
+    if not title:
+        return title
+
+    # Убираем лишние пробелы и переносы строк
+    clean_title = re.sub(r'\s+', ' ', title).strip()
+
+    # Убираем специфичные для Steam префиксы/суффиксы если есть
+    clean_title = re.sub(r'(™|®|©|[-–—]\s*$)', '', clean_title).strip()
+
+    return clean_title
+
+
+def build_game_from_card(card: Dict) -> Optional[Dict]:
+    """Нормализует сырую карточку из LISTING_SNAPSHOT_JS в словарь игры (как _parse_game_block)"""
+    title = card.get('title') or UNKNOWN_TITLE
+    if title == UNKNOWN_TITLE:
+        return None
+
+    # Пропускаем если это не игра (отзывы и т.д.)
+    if any(x in title.lower() for x in NON_GAME_TITLE_WORDS):
+        return None
+
+    price_data = extract_prices_from_text(card.get('text', ''))
+    url = card['url'].split('?')[0]
+
+    return {
+        'title': clean_game_title(title),
+        'current_price': price_data['current_price'],
+        'original_price': price_data['original_price'],
+        'discount': price_data['discount'],
+        'url': url,
+        'app_id': extract_app_id(url),
+        'image_url': card.get('image', ''),
+        'timestamp': time.time()
+    }
+
+
+class ListingScanner:
+    """
+    Извлекает карточки страницы списка одним вызовом execute_script.
+    Запоминает, сколько ссылок уже разобрано, и при следующем скане разбирает только новые карточки
+    """
+
+    def __init__(self):
+        self.cursor = 0  # Количество уже разобранных ссылок на странице
+        self.last_url = ''  # href последней разобранной ссылки (проверка, что DOM не перестроен)
+
+    def reset(self):
+        """Сбрасывает позицию (после перехода на другую страницу или перезагрузки)"""
+        self.cursor = 0
+        self.last_url = ''
+
+    def scan(self, driver) -> List[Dict]:
+        result = driver.execute_script(
+            LISTING_SNAPSHOT_JS, NON_GAME_URL_PARTS, PRICE_MARKERS, self.cursor, self.last_url
+        ) or {}
+        if result.get('reset'):
+            print("⚠️ Страница списка перестроена, сканируем с начала")
+
+        self.cursor = result.get('total', 0)
+        self.last_url = result.get('last', '')
+
+        games = []
+        for card in result.get('cards', []):
+            game = build_game_from_card(card)
+            if game:
+                games.append(game)
+        return games
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from project.src.parser.listing import ListingScanner
+from project.src.parser.rate_limiter import limited
+
+# Предел пачек окон за один обход (как max_clicks у 'Показать больше')
+MAX_OFFSET_BATCHES = 100
+
+
+def with_offset(url: str, offset: int) -> str:
+    """Возвращает URL списка с параметром offset (добавляет или заменяет его)"""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != 'offset']
+    query.append(('offset', str(offset)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+def offset_window_urls(url: str, start: int, count: int, page_size: int) -> List[str]:
+    """URL окон списка: count окон по page_size игр, начиная со смещения start"""
+    return [with_offset(url, start + i * page_size) for i in range(count)]
+
+
+class OffsetListingCrawler:
+    """
+    Параллельный обход списка по окнам offset= вместо последовательных нажатий 'Показать больше'.
+    Каждое окно загружается на своем драйвере из пула, результаты объединяются по app_id.
+    Обход останавливается, если пачка окон не дала ни одного нового app_id (например, URL
+    не поддерживает offset= и каждое окно повторяет первое), и после max_batches пачек
+    """
+
+    def __init__(self, pool, waiter, page_size: int = 12, limiter=None, snapshots=None,
+                 max_batches: int = MAX_OFFSET_BATCHES):
+        self.pool = pool
+        self.waiter = waiter
+        self.page_size = page_size
+        self.limiter = limiter
+        self.snapshots = snapshots
+        self.max_batches = max_batches
+
+    async def _fetch_window(self, window_url: str) -> List[Dict]:
+        async with self.pool.acquire() as driver, limited(self.limiter):
+            await asyncio.to_thread(driver.get, window_url)
+            await self.waiter.listing_ready(driver)
+            if self.snapshots:
+                page_html = await asyncio.to_thread(lambda: driver.page_source)
+                await asyncio.to_thread(self.snapshots.save, 'listing', page_html, window_url)
+            return await asyncio.to_thread(ListingScanner().scan, driver)
+
+    async def crawl(self, url: str, max_games: int, is_processed=None) -> List[Dict]:
+        """Собирает до max_games новых игр (is_processed(url) - уже обработанные), загружая окна пачками"""
+        is_processed = is_processed or (lambda game_url: False)
+        seen_ids = set()
+        games: List[Dict] = []
+        offset = 0
+        batches = 0
+
+        while len(games) < max_games:
+            if batches >= self.max_batches:
+                print(f"⏹️ Достигнут предел пачек окон списка: {self.max_batches}")
+                break
+            batches += 1
+            windows = offset_window_urls(url, offset, self.pool.size, self.page_size)
+            offset += len(windows) * self.page_size
+            print(f"🪟 Загружаем окна списка: {len(windows)} шт., до offset={offset}")
+
+            results = await asyncio.gather(*[self._fetch_window(w) for w in windows], return_exceptions=True)
+
+            window_found = False
+            new_ids = 0  # Ранее не встречавшихся app_id в пачке, включая уже обработанные
+            for window_url, result in zip(windows, results):
+                if isinstance(result, Exception):
+                    print(f"⚠️ Ошибка загрузки окна {window_url}: {result}")
+                    continue
+                if result:
+                    window_found = True
+
+                for game in result:
+                    key = game.get('app_id') or game['url']
+                    if key in seen_ids:
+                        continue
+                    seen_ids.add(key)
+                    new_ids += 1
+                    if not is_processed(game['url']):
+                        games.append(game)
+
+            # Все окна пустые - дошли до конца списка
+            if not window_found:
+                break
+            # Окна повторяют уже загруженные карточки: offset= не сдвигает список
+            if not new_ids:
+                print("⏹️ Окна списка не дали новых игр - offset= не сдвигает список, останавливаемся")
+                break
+
+        return games[:max_games]
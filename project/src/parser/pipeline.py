@@ -0,0 +1,142 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from project.src.parser.stats import WorkerStats
+
+
+class PipelineStage:
+    """
+    Стадия конвейера: своя ограниченная очередь и свое число воркеров.
+    handler получает элемент и возвращает результат для следующей стадии; None - элемент дальше не идет.
+    Пачки записи в базу собирает WriteBehindBuffer, а не конвейер
+    """
+
+    def __init__(self, name: str, handler: Callable[..., Awaitable], concurrency: int = 1, queue_size: int = 0):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or self.concurrency * 2)
+        self.next_stage: Optional['PipelineStage'] = None
+        self.workers: List[WorkerStats] = []
+        self.tasks: List[asyncio.Task] = []
+        self.dropped = 0
+        self.max_depth = 0
+        self._depth_sum = 0
+        self._depth_samples = 0
+
+    async def put(self, item):
+        """Кладет элемент в очередь стадии (ждет, если очередь заполнена - это и есть backpressure)"""
+        await self.queue.put(item)
+        depth = self.queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_sum += depth
+        self._depth_samples += 1
+
+    def start(self):
+        self.workers = [WorkerStats(f"{self.name}-{i + 1}") for i in range(self.concurrency)]
+        self.tasks = [asyncio.create_task(self._run(stats)) for stats in self.workers]
+
+    async def _run(self, stats: WorkerStats):
+        while True:
+            item = await self.queue.get()
+            started = time.time()
+            try:
+                result = await self.handler(item)
+                stats.record(time.time() - started, True)
+                await self._forward(result)
+            except Exception as e:
+                print(f"❌ [{stats.name}] Ошибка стадии: {e}")
+                stats.record(time.time() - started, False)
+            finally:
+                self.queue.task_done()
+
+    async def _forward(self, result):
+        if result is None:
+            self.dropped += 1
+            return
+        if self.next_stage is not None:
+            await self.next_stage.put(result)
+
+    async def drain(self):
+        """Дожидается обработки всех элементов очереди и останавливает воркеры"""
+        await self.queue.join()
+        await self.cancel()
+
+    async def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def summary(self) -> str:
+        processed = sum(stats.processed for stats in self.workers)
+        errors = sum(stats.errors for stats in self.workers)
+        rate = sum(stats.pages_per_second for stats in self.workers)
+        busy = sum(stats.busy_time for stats in self.workers)
+        total = processed + errors
+        avg_depth = self._depth_sum / self._depth_samples if self._depth_samples else 0.0
+        return (f"{self.name} x{self.concurrency}: {processed} ок, {errors} ошибок, {self.dropped} отсеяно, "
+                f"{rate:.2f} шт/с, {busy / total if total else 0.0:.2f} с/шт, "
+                f"очередь ср. {avg_depth:.1f} / макс {self.max_depth} из {self.queue.maxsize}")
+
+
+class CrawlPipeline:
+    """
+    Конвейер обхода из стадий, связанных ограниченными очередями.
+    Общая скорость определяется самой медленной стадией, а не суммой задержек всех шагов
+    """
+
+    def __init__(self, stages: List[PipelineStage], report_interval: float = 0,
+                 reporters: Optional[List[Callable[[], str]]] = None):
+        self.stages = stages
+        self.reporters = reporters or []  # Дополнительные метрики для периодического отчета
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage = next_stage
+        self.report_interval = report_interval
+        self._reporter: Optional[asyncio.Task] = None
+        self.started = False
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        if self.report_interval:
+            self._reporter = asyncio.create_task(self._report())
+        self.started = True
+
+    async def put(self, item):
+        await self.stages[0].put(item)
+
+    def depths(self) -> str:
+        return ", ".join(f"{stage.name}={stage.queue.qsize()}" for stage in self.stages)
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            print(f"🛤️ Очереди конвейера: {self.depths()}")
+            for reporter in self.reporters:
+                print(f"   {reporter()}")
+
+    async def close(self):
+        """Плавная остановка: стадии дорабатывают очередь по порядку"""
+        if not self.started:
+            return
+        self.started = False
+        try:
+            for stage in self.stages:
+                await stage.drain()
+        finally:
+            for stage in self.stages:
+                await stage.cancel()
+            if self._reporter:
+                self._reporter.cancel()
+                await asyncio.gather(self._reporter, return_exceptions=True)
+                self._reporter = None
+
+    def print_summary(self):
+        print("\n🛤️ Стадии конвейера:")
+        for stage in self.stages:
+            print(f"   {stage.summary()}")
+            for stats in stage.workers:
+                print(f"      {stats.summary()}")
@@ -0,0 +1,162 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+# Признаки страницы-заглушки при ограничении запросов (капча, отказ в доступе)
+RATE_LIMIT_MARKERS = (
+    'captcha',
+    'access denied',
+    'too many requests',
+    'слишком много запросов',
+    'you\'ve made too many requests',
+)
+
+
+class RateLimitedError(Exception):
+    """Магазин ответил ограничением запросов: 429/5xx или страница-заглушка"""
+
+
+def looks_rate_limited(text: Optional[str]) -> bool:
+    """Проверяет текст (заголовок или начало страницы) на признаки ограничения запросов"""
+    if not text:
+        return False
+    head = text[:4000].lower()
+    return any(marker in head for marker in RATE_LIMIT_MARKERS)
+
+
+def raise_for_throttling(status: int, text: Optional[str] = None):
+    """Поднимает RateLimitedError для 429/5xx и страниц-заглушек"""
+    if status == 429 or status >= 500:
+        raise RateLimitedError(f"HTTP {status}")
+    if looks_rate_limited(text):
+        raise RateLimitedError("страница ограничения запросов")
+
+
+class AdaptiveRateLimiter:
+    """
+    Общий ограничитель запросов к магазину: token bucket по частоте и AIMD по параллельности.
+    Пока ответы быстрые и без ошибок, частота и параллельность растут на шаг;
+    на 429/5xx, таймаутах и капче - уменьшаются вдвое
+    """
+
+    def __init__(self, rate: float = 4.0, max_rate: float = 20.0, min_rate: float = 0.5,
+                 concurrency: int = 4, max_concurrency: int = 16, min_concurrency: int = 1,
+                 latency_target: float = 5.0, rate_step: float = 0.5, decrease_factor: float = 0.5,
+                 cooldown: float = 10.0, burst: float = 2.0):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.rate_step = rate_step
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown  # После снижения столько секунд не повышаем и не снижаем повторно
+        self.burst = burst
+
+        self.in_flight = 0
+        self.tokens = burst
+        self.latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.throttles = 0
+        self._successes_since_change = 0
+        self._cooldown_until = 0.0
+        self._last_refill = time.monotonic()
+        self._condition = asyncio.Condition()
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Разрешение на один запрос: ждет свободного места по параллельности и токена по частоте"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+        try:
+            await self._take_token()
+            started = time.monotonic()
+            try:
+                yield
+            except (RateLimitedError, asyncio.TimeoutError) as e:
+                self.record_throttle(str(e) or type(e).__name__)
+                raise
+            except Exception:
+                self.requests += 1
+                self.errors += 1
+                raise
+            else:
+                self.record_success(time.monotonic() - started)
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def record_success(self, latency: float):
+        """Аддитивное увеличение: раз в 'окно' из concurrency успешных ответов"""
+        self.requests += 1
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        if time.monotonic() < self._cooldown_until or self.latency_ewma > self.latency_target:
+            return
+
+        self._successes_since_change += 1
+        if self._successes_since_change >= self.concurrency:
+            self._successes_since_change = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self.rate = min(self.max_rate, self.rate + self.rate_step)
+
+    def record_throttle(self, reason: str):
+        """Мультипликативное уменьшение (не чаще одного раза за cooldown: пачка отказов - одно событие)"""
+        self.requests += 1
+        self.throttles += 1
+        now = time.monotonic()
+        if now < self._cooldown_until:
+            return
+
+        self.concurrency = max(self.min_concurrency, math.floor(self.concurrency * self.decrease_factor))
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.tokens = 0
+        self._successes_since_change = 0
+        self._cooldown_until = now + self.cooldown
+        print(f"🐢 Ограничение запросов ({reason}): {self.rate:.1f} запр/с, параллельно {self.concurrency}")
+
+    def metrics(self) -> Dict:
+        return {
+            'rate': round(self.rate, 2),
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'latency_ewma': round(self.latency_ewma or 0.0, 3),
+            'requests': self.requests,
+            'errors': self.errors,
+            'throttles': self.throttles,
+        }
+
+    def describe(self) -> str:
+        return (f"лимит {self.rate:.1f} запр/с, параллельно {self.in_flight}/{self.concurrency}, "
+                f"задержка {self.latency_ewma or 0.0:.2f} с, ограничений {self.throttles}")
+
+    def print_summary(self):
+        if not self.requests:
+            return
+        print(f"\n🚦 Ограничитель запросов: {self.requests} запросов, {self.errors} ошибок, {self.describe()}")
+
+
+@asynccontextmanager
+async def limited(limiter: Optional[AdaptiveRateLimiter]):
+    """slot() ограничителя или пустой контекст, если ограничитель не задан"""
+    if limiter is None:
+        yield
+        return
+    async with limiter.slot():
+        yield
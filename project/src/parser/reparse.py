@@ -0,0 +1,72 @@
+"""
+Повторный разбор сохраненных страниц игр без обращения к магазину.
+Берет последний снимок каждой игры, извлекает детали в пуле процессов и обновляет их в базе.
+
+Запуск: python -m project.src.parser.reparse [--snapshots snapshots] [--workers N] [--batch 500]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from project.src.database.db_manager import DatabaseManager
+from project.src.parser.http_details import extract_game_details
+from project.src.parser.snapshots import SnapshotStore, load_snapshot
+
+
+def _reparse_snapshot(task: Tuple[str, int, str]) -> Tuple[int, Optional[Dict]]:
+    """Выполняется в дочернем процессе: читает снимок и извлекает детали"""
+    root, app_id, digest = task
+    try:
+        return app_id, extract_game_details(load_snapshot(root, digest))
+    except Exception as e:
+        print(f"❌ Не удалось разобрать снимок {app_id}: {e}")
+        return app_id, None
+
+
+def reparse_snapshots(root: str = 'snapshots', workers: Optional[int] = None, batch_size: int = 500,
+                      db_manager: Optional[DatabaseManager] = None) -> Tuple[int, int]:
+    """Разбирает последние снимки страниц игр и обновляет детали в базе; возвращает (разобрано, обновлено)"""
+    store = SnapshotStore(root)
+    tasks = [(root, app_id, digest) for app_id, _, digest in store.latest('detail')]
+    store.close()
+    db_manager = db_manager or DatabaseManager()
+    print(f"🔁 Снимков к разбору: {len(tasks)}, процессов: {workers or os.cpu_count()}")
+
+    started = time.time()
+    parsed = 0
+    updated = 0
+    pending: Dict[int, Dict] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for app_id, details in executor.map(_reparse_snapshot, tasks, chunksize=32):
+            if details is None:
+                continue
+            parsed += 1
+            pending[app_id] = details
+            if len(pending) >= batch_size:
+                updated += db_manager.update_games_details(pending)
+                pending.clear()
+
+    if pending:
+        updated += db_manager.update_games_details(pending)
+
+    elapsed = time.time() - started
+    print(f"✅ Разобрано {parsed}, обновлено в базе {updated} за {elapsed:.1f} с "
+          f"({parsed / elapsed if elapsed > 0 else 0:.0f} стр/с)")
+    return parsed, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Повторный разбор сохраненных страниц игр")
+    parser.add_argument('--snapshots', default=os.getenv("PARSER_SNAPSHOT_DIR", "snapshots"))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    reparse_snapshots(args.snapshots, args.workers, args.batch)
+
+
+if __name__ == "__main__":
+    main()
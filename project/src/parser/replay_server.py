@@ -0,0 +1,122 @@
+"""
+Запись и воспроизведение ответов магазина для воспроизводимых замеров скорости парсера.
+
+record - прокси к магазину: отдает ответы как есть и сохраняет их в каталог фикстур
+replay - отдает сохраненные ответы с заданной задержкой и разбросом, без сети
+
+Запуск:
+    python -m project.src.parser.replay_server record fixtures [--port 8770]
+    python -m project.src.parser.replay_server replay fixtures [--port 8770] [--latency 0.2] [--jitter 0.1]
+Парсер направляется на сервер через PARSER_STORE_BASE_URL=http://127.0.0.1:8770
+"""
+import argparse
+import asyncio
+import random
+import re
+from typing import Optional
+from urllib.parse import urlencode
+
+import aiohttp
+from aiohttp import web
+
+from project.src.parser.http_details import AGE_GATE_COOKIES, DEFAULT_HEADERS
+from project.src.parser.snapshots import SnapshotStore
+
+STORE_URL = "https://store.steampowered.com"
+APP_PATH_PATTERN = re.compile(r'^/app/(\d+)')
+KIND_PREFIX = 'replay-'
+
+
+def fixture_key(request: web.Request) -> str:
+    """Ключ ответа: путь и отсортированные параметры запроса"""
+    query = sorted(request.query.items())
+    return f"{request.path}?{urlencode(query)}" if query else request.path
+
+
+def _content_kind(content_type: str) -> str:
+    return f"{KIND_PREFIX}json" if 'json' in content_type else f"{KIND_PREFIX}html"
+
+
+def create_record_app(store: SnapshotStore, upstream: str = STORE_URL) -> web.Application:
+    """Прокси к магазину, сохраняющий каждый успешный ответ"""
+    session: Optional[aiohttp.ClientSession] = None
+
+    async def on_startup(app):
+        nonlocal session
+        session = aiohttp.ClientSession(headers=DEFAULT_HEADERS, cookies=AGE_GATE_COOKIES)
+
+    async def on_cleanup(app):
+        await session.close()
+
+    async def proxy(request: web.Request) -> web.Response:
+        async with session.get(f"{upstream.rstrip('/')}{request.path}", params=request.query) as response:
+            body = await response.text()
+            content_type = response.content_type or 'text/html'
+            status = response.status
+
+        if status == 200:
+            match = APP_PATH_PATTERN.match(request.path)
+            await asyncio.to_thread(
+                store.save, _content_kind(content_type), body, fixture_key(request),
+                int(match.group(1)) if match else None
+            )
+            print(f"📼 {status} {fixture_key(request)}")
+        return web.Response(text=body, status=status, content_type=content_type)
+
+    app = web.Application()
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_get('/{tail:.*}', proxy)
+    return app
+
+
+def create_replay_app(store: SnapshotStore, latency: float = 0.0, jitter: float = 0.0,
+                      seed: Optional[int] = 0) -> web.Application:
+    """Отдает записанные ответы с задержкой latency ± jitter секунд (генератор с фиксированным seed)"""
+    rng = random.Random(seed)
+
+    async def replay(request: web.Request) -> web.Response:
+        delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+        if delay:
+            await asyncio.sleep(delay)
+
+        # Сначала точное совпадение с параметрами, затем страница без параметров (например, /app/<id>/)
+        found = store.find_by_url(fixture_key(request), KIND_PREFIX) or store.find_by_url(request.path, KIND_PREFIX)
+        if not found:
+            raise web.HTTPNotFound(text=f"Нет записи для {fixture_key(request)}")
+
+        kind, digest = found
+        body = await asyncio.to_thread(store.load, digest)
+        content_type = 'application/json' if kind.endswith('json') else 'text/html'
+        return web.Response(text=body, content_type=content_type)
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', replay)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запись и воспроизведение ответов магазина Steam")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('fixtures', help="Каталог фикстур")
+    parser.add_argument('--port', type=int, default=8770)
+    parser.add_argument('--upstream', default=STORE_URL)
+    parser.add_argument('--latency', type=float, default=0.0, help="Задержка ответа, с")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Разброс задержки, ± с")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.fixtures)
+    if args.mode == 'record':
+        app = create_record_app(store, args.upstream)
+        print(f"📼 Запись ответов {args.upstream} через http://127.0.0.1:{args.port} в {args.fixtures}")
+    else:
+        app = create_replay_app(store, args.latency, args.jitter, args.seed)
+        print(f"▶️ Воспроизведение {args.fixtures} на http://127.0.0.1:{args.port} "
+              f"(задержка {args.latency} ± {args.jitter} с)")
+
+    web.run_app(app, host='127.0.0.1', port=args.port)
+
+
+if __name__ == "__main__":
+    main()
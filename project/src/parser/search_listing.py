@@ -0,0 +1,177 @@
+import asyncio
+import math
+import re
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+from lxml import html as lxml_html
+
+from project.src.parser.http_details import DEFAULT_HEADERS
+from project.src.parser.listing import clean_game_title
+from project.src.parser.rate_limiter import AdaptiveRateLimiter, limited, raise_for_throttling
+from project.src.parser.stats import WorkerStats
+
+STORE_URL = "https://store.steampowered.com"
+
+# Параметры XHR, который стоит за 'Показать больше' на странице поиска/скидок
+SEARCH_DEFAULT_PARAMS = {
+    'query': '',
+    'specials': '1',
+    'infinite': '1',
+    'l': 'russian',
+    'cc': 'ru',
+}
+# Сверх пачек, нужных на недостающие игры, держим в полете еще столько (дубли, обработанные игры)
+SEARCH_PAGES_MARGIN = 1
+
+
+def _text(row, xpath: str) -> str:
+    elements = row.xpath(xpath)
+    return re.sub(r'\s+', ' ', elements[0].text_content()).strip() if elements else ""
+
+
+def parse_search_results_html(fragment: str) -> List[Dict]:
+    """Разбирает results_html из ответа поиска в словари игр (как карточки списка)"""
+    if not fragment or not fragment.strip():
+        return []
+
+    games = []
+    for row in lxml_html.fragment_fromstring(fragment, create_parent='div').xpath(
+            "//a[contains(@class, 'search_result_row')]"):
+        app_id = (row.get('data-ds-appid') or '').split(',')[0]
+        url = (row.get('href') or '').split('?')[0]
+        title = _text(row, ".//span[contains(@class, 'title')]")
+        if not app_id.isdigit() or '/app/' not in url or not title:
+            continue
+
+        images = row.xpath(".//div[contains(@class, 'search_capsule')]//img")
+        current_price = _text(row, ".//div[contains(@class, 'discount_final_price')]")
+        original_price = _text(row, ".//div[contains(@class, 'discount_original_price')]")
+
+        games.append({
+            'title': clean_game_title(title),
+            'current_price': current_price,
+            'original_price': original_price if original_price != current_price else '',
+            'discount': _text(row, ".//div[contains(@class, 'discount_pct')]"),
+            'url': url,
+            'app_id': int(app_id),
+            'image_url': images[0].get('src', '') if images else '',
+            'timestamp': time.time()
+        })
+
+    return games
+
+
+class SearchResultsListing:
+    """Обход списка через JSON-эндпоинт /search/results/ (без браузера)"""
+
+    def __init__(self, base_url: Optional[str] = None, page_size: int = 50, concurrency: int = 4,
+                 params: Optional[Dict[str, str]] = None, timeout: float = 20.0,
+                 limiter: Optional[AdaptiveRateLimiter] = None, snapshots=None):
+        self.base_url = (base_url or STORE_URL).rstrip('/')
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.params = dict(SEARCH_DEFAULT_PARAMS)
+        if params:
+            self.params.update(params)
+        self.timeout = timeout
+        self.limiter = limiter
+        self.snapshots = snapshots
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = WorkerStats("search")
+
+    async def start(self):
+        if self.session:
+            return
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=DEFAULT_HEADERS,
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def fetch_page(self, start: int) -> Tuple[List[Dict], int]:
+        """Загружает одну пачку результатов: (игры, total_count)"""
+        await self.start()
+        params = dict(self.params, start=str(start), count=str(self.page_size))
+
+        started = time.time()
+        try:
+            async with limited(self.limiter):
+                async with self.session.get(f"{self.base_url}/search/results/", params=params) as response:
+                    raise_for_throttling(response.status)
+                    response.raise_for_status()
+                    payload = await response.json(content_type=None) or {}
+            fragment = payload.get('results_html', '')
+            if self.snapshots and fragment:
+                await asyncio.to_thread(self.snapshots.save, 'listing', fragment, f"search?start={start}")
+            games = await asyncio.to_thread(parse_search_results_html, fragment)
+            self.stats.record(time.time() - started, True)
+            return games, int(payload.get('total_count') or 0)
+        except Exception:
+            self.stats.record(time.time() - started, False)
+            raise
+
+    async def iter_games(self, max_games: int, is_processed=None) -> AsyncIterator[Dict]:
+        """
+        Отдает новые игры по мере загрузки пачек. В полете держит столько пачек, сколько нужно
+        на недостающие до max_games игры, плюс SEARCH_PAGES_MARGIN; следующие пачки планирует,
+        только пока новых игр не хватает (дубли и уже обработанные игры)
+        """
+        is_processed = is_processed or (lambda game_url: False)
+        seen_ids = set()
+        yielded = 0
+
+        first_page, total_count = await self.fetch_page(0)
+        print(f"🔎 Всего в поиске: {total_count}, нужно новых игр: {max_games}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = set()
+        next_start = self.page_size
+
+        async def fetch(start):
+            async with semaphore:
+                return await self.fetch_page(start)
+
+        def schedule():
+            nonlocal next_start
+            needed = math.ceil((max_games - yielded) / self.page_size) + SEARCH_PAGES_MARGIN
+            while len(pending) < needed and next_start < total_count:
+                pending.add(asyncio.create_task(fetch(next_start)))
+                next_start += self.page_size
+
+        try:
+            pages = [first_page]
+            while True:
+                for games in pages:
+                    for game in games:
+                        if game['app_id'] in seen_ids or is_processed(game['url']):
+                            continue
+                        seen_ids.add(game['app_id'])
+                        yield game
+                        yielded += 1
+                        if yielded >= max_games:
+                            return
+
+                schedule()
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                pages = []
+                for task in done:
+                    try:
+                        games, _ = task.result()
+                        pages.append(games)
+                    except Exception as e:
+                        print(f"⚠️ Ошибка загрузки пачки поиска: {e}")
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,126 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Без zstandard снимки сжимаются gzip
+    zstandard = None
+
+
+class SnapshotStore:
+    """
+    Хранилище сырых страниц для повторного разбора без обхода магазина.
+    Содержимое лежит сжатым в файлах с именем по sha256 (одинаковые страницы хранятся один раз),
+    а индекс в SQLite связывает app_id, тип страницы и время загрузки с хешем
+    """
+
+    def __init__(self, root: str = 'snapshots', compression: Optional[str] = None):
+        self.root = root
+        self.compression = compression or ('zstd' if zstandard else 'gzip')
+        if self.compression == 'zstd' and zstandard is None:
+            raise RuntimeError("Для сжатия zstd нужен пакет zstandard")
+
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                app_id INTEGER,
+                url TEXT,
+                fetched_at REAL NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshots_app ON snapshots (kind, app_id, fetched_at);
+            CREATE INDEX IF NOT EXISTS idx_snapshots_url ON snapshots (url);
+        """)
+        self._lock = threading.Lock()  # save() вызывается из потоков asyncio.to_thread
+        self.saved = 0
+        self.bytes_raw = 0
+        self.bytes_stored = 0
+
+    def _blob_path(self, digest: str, compression: str) -> str:
+        extension = 'zst' if compression == 'zstd' else 'gz'
+        return os.path.join(self.root, 'blobs', digest[:2], f"{digest}.html.{extension}")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def save(self, kind: str, page_html: str, url: str = '', app_id: Optional[int] = None,
+             fetched_at: Optional[float] = None) -> str:
+        """Сохраняет страницу (kind: 'detail' или 'listing') и возвращает ее хеш"""
+        data = page_html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest, self.compression)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = self._compress(data)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            self.bytes_stored += len(compressed)
+        self.bytes_raw += len(data)  # Счетчики только для отчета, точность под нагрузкой не важна
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO snapshots (kind, app_id, url, fetched_at, digest) VALUES (?, ?, ?, ?, ?)",
+                (kind, app_id, url, fetched_at or time.time(), digest)
+            )
+            self.saved += 1
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Читает страницу по хешу (в любом из форматов сжатия)"""
+        return load_snapshot(self.root, digest)
+
+    def latest(self, kind: str = 'detail') -> Iterator[Tuple[int, str, str]]:
+        """Последний снимок каждой игры: (app_id, url, digest)"""
+        rows = self.conn.execute("""
+            SELECT s.app_id, s.url, s.digest FROM snapshots s
+            JOIN (
+                SELECT app_id, MAX(fetched_at) AS fetched_at FROM snapshots
+                WHERE kind = ? AND app_id IS NOT NULL GROUP BY app_id
+            ) last ON last.app_id = s.app_id AND last.fetched_at = s.fetched_at
+            WHERE s.kind = ?
+        """, (kind, kind))
+        yield from rows
+
+    def find_by_url(self, url: str, kind_prefix: str = '') -> Optional[Tuple[str, str]]:
+        """Последний снимок по точному URL: (kind, digest) или None"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT kind, digest FROM snapshots WHERE url = ? AND kind LIKE ? ORDER BY fetched_at DESC LIMIT 1",
+                (url, f"{kind_prefix}%")
+            ).fetchone()
+
+    def print_summary(self):
+        if not self.saved:
+            return
+        ratio = self.bytes_raw / self.bytes_stored if self.bytes_stored else 0.0
+        print(f"\n🗄️ Снимки страниц: {self.saved} шт., {self.bytes_raw / 1024 / 1024:.1f} МБ -> "
+              f"{self.bytes_stored / 1024 / 1024:.1f} МБ на диске (x{ratio:.1f}, {self.compression})")
+
+    def close(self):
+        self.conn.close()
+
+
+def load_snapshot(root: str, digest: str) -> str:
+    """Читает снимок по хешу; отдельная функция, чтобы ее можно было вызывать в дочерних процессах"""
+    base = os.path.join(root, 'blobs', digest[:2], f"{digest}.html")
+    if os.path.exists(f"{base}.zst"):
+        if zstandard is None:
+            raise RuntimeError("Снимок сжат zstd, нужен пакет zstandard")
+        with open(f"{base}.zst", 'rb') as f:
+            return zstandard.ZstdDecompressor().decompress(f.read()).decode('utf-8')
+    with open(f"{base}.gz", 'rb') as f:
+        return gzip.decompress(f.read()).decode('utf-8')
@@ -0,0 +1,54 @@
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class WorkerStats:
+    """Статистика одного воркера (драйвера или HTTP-клиента)"""
+    name: str
+    processed: int = 0
+    errors: int = 0
+    busy_time: float = 0.0  # Суммарное время обработки, сек
+    started_at: float = field(default_factory=time.time)
+    times: List[float] = field(default_factory=list, repr=False)  # Время каждой страницы (для перцентилей)
+
+    def record(self, elapsed: float, success: bool):
+        """Учитывает одну обработанную страницу"""
+        self.busy_time += elapsed
+        self.times.append(elapsed)
+        if success:
+            self.processed += 1
+        else:
+            self.errors += 1
+
+    @property
+    def total(self) -> int:
+        return self.processed + self.errors
+
+    @property
+    def pages_per_second(self) -> float:
+        """Пропускная способность по времени жизни воркера"""
+        elapsed = time.time() - self.started_at
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def avg_time(self) -> float:
+        """Среднее время обработки одной страницы"""
+        return self.busy_time / self.total if self.total else 0.0
+
+    def percentile(self, q: float) -> float:
+        return percentile(self.times, q)
+
+    def summary(self) -> str:
+        return (f"{self.name}: {self.processed} ок, {self.errors} ошибок, "
+                f"{self.avg_time:.2f} с/стр, {self.pages_per_second:.2f} стр/с")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль q (0..100) по ближайшему рангу"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
@@ -4,181 +4,629 @@ import sys
 import os
 import time
 import re
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
 
 current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, current_dir)
 
 from project.src.database.db_manager import DatabaseManager
 from project.src.database.config import get_database_config
-from project.src.utils.progress_manager import save_progress, load_progress
+from project.src.utils.progress_manager import CrawlCheckpoint
+from project.src.utils.app_id_set import AppIdBitmap, create_app_id_set
+from project.src.utils.steam_urls import extract_app_id
+from project.src.parser.config import get_parser_config
+from project.src.parser.driver_pool import DriverPool, create_firefox_driver
+from project.src.parser.waits import PageWaiter
+from project.src.parser.http_details import (
+    CATEGORY_SELECTOR_GROUPS, DESCRIPTION_SELECTORS, HttpDetailFetcher, rebase_url
+)
+from project.src.parser.appdetails import AppDetailsFetcher
+from project.src.parser.listing import ListingScanner, extract_prices_from_text, clean_game_title
+from project.src.parser.offset_listing import OffsetListingCrawler
+from project.src.parser.search_listing import SearchResultsListing
+from project.src.parser.browser_profile import PageLoadMetrics, collect_page_metrics
+from project.src.parser.driver_lifecycle import DriverWatchdog
+from project.src.parser.pipeline import CrawlPipeline, PipelineStage
+from project.src.parser.snapshots import SnapshotStore
+from project.src.parser.write_buffer import WriteBehindBuffer
+from project.src.parser.rate_limiter import AdaptiveRateLimiter, RateLimitedError, limited, looks_rate_limited
 
 
 class SteamParserFinal:
-    def __init__(self):
+    def __init__(self, parser_config=None, db_manager: Optional[DatabaseManager] = None):
         self.logger = logging.getLogger(__name__)
-        config = get_database_config()
-        self.db_manager = DatabaseManager(config)
-        self.processed_urls = set()
-        self.driver = None
-
-        # Загружаем прогресс
-        self.last_page_url, parsed_urls_set, self.total_parsed = load_progress()
-
-        # Объединяем обработанные URL из прогресса
-        if parsed_urls_set:
-            self.processed_urls.update(parsed_urls_set)
+        # db_manager можно передать извне (замеры и проверки пишут во временную базу)
+        self.db_manager = db_manager or DatabaseManager(get_database_config())
+        self.config = parser_config or get_parser_config()
+        self.driver = None  # Драйвер страницы со списком игр
+        self.pool = None  # Пул драйверов для страниц игр
+        self.http_fetcher = None  # HTTP-загрузчик деталей игр (detail_backend == 'http' или 'appdetails')
+        self.pipeline: Optional[CrawlPipeline] = None
+        self.write_buffer: Optional[WriteBehindBuffer] = None  # Отложенная запись игр в базу пачками
+        self.waiter = PageWaiter()
+        self.listing_scanner = ListingScanner()
+        self._detail_handle = None  # Вкладка для страниц игр при работе с одним драйвером
+        self.page_metrics = PageLoadMetrics()
+        self.watchdog = DriverWatchdog(
+            self.config.driver_max_pages, self.config.driver_max_rss_mb, self.config.driver_check_every
+        )
+        # Один ограничитель на все запросы к магазину: пул драйверов, HTTP-загрузчики, поиск
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=self.config.rate_limit_rps,
+            max_rate=self.config.rate_limit_max_rps,
+            concurrency=self.config.rate_limit_concurrency,
+            max_concurrency=self.config.rate_limit_max_concurrency,
+            latency_target=self.config.rate_limit_latency_target
+        )
+        self.snapshots = SnapshotStore(self.config.snapshot_dir) if self.config.snapshot_dir else None
+        self._listing_restored = False  # Драйвер списка перезапущен, позиция восстанавливается
+        self._listing_clicks = 0  # Нажатий 'Показать больше' после загрузки last_page_url
+        self._dispatched_ids = AppIdBitmap()  # app_id, переданные на обработку в этой сессии
+        self.known_games: Dict[int, Optional[datetime]] = {}  # app_id -> last_checked (режим обновления цен)
+        self._price_updates = 0
+
+        # Загружаем прогресс: читаются только курсор и счетчик, история остается на диске
+        self.checkpoint = CrawlCheckpoint(self.config.checkpoint_path)
+        self.last_page_url = self.checkpoint.last_cursor
+        self.total_parsed = self.checkpoint.total_processed
+
+        # Обработанные app_id держим в компактном множестве, чтобы не ходить в SQLite за каждой карточкой.
+        # Множество сохраняется в чекпоинте целиком и читается одним запросом; если оно отстало от журнала,
+        # промахи сверяются с чекпоинтом по первичному ключу
+        self.processed_ids = create_app_id_set(self.config.dedupe_set, self.config.dedupe_capacity)
+        self._processed_ids_complete = self.checkpoint.load_processed_set(self.processed_ids)
 
     async def init_driver(self):
-        """Инициализация одного драйвера с правильными настройки"""
-        if self.driver:
+        """Инициализация драйвера списка игр и пула драйверов для страниц игр"""
+        if not self.driver and self._needs_main_driver():
+            self.driver = self._create_main_driver()
+            print("✅ Драйвер инициализирован")
+
+        if self.config.detail_backend in ('http', 'appdetails'):
+            if not self.http_fetcher:
+                if self.config.detail_backend == 'http':
+                    self.http_fetcher = HttpDetailFetcher(
+                        self.config.http_concurrency, self.config.store_base_url,
+                        limiter=self.rate_limiter, snapshots=self.snapshots
+                    )
+                else:
+                    self.http_fetcher = AppDetailsFetcher(
+                        self.config.http_concurrency, self.config.store_base_url, limiter=self.rate_limiter
+                    )
+                await self.http_fetcher.start()
+        elif self.config.detail_workers > 0 and not self.pool:
+            self.pool = DriverPool(
+                self.config.detail_workers, self.config.headless,
+                self.config.lean_browser, self.config.browser_cache_dir, self.watchdog
+            )
+            await self.pool.start()
+
+    def _needs_main_driver(self) -> bool:
+        """Драйвер списка нужен для 'Показать больше' и для обработки игр без пула и HTTP-бэкенда"""
+        if self.config.listing_mode == 'click':
+            return True
+        return self.config.detail_backend == 'selenium' and self.config.detail_workers <= 0
+
+    def _create_main_driver(self):
+        """Создает основной драйвер (страница списка)"""
+        cache_dir = os.path.join(self.config.browser_cache_dir, "listing")
+        return create_firefox_driver(self.config.headless, self.config.lean_browser, cache_dir)
+
+    async def _maybe_recycle_main_driver(self, restore_listing: bool):
+        """Перезапускает основной драйвер при превышении порогов и возвращает его на последнюю страницу списка"""
+        reason = self.watchdog.should_recycle(self.driver)
+        if not reason:
             return
 
-        firefox_options = Options()
-        firefox_options.add_argument("--headless")
-        firefox_options.add_argument("--no-sandbox")
-        firefox_options.add_argument("--disable-dev-shm-usage")
-        firefox_options.add_argument("--window-size=1920,1080")
-
-        self.driver = webdriver.Firefox(options=firefox_options)
-        print("✅ Драйвер инициализирован")
+        self.driver = await self.watchdog.restart(self.driver, self._create_main_driver, reason)
+        self._detail_handle = None
+        self.listing_scanner.reset()
+
+        if restore_listing and self.last_page_url:
+            # 'Показать больше' не меняет URL: открываем последнюю страницу и повторяем нажатия.
+            # Повторы не входят в max_clicks и не считаются watchdog, иначе длинный список
+            # перезапускал бы драйвер по кругу; уже обработанные игры отсеются дедупликацией
+            await asyncio.to_thread(self.driver.get, self.last_page_url)
+            await self.waiter.listing_ready(self.driver)
+            replayed = 0
+            while replayed < self._listing_clicks and await self._load_next_page():
+                replayed += 1
+            print(f"⏩ Позиция списка восстановлена: {replayed}/{self._listing_clicks} нажатий")
+            self._listing_clicks = replayed
+            self._listing_restored = True
 
     async def close_driver(self):
-        """Закрывает драйвер"""
+        """Закрывает драйвер и пул драйверов"""
         if self.driver:
             self.driver.quit()
             self.driver = None
+            self._detail_handle = None
             print("✅ Драйвер закрыт")
 
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+        if self.http_fetcher:
+            await self.http_fetcher.close()
+            self.http_fetcher = None
+
     async def parse_page_and_save_immediate(self, url: str, max_games: int = 500):
-        """Парсит страницу с использованием одного драйвера и асинхронно обрабатывает игры"""
+        """Парсит страницу списка одним драйвером, а страницы игр обрабатывает пулом драйверов"""
         await self.init_driver()
-        saved = 0
-        errors = 0
+        self._saved = 0
+        self._errors = 0
+        self._price_updates = 0
+
+        if self.config.refresh_mode:
+            # Обновление цен идет по всему списку заново, курсор прошлого обхода не нужен
+            self.known_games = await self.db_manager.get_known_games_last_checked_async()
+            self.last_page_url = None
+            print(f"🔄 Режим обновления цен: известных игр в базе {len(self.known_games)}, "
+                  f"TTL деталей {self.config.detail_ttl_hours:g} ч")
+
+        # Запись в базу идет в фоне: обход не ждет коммитов, пока буфер не переполнен
+        self.write_buffer = WriteBehindBuffer(
+            self._flush_writes,
+            batch_size=self.config.write_batch_size,
+            flush_interval=self.config.write_flush_interval,
+            max_pending=self.config.write_buffer_max,
+            workers=self.config.write_workers
+        )
+        self.write_buffer.start()
+
+        if self.config.refresh_mode and isinstance(self.http_fetcher, AppDetailsFetcher):
+            await self._refresh_known_prices()
+
+        # Конвейер страниц игр: детали (пул драйверов или HTTP) -> нормализация -> буфер записи
+        pipeline = None
+        if self.pool or self.http_fetcher:
+            pipeline = self._create_pipeline()
+            pipeline.start()
+        self.pipeline = pipeline
 
         try:
-            # Загружаем последнюю страницу или начинаем сначала
-            if self.last_page_url:
-                print(f"🔁 Продолжаем с: {self.last_page_url}")
-                self.driver.get(self.last_page_url)
-            else:
-                print("🚀 Начинаем с первой страницы")
-                self.driver.get(url)
+            await self._crawl(url, max_games, pipeline)
+        except Exception as e:
+            print(f"❌ Критическая ошибка: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            if pipeline is not None:
+                # При ошибке тоже дописываем то, что уже в конвейере
+                await pipeline.close()
+                self._print_pipeline_stats()
+            # Финальная запись буфера, в том числе после ошибки обхода
+            await self.write_buffer.close()
+            print(f"💾 Отложенная запись: {self.write_buffer.summary()}")
+            self.waiter.print_summary()
+            self.page_metrics.print_summary()
+            self.watchdog.print_summary()
+            self.rate_limiter.print_summary()
+            if self.snapshots:
+                self.snapshots.print_summary()
+            if self.config.refresh_mode:
+                print(f"🔄 Обновлено цен без открытия страницы игры: {self._price_updates}")
+            print(f"🧮 Дедупликация: {len(self.processed_ids)} app_id, "
+                  f"{self.processed_ids.memory_bytes / 1024:.0f} КБ ({self.config.dedupe_set})")
+
+            # Сохраняем финальный прогресс вместе с множеством обработанных app_id
+            self._processed_ids_complete = self.checkpoint.save_processed_set(
+                self.processed_ids, self._processed_ids_complete
+            )
 
-            time.sleep(5)
+        # Счетчики читаем после финальной записи буфера: сохраненные игры учитываются в _flush_writes
+        return self._saved, self._errors
 
-            games_count = 0
-            click_count = 0
-            max_clicks = 100
-            page_number = 1
+    async def _crawl(self, url: str, max_games: int, pipeline):
+        """Обход списка выбранным способом; конвейер и буфер записи закрывает вызывающий код"""
+        # Сначала дообрабатываем фронтир прошлой сессии, список открываем только после него
+        max_games -= await self._resume_frontier(max_games, pipeline)
+        if max_games <= 0:
+            return
 
-            while games_count < max_games and click_count < max_clicks:
-                print(f"\n📄 Страница {page_number}, собрано игр: {games_count}/{max_games}")
+        if self.config.listing_mode == 'offset':
+            # Окна списка загружаются параллельно, драйвер списка не нужен
+            for game, game_url in await self._crawl_offset_listing(url, max_games):
+                await self._dispatch_game(game, game_url, pipeline, return_to_listing=False)
+            return
 
-                # Парсим игры с текущей страницы
-                current_games = self._find_game_blocks()
-                filtered_games = self._filter_unique_games(current_games)
+        if self.config.listing_mode == 'search':
+            # Список берется из JSON-эндпоинта поиска, игры сразу уходят в очередь страниц игр
+            await self._crawl_search_listing(max_games, pipeline)
+            return
 
-                if not filtered_games:
-                    print("⚠️ На странице не найдено игр")
+        # Загружаем последнюю страницу или начинаем сначала
+        if self.last_page_url:
+            print(f"🔁 Продолжаем с: {self.last_page_url}")
+            await asyncio.to_thread(self.driver.get, self.last_page_url)
+        else:
+            print("🚀 Начинаем с первой страницы")
+            await asyncio.to_thread(self.driver.get, rebase_url(url, self.config.store_base_url))
+
+        await self.waiter.listing_ready(self.driver)
+        self.listing_scanner.reset()
+        self._listing_clicks = 0
+        await self._record_page_metrics('listing', self.driver)
+
+        if self.config.crawl_mode == 'frontier':
+            # Сначала собираем все ссылки со страницы списка, затем обходим страницы игр,
+            # не возвращаясь к списку
+            frontier = []
+
+            async def collect(game, game_url):
+                self._add_to_frontier(game, game_url)
+                frontier.append((game, game_url))
+
+            await self._scan_listing(max_games, collect)
+            print(f"🧭 Собрано ссылок на игры: {len(frontier)}, переходим к страницам игр")
+
+            for game, game_url in frontier:
+                await self._dispatch_game(game, game_url, pipeline, return_to_listing=False)
+        else:
+            async def dispatch(game, game_url):
+                await self._dispatch_game(game, game_url, pipeline, return_to_listing=True)
+
+            await self._scan_listing(max_games, dispatch)
+
+    async def _scan_listing(self, max_games: int, handle_game):
+        """Обходит страницу списка, подгружая новые игры, и передает каждую новую игру в handle_game"""
+        seen_urls = set()
+        seen_titles = set()
+        games_count = 0
+        click_count = 0
+        max_clicks = 100
+        page_number = 1
+
+        while games_count < max_games and click_count < max_clicks:
+            print(f"\n📄 Страница {page_number}, собрано игр: {games_count}/{max_games}")
+
+            # Парсим только карточки, добавленные после прошлого скана
+            current_games = self._find_game_blocks()
+            filtered_games = self._filter_unique_games(current_games, seen_titles, seen_urls)
+
+            if not filtered_games and not self._listing_restored:
+                print("⚠️ На странице не найдено новых игр")
+                break
+            if filtered_games:
+                self._listing_restored = False
+
+            for game in filtered_games:
+                if games_count >= max_games:
                     break
 
-                # Обрабатываем игры на текущей странице
-                for game in filtered_games:
-                    if games_count >= max_games:
-                        break
-
-                    game_url = game.get('url')
-                    if game_url and game_url not in self.processed_urls:
-                        print(f"🎮 Обрабатываем игру: {game.get('title', 'Unknown')}")
-
-                        # Обрабатываем игру
-                        success = await self.process_single_game_async(game, game_url)
-
-                        if success:
-                            saved += 1
-                            self.total_parsed += 1
-                            self.processed_urls.add(game_url)
-                            print(
-                                f"✅ [{self.total_parsed}] {game.get('title', 'Unknown')} - {game.get('current_price', '?')}")
-                        else:
-                            errors += 1
-
-                        games_count += 1
-
-                # Сохраняем прогресс после каждой страницы (сохраняем URL страницы)
-                self.last_page_url = self.driver.current_url
-                save_progress(self.last_page_url, list(self.processed_urls))
-                print(f"💾 Прогресс: {saved}/{max_games} игр сохранено, всего: {self.total_parsed}")
-
-                # Загружаем следующую страницу
-                if games_count < max_games:
-                    if await self._load_next_page():
-                        click_count += 1
-                        page_number += 1
-                        print(f"🔽 Загружаем следующую страницу... ({click_count}/{max_clicks})")
-                        time.sleep(3)
-                    else:
-                        print("⏹️ Кнопка 'Показать больше' не найдена - достигнут конец")
-                        break
+                game_url = game.get('url')
+                if not game_url or self._is_processed(game_url):
+                    continue
 
-            return saved, errors
+                await handle_game(game, game_url)
+                games_count += 1
 
-        except Exception as e:
-            print(f"❌ Критическая ошибка: {e}")
-            import traceback
-            traceback.print_exc()
-            return saved, errors
+            # Сохраняем прогресс после каждой страницы (сохраняем URL страницы)
+            current_url = self.driver.current_url
+            if current_url != self.last_page_url:
+                self._listing_clicks = 0  # Позиция записана в самом URL (offset=)
+            self.last_page_url = current_url
+            if not self.config.refresh_mode:
+                self.checkpoint.set_cursor(self.last_page_url)
+            print(f"💾 Прогресс: {self._saved}/{max_games} игр сохранено, всего: {self.total_parsed}")
+
+            # Загружаем следующую страницу
+            if games_count < max_games:
+                await self._maybe_recycle_main_driver(restore_listing=True)
+                if await self._load_next_page():
+                    self.watchdog.note_page(self.driver)
+                    self._listing_clicks += 1
+                    click_count += 1
+                    page_number += 1
+                    print(f"🔽 Загружаем следующую страницу... ({click_count}/{max_clicks})")
+                else:
+                    print("⏹️ Кнопка 'Показать больше' не найдена - достигнут конец")
+                    break
+
+    async def _crawl_offset_listing(self, url: str, max_games: int) -> List[tuple]:
+        """Собирает игры параллельной загрузкой окон offset= на драйверах пула"""
+        pool = self.pool
+        own_pool = pool is None
+        if own_pool:
+            pool = DriverPool(
+                self.config.listing_workers, self.config.headless,
+                self.config.lean_browser, self.config.browser_cache_dir
+            )
+            await pool.start()
+
+        try:
+            started = time.time()
+            crawler = OffsetListingCrawler(
+                pool, self.waiter, self.config.listing_page_size, self.rate_limiter, self.snapshots
+            )
+            games = await crawler.crawl(
+                rebase_url(url, self.config.store_base_url), max_games, is_processed=self._is_processed
+            )
+            games = self._filter_unique_games(games)
+            print(f"🧭 Найдено игр в окнах списка: {len(games)} за {time.time() - started:.1f} с")
+            return [(game, game['url']) for game in games]
+        finally:
+            if own_pool:
+                await pool.close()
+
+    async def _crawl_search_listing(self, max_games: int, pipeline):
+        """Обходит список через /search/results/ и передает игры на обработку по мере загрузки"""
+        listing = SearchResultsListing(
+            self.config.store_base_url,
+            page_size=self.config.search_page_size,
+            concurrency=self.config.listing_workers,
+            limiter=self.rate_limiter,
+            snapshots=self.snapshots
+        )
+        try:
+            seen_titles = set()
+            async for game in listing.iter_games(max_games, is_processed=self._is_processed):
+                if self._filter_unique_games([game], seen_titles, set()):
+                    await self._dispatch_game(game, game['url'], pipeline, return_to_listing=False)
         finally:
-            # Сохраняем финальный прогресс
-            save_progress(self.last_page_url, list(self.processed_urls))
+            print(f"   Список {listing.stats.summary()}")
+            await listing.close()
+
+    async def _resume_frontier(self, max_games: int, pipeline) -> int:
+        """Передает на обработку игры фронтира, сохраненного прошлой сессией; возвращает их количество"""
+        frontier = self.checkpoint.load_frontier(max_games)
+        if not frontier:
+            return 0
+
+        print(f"📬 Продолжаем с фронтира: {len(frontier)} игр без повторного обхода списка")
+        resumed = 0
+        for game, game_url in frontier:
+            if self._is_processed(game_url):
+                continue
+            await self._dispatch_game(game, game_url, pipeline, return_to_listing=False)
+            resumed += 1
+        return resumed
+
+    async def _refresh_known_prices(self):
+        """
+        Режим обновления цен с бэкендом appdetails: цены известных игр со свежими деталями
+        загружаются пачками по app_id, без карточек списка. Обход списка потом пропускает эти игры
+        и открывает только новые и устаревшие
+        """
+        app_ids = [app_id for app_id in self.known_games if self._is_price_only(app_id)]
+        if not app_ids:
+            return
 
-    async def process_single_game_async(self, game: Dict, game_url: str) -> bool:
-        """Асинхронно обрабатывает одну игру (без создания нового драйвера)"""
+        started = time.time()
+        prices = await self.http_fetcher.fetch_prices_batch(app_ids)
+        queued = 0
+        for app_id, price in prices.items():
+            if not price.get('current_price'):
+                continue  # Бесплатная или снятая с продажи игра: цены из списка, если она там есть
+            game_url = f"https://store.steampowered.com/app/{app_id}/"
+            self._dispatched_ids.add(app_id)
+            await self.write_buffer.add((dict(price, title=f"app {app_id}", url=game_url), game_url, True))
+            queued += 1
+        print(f"💲 Цены известных игр через appdetails: {queued} из {len(app_ids)} "
+              f"за {time.time() - started:.1f} с")
+
+    def _add_to_frontier(self, game: Dict, game_url: str):
+        """Сохраняет найденную игру во фронтир чекпоинта"""
+        app_id = extract_app_id(game_url)
+        if app_id:
+            self.checkpoint.add_to_frontier(app_id, game_url, game)
+
+    async def _dispatch_game(self, game: Dict, game_url: str, pipeline, return_to_listing: bool):
+        """Передает игру в конвейер или обрабатывает ее на основном драйвере"""
+        app_id = extract_app_id(game_url)
+        if app_id:
+            self._dispatched_ids.add(app_id)
+
+        if self._is_price_only(app_id):
+            # Известная игра со свежими деталями: хватает цен из карточки списка
+            await self.write_buffer.add((game, game_url, True))
+            return
+
+        self._add_to_frontier(game, game_url)
+
+        if pipeline is not None:
+            # Драйвер списка остается на месте, страницу игры откроет воркер (ждем, если очередь полна)
+            await pipeline.put((game, game_url))
+            return
+
+        print(f"🎮 Обрабатываем игру: {game.get('title', 'Unknown')}")
+        if return_to_listing:
+            success = await self.process_single_game_async(game, game_url)
+        else:
+            success = await self.process_game_on_driver(game, game_url, self.driver)
+            await self._maybe_recycle_main_driver(restore_listing=False)
+        # Успешные игры учитываются после записи буфера
+        if not success:
+            self._register_result(game, game_url, False)
+
+    def _create_pipeline(self) -> CrawlPipeline:
+        """Собирает конвейер: у каждой стадии своя очередь и свое число воркеров"""
+        detail_workers = self.config.http_concurrency if self.http_fetcher else self.config.detail_workers
+        return CrawlPipeline([
+            PipelineStage("detail", self._detail_stage, detail_workers),
+            PipelineStage("normalize", self._normalize_stage, 1, queue_size=detail_workers * 2),
+        ], report_interval=self.config.pipeline_report_interval,
+            reporters=[self.rate_limiter.describe, self.write_buffer.describe])
+
+    async def _detail_stage(self, item: tuple) -> Optional[tuple]:
+        """Стадия деталей: загружает страницу игры на свободном драйвере или по HTTP"""
+        game, game_url = item
+        print(f"🎮 Обрабатываем игру: {game.get('title', 'Unknown')}")
         try:
-            # Сохраняем текущий URL страницы с играми
-            current_page_url = self.driver.current_url
-
-            # Переходим на страницу игры для парсинга деталей
-            self.driver.get(game_url)
-            time.sleep(2)  # Ждем загрузки
-
-            # Парсим детальную информацию
-            details = self.parse_game_details(game_url)
-            if details:
-                game.update(details)
-
-            # Проверяем обязательные поля
-            if not self._validate_game_data(game):
-                print(f"❌ Пропускаем игру с неполными данными: {game.get('title')}")
-                # Возвращаемся на страницу с играми
-                self.driver.get(current_page_url)
-                time.sleep(1)
+            if self.http_fetcher:
+                details = await self.http_fetcher.fetch_details(game_url)
+            else:
+                async with self.pool.acquire() as driver:
+                    details = await self._fetch_details_on_driver(game_url, driver)
+        except Exception as e:
+            print(f"❌ Ошибка обработки игры {game_url}: {e}")
+            self._register_result(game, game_url, False)
+            return None
+        return game, game_url, details
+
+    async def _normalize_stage(self, item: tuple) -> Optional[tuple]:
+        """Стадия нормализации: дополняет карточку деталями, проверяет данные и кладет игру в буфер записи"""
+        game, game_url, details = item
+        if not self._merge_details(game, details):
+            self._register_result(game, game_url, False)
+            return None
+        await self.write_buffer.add((game, game_url, False))
+        return game, game_url
+
+    async def _flush_writes(self, batch: List[tuple]):
+        """Запись буфера: новые и полные карточки одной транзакцией, затем цены известных игр - второй"""
+        games = [(game, game_url) for game, game_url, price_only in batch if not price_only]
+        if games:
+            try:
+                saved_ids = await self.db_manager.save_games_bulk_async([game for game, _ in games])
+            except Exception:
+                for game, game_url in games:
+                    self._register_result(game, game_url, False)
+                raise
+            for game, game_url in games:
+                self._register_result(game, game_url, extract_app_id(game_url) in saved_ids)
+
+        price_games = [(game, game_url) for game, game_url, price_only in batch if price_only]
+        if price_games:
+            try:
+                updated_ids = await self.db_manager.update_prices_bulk_async([game for game, _ in price_games])
+            except Exception:
+                for game, game_url in price_games:
+                    self._register_result(game, game_url, False)
+                raise
+            for game, game_url in price_games:
+                success = extract_app_id(game_url) in updated_ids
+                if success:
+                    self._price_updates += 1
+                self._register_result(game, game_url, success)
+
+    def _register_result(self, game: Dict, game_url: str, success: bool):
+        """Учитывает результат обработки игры"""
+        app_id = extract_app_id(game_url)
+        if success:
+            self._saved += 1
+            self.total_parsed += 1
+            if app_id:
+                self.processed_ids.add(app_id)
+                self.checkpoint.mark_processed(app_id, game_url)
+            print(f"✅ [{self.total_parsed}] {game.get('title', 'Unknown')} - {game.get('current_price', '?')}")
+        else:
+            self._errors += 1
+            # Ошибочная игра не остается во фронтире, иначе каждый перезапуск начинался бы с нее
+            if app_id:
+                self.checkpoint.drop_from_frontier(app_id)
+
+    def _is_price_only(self, app_id: Optional[int]) -> bool:
+        """В режиме обновления цен: игра есть в базе и ее детали моложе TTL"""
+        if not self.config.refresh_mode or app_id not in self.known_games:
+            return False
+        last_checked = self.known_games[app_id]
+        return last_checked is not None and \
+            datetime.utcnow() - last_checked < timedelta(hours=self.config.detail_ttl_hours)
+
+    def _is_processed(self, game_url: str) -> bool:
+        """Игра уже обработана в этой или прошлых сессиях (или уже передана на обработку)"""
+        app_id = extract_app_id(game_url)
+        if app_id is None:
+            return False
+        if app_id in self._dispatched_ids:
+            return True
+        # При обновлении цен прошлые сессии не учитываем: каждая игра списка проверяется заново
+        if self.config.refresh_mode:
+            return False
+        if app_id not in self.processed_ids:
+            if self._processed_ids_complete or not self.checkpoint.is_processed(app_id):
                 return False
+            self.processed_ids.add(app_id)
+            return True
+        # Фильтр Блума может ошибиться в сторону "уже было" - такие случаи сверяем с чекпоинтом
+        return isinstance(self.processed_ids, AppIdBitmap) or self.checkpoint.is_processed(app_id)
+
+    def _print_pipeline_stats(self):
+        """Выводит статистику стадий конвейера"""
+        self.pipeline.print_summary()
+        if self.http_fetcher:
+            print(f"   Бэкенд {self.http_fetcher.stats.summary()}")
+
+    async def _fetch_details_on_driver(self, game_url: str, driver) -> Dict:
+        """Открывает страницу игры на драйвере и извлекает детали (вызовы драйвера выполняются вне event loop)"""
+        started = time.time()
+        async with limited(self.rate_limiter):
+            await asyncio.to_thread(driver.get, rebase_url(game_url, self.config.store_base_url))
+            await self.waiter.detail_ready(driver)
+            # Капча и отказ в доступе приходят обычной страницей - смотрим на заголовок
+            if looks_rate_limited(await asyncio.to_thread(lambda: driver.title)):
+                raise RateLimitedError("страница ограничения запросов")
+        self.watchdog.note_page(driver, time.time() - started)
+        await self._record_page_metrics('detail', driver)
+        if self.snapshots:
+            page_html = await asyncio.to_thread(lambda: driver.page_source)
+            await asyncio.to_thread(self.snapshots.save, 'detail', page_html, game_url, extract_app_id(game_url))
+
+        return await asyncio.to_thread(self.parse_game_details, game_url, driver)
+
+    async def process_game_on_driver(self, game: Dict, game_url: str, driver) -> bool:
+        """Обрабатывает одну игру на переданном драйвере"""
+        try:
+            details = await self._fetch_details_on_driver(game_url, driver)
+            return await self._save_game_with_details(game, game_url, details)
+
+        except Exception as e:
+            print(f"❌ Ошибка обработки игры {game_url}: {e}")
+            return False
+
+    def _merge_details(self, game: Dict, details: Dict) -> bool:
+        """Дополняет игру деталями и проверяет, что данных достаточно для сохранения"""
+        if details:
+            game.update(details)
 
-            # Сохраняем в базу
-            result = await self.db_manager.save_game_async(game)
+        if not self._validate_game_data(game):
+            print(f"❌ Пропускаем игру с неполными данными: {game.get('title')}")
+            return False
+        return True
 
-            # Возвращаемся на страницу с играми
-            self.driver.get(current_page_url)
-            time.sleep(1)
+    async def _save_game_with_details(self, game: Dict, game_url: str, details: Dict) -> bool:
+        """Дополняет игру деталями, проверяет и кладет в буфер записи"""
+        if not self._merge_details(game, details):
+            return False
 
-            return result is not None
+        await self.write_buffer.add((game, game_url, False))
+        return True
+
+    async def process_single_game_async(self, game: Dict, game_url: str) -> bool:
+        """Обрабатывает одну игру на основном драйвере во второй вкладке, не уходя со страницы списка"""
+        listing_handle = self.driver.current_window_handle
+        try:
+            # Открываем страницу игры в отдельной вкладке, чтобы не перезагружать список
+            if self._detail_handle is None:
+                await asyncio.to_thread(self.driver.switch_to.new_window, 'tab')
+                self._detail_handle = self.driver.current_window_handle
+            else:
+                await asyncio.to_thread(self.driver.switch_to.window, self._detail_handle)
+
+            return await self.process_game_on_driver(game, game_url, self.driver)
 
         except Exception as e:
             print(f"❌ Ошибка обработки игры {game_url}: {e}")
-            # Пытаемся вернуться на страницу с играми при ошибке
+            return False
+        finally:
+            # Возвращаемся на вкладку со списком игр
             try:
-                self.driver.get(self.last_page_url)
-                time.sleep(1)
-            except:
+                await asyncio.to_thread(self.driver.switch_to.window, listing_handle)
+            except Exception:
                 pass
-            return False
+
+    async def _record_page_metrics(self, kind: str, driver):
+        """Запоминает объем и время загрузки текущей страницы драйвера"""
+        try:
+            metrics = self.page_metrics.record(kind, await asyncio.to_thread(collect_page_metrics, driver))
+            if metrics:
+                print(f"📦 {kind}: ≥{metrics.get('bytes', 0) / 1024:.0f} КБ, {metrics.get('load_ms', 0):.0f} мс")
+        except Exception as e:
+            print(f"⚠️ Не удалось получить метрики страницы: {e}")
 
     def _validate_game_data(self, game_data: Dict) -> bool:
         """Проверяет, что у игры есть все необходимые данные"""
@@ -186,7 +634,15 @@ class SteamParserFinal:
         return all(field in game_data and game_data[field] for field in required_fields)
 
     def _find_game_blocks(self) -> List[Dict]:
-        """Ищет блоки с играми - РАБОЧАЯ ВЕРСИЯ"""
+        """Ищет новые блоки с играми: снимок карточек одним execute_script, при ошибке - обход элементов"""
+        try:
+            return self.listing_scanner.scan(self.driver)
+        except Exception as e:
+            print(f"⚠️ Не удалось снять карточки скриптом, обходим элементы: {e}")
+            return self._find_game_blocks_by_elements()
+
+    def _find_game_blocks_by_elements(self) -> List[Dict]:
+        """Ищет блоки с играми через WebDriver (по несколько вызовов на каждую ссылку)"""
         games = []
 
         try:
@@ -264,6 +720,7 @@ class SteamParserFinal:
                 'original_price': price_data.get('original_price', ''),
                 'discount': price_data.get('discount', ''),
                 'url': url.split('?')[0],  # Убираем параметры
+                'app_id': extract_app_id(url),
                 'image_url': image_url,
                 'timestamp': time.time()
             }
@@ -272,11 +729,11 @@ class SteamParserFinal:
             print(f"⚠️ Ошибка парсинга блока игры: {e}")
             return None
 
-    def _filter_unique_games(self, games: List[Dict]) -> List[Dict]:
-        """Фильтрует уникальные игры по названию и URL"""
+    def _filter_unique_games(self, games: List[Dict], seen_titles: set = None, seen_urls: set = None) -> List[Dict]:
+        """Фильтрует уникальные игры по названию и URL (seen_* - уже виденные ранее на этой странице)"""
         filtered_games = []
-        seen_titles = set()
-        seen_urls = set()
+        seen_titles = set() if seen_titles is None else seen_titles
+        seen_urls = set() if seen_urls is None else seen_urls
 
         for game in games:
             # Пропускаем если нет названия или цены
@@ -302,19 +759,20 @@ class SteamParserFinal:
 
         return filtered_games
 
-    def parse_game_details(self, game_url: str) -> Dict:
-        """Парсит детальную информацию об игре"""
-        if not self.driver:
+    def parse_game_details(self, game_url: str, driver=None) -> Dict:
+        """Парсит детальную информацию об игре (по умолчанию - с основного драйвера)"""
+        driver = driver or self.driver
+        if not driver:
             return {}
 
         try:
             # Парсим детали
             details = {
-                'categories': self._extract_categories(),
-                'review_rating': self._extract_review_rating(),
-                'review_count': self._extract_review_count(),
-                'image_url': self._extract_main_image(),
-                'description': self._extract_description()
+                'categories': self._extract_categories(driver),
+                'review_rating': self._extract_review_rating(driver),
+                'review_count': self._extract_review_count(driver),
+                'image_url': self._extract_main_image(driver),
+                'description': self._extract_description(driver)
             }
 
             return details
@@ -357,35 +815,7 @@ class SteamParserFinal:
     def _extract_prices(self, element):
         """Извлекает цены и скидку"""
         try:
-            text = element.text
-
-            # Ищем скидку
-            discount = ""
-            discount_match = re.search(r'-\d+%', text)
-            if discount_match:
-                discount = discount_match.group(0)
-
-            # Ищем цены в рублях
-            prices = []
-            price_patterns = [
-                r'\d+[\s\.,]?\d*\s*руб',
-                r'\d+[\s\.,]?\d*\s*₽',
-                r'\d+[\s\.,]?\d*\s*р\.',
-            ]
-
-            for pattern in price_patterns:
-                matches = re.findall(pattern, text)
-                prices.extend(matches)
-
-            current_price = prices[-1] if prices else ""
-            original_price = prices[0] if len(prices) > 1 else ""
-
-            return {
-                'current_price': current_price,
-                'original_price': original_price,
-                'discount': discount
-            }
-
+            return extract_prices_from_text(element.text)
         except:
             return {}
 
@@ -401,25 +831,16 @@ class SteamParserFinal:
             pass
         return ""
 
-    def _extract_description(self) -> str:
-        """Извлекает описание игры"""
+    def _extract_description(self, driver) -> str:
+        """Извлекает описание игры (селекторы общие с HTTP-бэкендом)"""
         try:
             # Ищем описание в различных элементах
-            desc_selectors = [
-                "//div[contains(@class, 'game_description')]",
-                "//div[contains(@class, 'description')]",
-                "//div[contains(@class, 'game_review_description')]",
-                "//div[contains(@data-featuretarget, 'description')]",
-                "//meta[contains(@property, 'og:description')]"
-            ]
-
-            for selector in desc_selectors:
+            for selector in DESCRIPTION_SELECTORS:
                 try:
+                    element = driver.find_element(By.XPATH, selector)
                     if selector.startswith("//meta"):
-                        element = self.driver.find_element(By.XPATH, selector)
                         desc = element.get_attribute('content')
                     else:
-                        element = self.driver.find_element(By.XPATH, selector)
                         desc = element.text
 
                     if desc and len(desc) > 10:
@@ -435,77 +856,33 @@ class SteamParserFinal:
 
         return ""
 
-    # В вашем основном парсере (steam_parser_final.py или аналогичном)
-    # Исправляем метод extract_categories
-
-    def _extract_categories(self) -> List[str]:
-        """Извлекает категории игры - УЛУЧШЕННАЯ ВЕРСИЯ"""
+    def _extract_categories(self, driver) -> List[str]:
+        """
+        Извлекает категории игры: ссылки на категории в блоке деталей, затем теги, затем жанры
+        и мета-данные (селекторы общие с HTTP-бэкендом)
+        """
         categories = []
 
         try:
-            # 1. Попробуем найти в блоке с деталями
-            details_selectors = [
-                "//div[contains(@class, 'details_block')]//a[contains(@href, '/category/')]",
-                "//div[contains(@class, 'game_details')]//a[contains(@href, '/category/')]",
-                "//div[contains(@class, 'details')]//a[contains(@href, '/category/')]"
-            ]
-
-            for selector in details_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        category = element.text.strip()
-                        if category and len(category) > 2 and category not in categories:
-                            categories.append(category)
-                    if categories:
-                        break
-                except:
-                    continue
-
-            # 2. Если не нашли, попробуем найти теги
-            if not categories:
-                tag_selectors = [
-                    "//div[contains(@class, 'glance_tags')]//a",
-                    "//div[contains(@class, 'tags')]//a",
-                    "//div[contains(@class, 'game_tags')]//a"
-                ]
-
-                for selector in tag_selectors:
+            for selectors in CATEGORY_SELECTOR_GROUPS:
+                for selector in selectors:
                     try:
-                        elements = self.driver.find_elements(By.XPATH, selector)
+                        elements = driver.find_elements(By.XPATH, selector)
                         for element in elements:
-                            tag = element.text.strip()
-                            if tag and len(tag) > 2 and tag not in categories:
-                                categories.append(tag)
-                        if categories:
-                            break
-                    except:
-                        continue
-
-            # 3. Попробуем найти в блоке жанров
-            if not categories:
-                genre_selectors = [
-                    "//div[contains(@class, 'genre')]//a",
-                    "//div[contains(@class, 'genres')]//a",
-                    "//div[contains(@id, 'genres')]//a"
-                ]
-
-                for selector in genre_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.XPATH, selector)
-                        for element in elements:
-                            genre = element.text.strip()
-                            if genre and len(genre) > 2 and genre not in categories:
-                                categories.append(genre)
+                            category = re.sub(r'\s+', ' ', element.text).strip()
+                            if category and len(category) > 2 and category not in categories:
+                                categories.append(category)
                         if categories:
                             break
                     except:
                         continue
+                if categories:
+                    break
 
-            # 4. Попробуем найти в мета-данных
+            # Если не нашли, попробуем найти в мета-данных
             if not categories:
                 try:
-                    meta_elements = self.driver.find_elements(By.XPATH, "//meta[contains(@property, 'genre')]")
+                    meta_elements = driver.find_elements(By.XPATH, "//meta[contains(@property, 'genre')]")
                     for element in meta_elements:
                         content = element.get_attribute('content')
                         if content:
@@ -521,30 +898,30 @@ class SteamParserFinal:
             print(f"❌ Ошибка извлечения категорий: {e}")
             return []
 
-    def _extract_review_rating(self):
+    def _extract_review_rating(self, driver):
         """Извлекает рейтинг отзывов"""
         try:
-            rating_elem = self.driver.find_element(
+            rating_elem = driver.find_element(
                 By.XPATH, "//meta[contains(@itemprop, 'ratingValue')]"
             )
             return rating_elem.get_attribute('content')
         except:
             return ""
 
-    def _extract_review_count(self):
+    def _extract_review_count(self, driver):
         """Извлекает количество отзывов"""
         try:
-            count_elem = self.driver.find_element(
+            count_elem = driver.find_element(
                 By.XPATH, "//meta[contains(@itemprop, 'reviewCount')]"
             )
             return count_elem.get_attribute('content')
         except:
             return ""
 
-    def _extract_main_image(self):
+    def _extract_main_image(self, driver):
         """Извлекает главное изображение"""
         try:
-            img_elem = self.driver.find_element(
+            img_elem = driver.find_element(
                 By.XPATH, "//meta[contains(@property, 'og:image')]"
             )
             return img_elem.get_attribute('content')
@@ -553,16 +930,7 @@ class SteamParserFinal:
 
     def _clean_game_title(self, title: str) -> str:
         """Очищает название игры от лишних символов"""
-        if not title:
-            return title
-
-        # Убираем лишние пробелы и переносы строк
-        clean_title = re.sub(r'\s+', ' ', title).strip()
-
-        # Убираем специфичные для Steam префиксы/суффиксы если есть
-        clean_title = re.sub(r'(™|®|©|[-–—]\s*$)', '', clean_title).strip()
-
-        return clean_title
+        return clean_game_title(title)
 
     async def _load_next_page(self) -> bool:
         """Загружает следующую страницу - улучшенный поиск кнопки"""
@@ -578,18 +946,22 @@ class SteamParserFinal:
                 "//div[contains(@class, 'load_more')]//button"
             ]
 
-            for selector in button_selectors:
-                try:
-                    button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    if button.is_displayed():
-                        button.click()
-                        time.sleep(3)
-                        print(f"✅ Найдена и нажата кнопка: {selector}")
-                        return True
-                except:
-                    continue
+            def find_button():
+                for selector in button_selectors:
+                    for button in self.driver.find_elements(By.XPATH, selector):
+                        if button.is_displayed() and button.is_enabled():
+                            return selector, button
+                return None
+
+            # Ищем кнопку по всем селекторам сразу, не блокируя event loop
+            found = await self.waiter.wait_for('show_more_button', find_button)
+            if found:
+                selector, button = found
+                previous_count = await asyncio.to_thread(self.waiter.card_count, self.driver)
+                await asyncio.to_thread(button.click)
+                await self.waiter.cards_grown(self.driver, previous_count)
+                print(f"✅ Найдена и нажата кнопка: {selector}")
+                return True
 
             # Если не нашли кнопку, проверяем есть ли параметр offset в URL
             current_url = self.driver.current_url
@@ -600,8 +972,9 @@ class SteamParserFinal:
                     current_offset = int(match.group(1))
                     new_offset = current_offset + 12
                     new_url = re.sub(r'offset=\d+', f'offset={new_offset}', current_url)
-                    self.driver.get(new_url)
-                    time.sleep(3)
+                    await asyncio.to_thread(self.driver.get, new_url)
+                    await self.waiter.listing_ready(self.driver)
+                    self.listing_scanner.reset()
                     print(f"🔗 Перешли на следующую страницу: offset={new_offset}")
                     return True
 
@@ -633,6 +1006,7 @@ async def main():
 
     # Закрываем драйвер в конце
     await parser.close_driver()
+    parser.checkpoint.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+from selenium.webdriver.common.by import By
+
+from project.src.parser.stats import percentile
+
+# Таймауты ожидания по умолчанию для каждого условия, сек
+DEFAULT_TIMEOUTS = {
+    'document_ready': 15.0,
+    'detail_meta': 10.0,
+    'listing_cards': 15.0,
+    'cards_grown': 10.0,
+    'show_more_button': 5.0,
+}
+
+CARD_COUNT_JS = "return document.querySelectorAll(\"a[href*='/app/']\").length;"
+
+
+class PageWaiter:
+    """Ожидание готовности страницы по явным условиям вместо фиксированных пауз"""
+
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None, poll_interval: float = 0.1):
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.poll_interval = poll_interval
+        self.durations = defaultdict(list)  # Фактическое время ожидания по условиям
+        self.timeouts_hit = defaultdict(int)
+
+    async def wait_for(self, name: str, condition: Callable[[], object], timeout: Optional[float] = None):
+        """
+        Опрашивает условие (в отдельном потоке), отдавая управление event loop между попытками.
+        Возвращает результат условия или None при таймауте
+        """
+        timeout = self.timeouts.get(name, 10.0) if timeout is None else timeout
+        started = time.monotonic()
+
+        while True:
+            try:
+                result = await asyncio.to_thread(condition)
+            except Exception:
+                result = None
+
+            elapsed = time.monotonic() - started
+            if result:
+                self.durations[name].append(elapsed)
+                return result
+
+            if elapsed >= timeout:
+                self.durations[name].append(elapsed)
+                self.timeouts_hit[name] += 1
+                return None
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def document_ready(self, driver) -> bool:
+        """Ждет document.readyState == 'complete'"""
+        result = await self.wait_for(
+            'document_ready',
+            lambda: driver.execute_script("return document.readyState") == 'complete'
+        )
+        return bool(result)
+
+    async def detail_ready(self, driver) -> bool:
+        """Ждет появления мета-тегов страницы игры (ratingValue или og:description)"""
+        if not await self.document_ready(driver):
+            return False
+
+        result = await self.wait_for(
+            'detail_meta',
+            lambda: driver.find_elements(
+                By.XPATH,
+                "//meta[contains(@itemprop, 'ratingValue')] | //meta[contains(@property, 'og:description')]"
+            )
+        )
+        return bool(result)
+
+    async def listing_ready(self, driver) -> bool:
+        """Ждет загрузки страницы списка и появления карточек игр"""
+        if not await self.document_ready(driver):
+            return False
+
+        result = await self.wait_for('listing_cards', lambda: self.card_count(driver) > 0)
+        return bool(result)
+
+    async def cards_grown(self, driver, previous_count: int) -> bool:
+        """Ждет, пока после 'Показать больше' количество карточек станет больше previous_count"""
+        result = await self.wait_for('cards_grown', lambda: self.card_count(driver) > previous_count)
+        return bool(result)
+
+    @staticmethod
+    def card_count(driver) -> int:
+        """Количество ссылок на игры на странице"""
+        return driver.execute_script(CARD_COUNT_JS) or 0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Распределение фактического времени ожидания по условиям"""
+        result = {}
+        for name, values in self.durations.items():
+            result[name] = {
+                'count': len(values),
+                'timeouts': self.timeouts_hit[name],
+                'min': min(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'max': max(values),
+            }
+        return result
+
+    def print_summary(self):
+        """Выводит распределение времени ожидания"""
+        print("\n⏱️ Время ожидания страниц:")
+        for name, stats in self.summary().items():
+            print(f"   {name}: {stats['count']} раз, таймаутов {stats['timeouts']}, "
+                  f"min {stats['min']:.2f} с, p50 {stats['p50']:.2f} с, "
+                  f"p95 {stats['p95']:.2f} с, max {stats['max']:.2f} с")
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from project.src.parser.stats import WorkerStats, percentile
+
+
+class WriteBehindBuffer:
+    """
+    Буфер отложенной записи между парсером и базой.
+    Игры копятся в памяти и записываются пачкой каждые batch_size штук или flush_interval секунд,
+    смотря что наступит раньше. Обход ждет только при переполнении буфера (max_pending игр
+    в буфере и в незавершенных записях), а не на каждом коммите
+    """
+
+    def __init__(self, flush: Callable[[list], Awaitable], batch_size: int = 20, flush_interval: float = 2.0,
+                 max_pending: int = 200, workers: int = 1, name: str = "write"):
+        self.flush = flush  # Записывает пачку; результаты по играм учитывает сам
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self.workers = max(1, workers)
+        self.name = name
+
+        self._pending: list = []
+        self._oldest_at: Optional[float] = None  # Когда в буфер попала самая старая игра
+        self._buffered = 0  # Игр в буфере и в незавершенных записях
+        self._space = asyncio.Condition()
+        self._batches: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self.stats: List[WorkerStats] = []
+        self.sizes: List[int] = []
+        self.max_buffered = 0
+        self.waits = 0  # Сколько раз обход ждал освобождения места
+        self.wait_time = 0.0
+
+    def start(self):
+        self.stats = [WorkerStats(f"{self.name}-{i + 1}") for i in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._run(stats)) for stats in self.stats]
+        self._tasks.append(asyncio.create_task(self._timer()))
+
+    async def add(self, item):
+        """Кладет игру в буфер; ждет только если буфер заполнен (backpressure)"""
+        async with self._space:
+            if self._buffered >= self.max_pending:
+                self.waits += 1
+                started = time.time()
+                await self._space.wait_for(lambda: self._buffered < self.max_pending)
+                self.wait_time += time.time() - started
+
+            if not self._pending:
+                self._oldest_at = time.time()
+            self._pending.append(item)
+            self._buffered += 1
+            self.max_buffered = max(self.max_buffered, self._buffered)
+            if len(self._pending) >= self.batch_size:
+                self._cut_batch()
+
+    def _cut_batch(self):
+        """Передает накопленные игры на запись"""
+        if self._pending:
+            self._batches.put_nowait(self._pending)
+            self._pending = []
+            self._oldest_at = None
+
+    async def _timer(self):
+        """Отправляет неполную пачку, если самая старая игра ждет дольше flush_interval"""
+        while True:
+            await asyncio.sleep(max(0.05, self.flush_interval / 4))
+            if self._oldest_at is not None and time.time() - self._oldest_at >= self.flush_interval:
+                self._cut_batch()
+
+    async def _run(self, stats: WorkerStats):
+        while True:
+            batch = await self._batches.get()
+            started = time.time()
+            try:
+                await self.flush(batch)
+                elapsed = time.time() - started
+                stats.record(elapsed, True)
+                print(f"💾 [{stats.name}] Записано {len(batch)} игр за {elapsed * 1000:.0f} мс "
+                      f"(в буфере {self._buffered - len(batch)})")
+            except Exception as e:
+                stats.record(time.time() - started, False)
+                print(f"❌ [{stats.name}] Ошибка записи пачки из {len(batch)} игр: {e}")
+            finally:
+                self.sizes.append(len(batch))
+                async with self._space:
+                    self._buffered -= len(batch)
+                    self._space.notify_all()
+                self._batches.task_done()
+
+    async def close(self):
+        """Финальная запись: отправляет остаток буфера и ждет завершения всех записей"""
+        if not self._tasks:
+            return
+        try:
+            self._cut_batch()
+            await self._batches.join()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+    def describe(self) -> str:
+        return f"Буфер записи: {self._buffered} из {self.max_pending}, пачек в очереди {self._batches.qsize()}"
+
+    def summary(self) -> str:
+        times = [t for stats in self.stats for t in stats.times]
+        errors = sum(stats.errors for stats in self.stats)
+        avg_size = sum(self.sizes) / len(self.sizes) if self.sizes else 0.0
+        return (f"{self.name} x{self.workers}: {len(self.sizes)} пачек ({errors} с ошибкой), "
+                f"ср. {avg_size:.1f} игр/пачку, запись p50 {percentile(times, 50) * 1000:.0f} мс / "
+                f"p95 {percentile(times, 95) * 1000:.0f} мс, буфер макс {self.max_buffered} из {self.max_pending}, "
+                f"ожиданий места {self.waits} ({self.wait_time:.1f} с)")
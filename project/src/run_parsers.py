@@ -4,54 +4,25 @@ from project.src.parser.steam_parser_finally import SteamParserFinal
 
 
 async def main():
-    print("🎮 Финальный парсер с продолжением и одним драйвером")
+    print("🎮 Финальный парсер с продолжением и перезапуском драйверов")
     print("=" * 50)
 
-    # Сессия 1: 500 игр
-    print("\n🔵 СЕССИЯ 1: 500 игр")
+    # Одна непрерывная сессия: драйверы перезапускаются сами при росте памяти
+    # или количества страниц (см. PARSER_DRIVER_MAX_PAGES / PARSER_DRIVER_MAX_RSS_MB)
+    print("\n🔵 СЕССИЯ: 1500 игр")
     parser = SteamParserFinal()
-    saved, errors = await parser.parse_page_and_save_immediate(
-        "https://store.steampowered.com/specials/?l=russian&flavor=contenthub_topsellers",
-        500
-    )
-    print(f"🎯 Сессия 1: {saved} игр сохранено, {errors} ошибок")
+    try:
+        saved, errors = await parser.parse_page_and_save_immediate(
+            "https://store.steampowered.com/specials/?l=russian&flavor=contenthub_topsellers",
+            1500
+        )
+    finally:
+        # Закрываем драйверы после сессии
+        await parser.close_driver()
+        parser.checkpoint.close()
 
-    # Закрываем драйвер после сессии
-    await parser.close_driver()
-
-    # Пауза
-    print("\n⏸️ Пауза 10 мин...")
-    await asyncio.sleep(600)
-
-    # Сессия 2: еще 500 игр (продолжит с места остановки)
-    print("\n🟢 СЕССИЯ 2: еще 500 игр")
-    parser2 = SteamParserFinal()  # Автоматически загрузит прогресс
-    saved2, errors2 = await parser2.parse_page_and_save_immediate(
-        "https://store.steampowered.com/specials/?l=russian&flavor=contenthub_topsellers",
-        500
-    )
-    print(f"🎯 Сессия 2: {saved2} игр сохранено, {errors2} ошибок")
-
-    # Закрываем драйвер
-    await parser2.close_driver()
-
-    print("\n⏸️ Пауза 10 мин...")
-    await asyncio.sleep(600)
-
-    # Сессия 3: 500 игр
-    print("\n🔵 СЕССИЯ 1: 500 игр")
-    parser3 = SteamParserFinal()
-    saved, errors = await parser3.parse_page_and_save_immediate(
-        "https://store.steampowered.com/specials/?l=russian&flavor=contenthub_topsellers",
-        500
-    )
-    print(f"🎯 Сессия 3: {saved} игр сохранено, {errors} ошибок")
-
-    # Закрываем драйвер после сессии
-    await parser3.close_driver()
-
-    print(f"🎉 ВСЕГО: {saved + saved2} игр, {errors + errors2} ошибок")
+    print(f"🎉 ВСЕГО: {saved} игр, {errors} ошибок")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import math
+from typing import Iterable, Tuple
+
+
+class AppIdBitmap:
+    """
+    Множество app_id в виде битовой карты: один бит на app_id.
+    Весь каталог Steam (app_id до ~4 млн) занимает около 500 КБ
+    """
+
+    def __init__(self, initial_max_id: int = 0):
+        self.bits = bytearray((initial_max_id >> 3) + 1)
+        self.count = 0
+
+    def add(self, app_id: int):
+        index = app_id >> 3
+        if index >= len(self.bits):
+            # Растем с запасом, чтобы не копировать массив на каждый новый максимум
+            self.bits.extend(bytes(max(index + 1 - len(self.bits), len(self.bits) // 2)))
+        mask = 1 << (app_id & 7)
+        if not self.bits[index] & mask:
+            self.bits[index] |= mask
+            self.count += 1
+
+    def update(self, app_ids: Iterable[int]):
+        for app_id in app_ids:
+            self.add(app_id)
+
+    def __contains__(self, app_id: int) -> bool:
+        index = app_id >> 3
+        return index < len(self.bits) and bool(self.bits[index] & (1 << (app_id & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+
+class AppIdBloomFilter:
+    """
+    Фильтр Блума по app_id: фиксированный размер при заданной вместимости.
+    Возможны ложные срабатывания (с вероятностью error_rate), пропусков нет
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.size = size
+        self.hash_count = max(1, round(size / capacity * math.log(2)))
+        self.bits = bytearray((size >> 3) + 1)
+        self.count = 0
+
+    def _positions(self, app_id: int):
+        digest = hashlib.blake2b(app_id.to_bytes(8, 'little'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, app_id: int):
+        added = False
+        for position in self._positions(app_id):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def update(self, app_ids: Iterable[int]):
+        for app_id in app_ids:
+            self.add(app_id)
+
+    def __contains__(self, app_id: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(app_id))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+
+def create_app_id_set(kind: str = 'bitmap', capacity: int = 1_000_000):
+    """Создает множество app_id: 'bitmap' (точное) или 'bloom' (вероятностное)"""
+    if kind == 'bloom':
+        return AppIdBloomFilter(capacity)
+    return AppIdBitmap()
+
+
+def dump_app_id_set(app_ids) -> Tuple[str, bytes]:
+    """Параметры множества (JSON) и его биты - для сохранения одним значением"""
+    if isinstance(app_ids, AppIdBloomFilter):
+        params = {'kind': 'bloom', 'size': app_ids.size, 'hash_count': app_ids.hash_count}
+    else:
+        params = {'kind': 'bitmap'}
+    params['count'] = app_ids.count
+    return json.dumps(params), bytes(app_ids.bits)
+
+
+def restore_app_id_set(app_ids, params: str, bits: bytes) -> bool:
+    """Загружает сохраненные биты в множество того же вида; False, если вид или размер не совпали"""
+    saved = json.loads(params)
+    if isinstance(app_ids, AppIdBloomFilter):
+        if saved.get('kind') != 'bloom' or (saved.get('size'), saved.get('hash_count')) != \
+                (app_ids.size, app_ids.hash_count):
+            return False
+    elif saved.get('kind') != 'bitmap':
+        return False
+
+    app_ids.bits = bytearray(bits)
+    app_ids.count = saved['count']
+    return True
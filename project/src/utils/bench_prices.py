@@ -0,0 +1,164 @@
+"""
+Проверка и замер разбора цен (src/utils/prices.py).
+
+Сначала сверяет корпус реальных форматов цен и скидок и проверяет свойства на случайных ценах:
+одно и то же число в записи RU/EU/US и с разными пробелами между разрядами дает одно значение.
+Затем сравнивает скорость с прежним DatabaseManager.parse_price.
+
+Запуск: python -m project.src.utils.bench_prices [строк]
+"""
+import random
+import sys
+import time
+
+from project.src.utils.prices import (
+    detect_currency, find_discount, find_prices, parse_discount, parse_discounts, parse_price, parse_prices
+)
+
+# Строка цены -> (сотые доли, валюта)
+PRICE_CORPUS = [
+    ("299 руб", 29900, 'RUB'),
+    ("299 руб.", 29900, 'RUB'),
+    ("1 299 руб", 129900, 'RUB'),
+    ("1 299,00 руб", 129900, 'RUB'),
+    ("1 299,50 руб", 129950, 'RUB'),
+    ("1\u00a0299 ₽", 129900, 'RUB'),
+    ("1\u2009299,00 ₽", 129900, 'RUB'),
+    ("1\u202f299 ₽", 129900, 'RUB'),
+    ("12\u202f999 р.", 1299900, 'RUB'),
+    ("49,5 руб", 4950, 'RUB'),
+    ("0,99 руб", 99, 'RUB'),
+    ("  599 pуб.  ", 59900, 'RUB'),
+    ("$9.99", 999, 'USD'),
+    ("$1,299.99", 129999, 'USD'),
+    ("$ 19.99 USD", 1999, 'USD'),
+    ("9,99€", 999, 'EUR'),
+    ("1.299,00€", 129900, 'EUR'),
+    ("€1,299.00", 129900, 'EUR'),
+    ("£7.49", 749, 'GBP'),
+    ("2 490 ₸", 249000, 'KZT'),
+    ("159₴", 15900, 'UAH'),
+    ("36,99zł", 3699, 'PLN'),
+    ("1'299.00", 129900, 'RUB'),
+    ("1299", 129900, 'RUB'),
+    ("Бесплатно", 0, 'RUB'),
+    ("Free to Play", 0, 'RUB'),
+    ("Free", 0, 'RUB'),
+    ("", None, 'RUB'),
+    ("Нет в продаже", None, 'RUB'),
+]
+
+DISCOUNT_CORPUS = [
+    ("-50%", 50),
+    ("- 75 %", 75),
+    ("−90%", 90),
+    ("-100%", 100),
+    ("", 0),
+    (None, 0),
+]
+
+# Текст карточки списка -> (цены в порядке появления, скидка)
+TEXT_CORPUS = [
+    ("Cyberpunk 2077\n-50%\n1 999 руб\n999 руб", ["1 999 руб", "999 руб"], "-50%"),
+    ("Hades\n-40%\n1\u00a0299,00 ₽\n779,40 ₽", ["1\u00a0299,00 ₽", "779,40 ₽"], "-40%"),
+    ("Portal 2\n2011\n-90%\n$9.99\n$0.99", ["$9.99", "$0.99"], "-90%"),
+    ("Dota 2\nБесплатно", [], ""),
+    ("Game\n1 299 руб.", ["1 299 руб."], ""),
+]
+
+SPACE_SEPARATORS = [' ', '\u00a0', '\u2009', '\u202f']
+
+
+def legacy_parse_price(price_str: str) -> tuple:
+    """Прежний DatabaseManager.parse_price - для сравнения скорости"""
+    try:
+        if not price_str:
+            return 0.0, 'RUB'
+        clean_price = price_str.replace(' ', '').replace('руб', '').replace('₽', '').replace('р.', '')
+        clean_price = clean_price.replace(',', '.')
+        return float(clean_price), 'RUB'
+    except:
+        return 0.0, 'RUB'
+
+
+def render(minor: int, style: str, rng: random.Random) -> str:
+    """Записывает цену в одном из форматов магазина"""
+    whole, frac = divmod(minor, 100)
+    digits = f"{whole:,}"
+    if style == 'ru':
+        text = digits.replace(',', rng.choice(SPACE_SEPARATORS))
+        if frac or rng.random() < 0.5:
+            text += f",{frac:02d}"
+        return f"{text} {rng.choice(['руб', 'руб.', '₽', 'р.'])}"
+    if style == 'eu':
+        return f"{digits.replace(',', '.')},{frac:02d}€"
+    return f"${digits}.{frac:02d}"
+
+
+def check_corpus() -> int:
+    """Сверяет корпус и свойства; возвращает число расхождений"""
+    failures = 0
+    for text, expected, currency in PRICE_CORPUS:
+        got = (parse_price(text), detect_currency(text))
+        if got != (expected, currency):
+            failures += 1
+            print(f"❌ Цена {text!r}: {got}, ожидалось {(expected, currency)}")
+
+    for text, expected in DISCOUNT_CORPUS:
+        if parse_discount(text) != expected:
+            failures += 1
+            print(f"❌ Скидка {text!r}: {parse_discount(text)}, ожидалось {expected}")
+
+    for text, prices, discount in TEXT_CORPUS:
+        got = (find_prices(text), find_discount(text))
+        if got != (prices, discount):
+            failures += 1
+            print(f"❌ Карточка {text!r}: {got}, ожидалось {(prices, discount)}")
+
+    rng = random.Random(0)
+    for _ in range(5000):
+        minor = rng.choice([rng.randrange(1, 100), rng.randrange(100, 10 ** 5), rng.randrange(10 ** 5, 10 ** 8)])
+        style = rng.choice(['ru', 'eu', 'us'])
+        text = render(minor, style, rng)
+        if parse_price(text) != minor or find_prices(f"-10%\n{text}") != [text]:
+            failures += 1
+            print(f"❌ Свойство: {text!r} -> {parse_price(text)}, ожидалось {minor}")
+            break
+
+    print(f"{'✅' if not failures else '❌'} Корпус: {len(PRICE_CORPUS)} цен, {len(DISCOUNT_CORPUS)} скидок, "
+          f"{len(TEXT_CORPUS)} карточек, 5000 случайных цен; расхождений {failures}")
+    return failures
+
+
+def bench(rows: int):
+    rng = random.Random(1)
+    # Как в реальной выдаче: много повторяющихся цен
+    pool = [render(rng.randrange(100, 500000), 'ru', rng) for _ in range(2000)]
+    values = [rng.choice(pool) for _ in range(rows)]
+    discounts = [f"-{rng.randrange(5, 95)}%" for _ in range(rows)]
+
+    def measure(name, func):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        print(f"{name:>28} {elapsed * 1000:>9.1f} мс {rows / elapsed:>12.0f} строк/с")
+
+    print(f"\n⏱️ Разбор {rows} цен ({len(pool)} разных строк):")
+    measure("прежний parse_price", lambda: [legacy_parse_price(value) for value in values])
+    parse_price.cache_clear()
+    measure("parse_price, холодный кэш", lambda: [parse_price(value) for value in values])
+    measure("parse_price, теплый кэш", lambda: [parse_price(value) for value in values])
+    parse_price.cache_clear()
+    measure("parse_prices (пачка)", lambda: parse_prices(values))
+    measure("parse_discounts (пачка)", lambda: parse_discounts(discounts))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    failures = check_corpus()
+    bench(rows)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Разбор цен и скидок Steam, общий для парсера, базы, бота и сайта.
+Цены возвращаются в сотых долях валюты (копейки, центы), скидки - в процентах.
+Понимает разряды через обычный, неразрывный, тонкий и узкий неразрывный пробел, точку, запятую
+или апостроф и дробную часть через запятую или точку: "1 299,00 руб", "1 299 ₽", "$1,299.99", "1.299,00€"
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Пробелы, которыми Steam и браузеры разделяют разряды: обычный, неразрывный, тонкий, узкий неразрывный
+SPACES = " \u00a0\u2009\u202f"
+
+# Целая часть: либо разряды по три цифры через разделитель, либо цифры подряд; дробная - 1-2 цифры.
+# Три цифры после единственного разделителя считаются разрядом ("1,299" -> 1299), одна-две - дробью
+NUMBER_PATTERN = re.compile(
+    rf"(?<![\d.,])(?P<int>\d{{1,3}}(?:[{SPACES}.,']\d{{3}})+|\d+)(?:[.,](?P<frac>\d{{1,2}}))?(?!\d)"
+)
+NON_DIGITS_PATTERN = re.compile(r"\D")
+
+# В тексте карточки цена берется только рядом с валютой, иначе число может оказаться скидкой или датой
+_NUMBER = rf"(?<![\d.,])(?:\d{{1,3}}(?:[{SPACES}.,']\d{{3}})+|\d+)(?:[.,]\d{{1,2}})?(?!\d)"
+PRICE_IN_TEXT_PATTERN = re.compile(
+    rf"(?:[$€£¥₸₴]|USD|EUR)[{SPACES}]?{_NUMBER}"
+    rf"|{_NUMBER}[{SPACES}]?(?:[рp]уб\.?|₽|р\.|€|\$|£|zł|₸|₴|USD|EUR)"
+)
+DISCOUNT_IN_TEXT_PATTERN = re.compile(rf"[-−][{SPACES}]?\d{{1,3}}[{SPACES}]?%")
+DISCOUNT_PATTERN = re.compile(r"\d{1,3}")
+FREE_PATTERN = re.compile(r"бесплат|free", re.IGNORECASE)
+
+CURRENCY_CODES = [
+    (re.compile(r"[рp]уб|₽|р\."), 'RUB'),
+    (re.compile(r"\$|USD"), 'USD'),
+    (re.compile(r"€|EUR"), 'EUR'),
+    (re.compile(r"£"), 'GBP'),
+    (re.compile(r"₸"), 'KZT'),
+    (re.compile(r"₴"), 'UAH'),
+    (re.compile(r"zł"), 'PLN'),
+]
+DEFAULT_CURRENCY = 'RUB'
+
+
+def _to_minor(int_part: str, frac_part: Optional[str]) -> int:
+    value = int(NON_DIGITS_PATTERN.sub('', int_part)) * 100
+    if frac_part:
+        value += int(frac_part.ljust(2, '0'))
+    return value
+
+
+@lru_cache(maxsize=8192)
+def parse_price(text: Optional[str]) -> Optional[int]:
+    """
+    Цена в сотых долях валюты
+    Пример: "1 299,00 руб" -> 129900, "Бесплатно" -> 0; None, если цены в строке нет
+    """
+    if not text:
+        return None
+    match = NUMBER_PATTERN.search(text)
+    if match:
+        return _to_minor(match.group('int'), match.group('frac'))
+    return 0 if FREE_PATTERN.search(text) else None
+
+
+def parse_prices(values: Iterable[Optional[str]]) -> List[Optional[int]]:
+    """Разбирает список цен за один проход; одинаковые строки разбираются один раз"""
+    seen: Dict[Optional[str], Optional[int]] = {}
+    result = []
+    append = result.append
+    for value in values:
+        if value not in seen:
+            seen[value] = parse_price(value)
+        append(seen[value])
+    return result
+
+
+@lru_cache(maxsize=1024)
+def parse_discount(text: Optional[str]) -> int:
+    """
+    Процент скидки
+    Пример: "-50%" -> 50; 0, если скидки нет
+    """
+    if not text:
+        return 0
+    match = DISCOUNT_PATTERN.search(text)
+    return min(int(match.group()), 100) if match else 0
+
+
+def parse_discounts(values: Iterable[Optional[str]]) -> List[int]:
+    """Разбирает список скидок за один проход"""
+    return [parse_discount(value) for value in values]
+
+
+def detect_currency(text: Optional[str]) -> str:
+    """Код валюты по символу в строке цены (по умолчанию рубли)"""
+    if text:
+        for pattern, code in CURRENCY_CODES:
+            if pattern.search(text):
+                return code
+    return DEFAULT_CURRENCY
+
+
+def discount_amount(current: Optional[int], original: Optional[int]) -> Optional[int]:
+    """Сумма скидки в сотых долях валюты; None, если исходная цена неизвестна или не больше текущей"""
+    if current is None or original is None or original <= current:
+        return None
+    return original - current
+
+
+def find_prices(text: str) -> List[str]:
+    """Все цены с валютой в тексте (например, карточки списка) в порядке появления"""
+    return [match.group().strip() for match in PRICE_IN_TEXT_PATTERN.finditer(text or '')]
+
+
+def find_discount(text: str) -> str:
+    """Первая скидка вида "-50%" в тексте"""
+    match = DISCOUNT_IN_TEXT_PATTERN.search(text or '')
+    return match.group() if match else ""
+
+
+def split_price(text: Optional[str]) -> Tuple[float, str]:
+    """Цена в единицах валюты и код валюты - формат прежнего DatabaseManager.parse_price"""
+    minor = parse_price(text)
+    return (minor / 100 if minor is not None else 0.0), detect_currency(text)
@@ -1,31 +1,211 @@
 import json
 import os
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from project.src.utils.app_id_set import dump_app_id_set, restore_app_id_set
+from project.src.utils.steam_urls import extract_app_id
 
-def save_progress(last_page_url: str, parsed_urls: list):
-    """Сохраняет прогресс: последнюю страницу и URLs"""
-    progress = {
-        'last_page_url': last_page_url,
-        'parsed_urls': parsed_urls,
-        'total_parsed': len(parsed_urls)
-    }
-    with open('progress.json', 'w', encoding='utf-8') as f:
-        json.dump(progress, f, ensure_ascii=False)
-    print(f"💾 Прогресс сохранен: {len(parsed_urls)} игр, последняя страница: {last_page_url}")
+CHECKPOINT_PATH = 'crawl_checkpoint.db'
+LEGACY_PROGRESS_PATH = 'progress.json'
 
 
-def load_progress():
-    """Загружает прогресс"""
-    if not os.path.exists('progress.json'):
-        return None, set(), 0
+class CrawlCheckpoint:
+    """
+    Чекпоинт обхода в SQLite (WAL): обработанные app_id, фронтир (найденные в списке,
+    но еще не обработанные игры с данными карточки) и последняя позиция списка.
+    Запись - только добавление новых строк, коммиты (и fsync) идут пачками,
+    а возобновление читает лишь курсор, счетчик и сохраненное множество app_id, не загружая всю историю
+    """
 
-    with open('progress.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        return data.get('last_page_url'), set(data.get('parsed_urls', [])), data.get('total_parsed', 0)
+    def __init__(self, path: str = CHECKPOINT_PATH, batch_size: int = 50, flush_interval: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        is_new = not os.path.exists(path)
 
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")  # fsync на каждый (пакетный) коммит
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS processed (
+                app_id INTEGER PRIMARY KEY,
+                url TEXT,
+                processed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS frontier (
+                app_id INTEGER PRIMARY KEY,
+                url TEXT,
+                data TEXT,
+                added_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
 
-def clear_progress():
+        self._pending = {}  # app_id -> (url, время) - еще не записанные в файл
+        self._pending_meta = {}
+        self._pending_frontier = {}  # app_id -> (url, json карточки, время)
+        self._frontier_done = set()  # app_id, которые нужно убрать из фронтира
+        self._last_flush = time.time()
+        self.total_processed = int(self._get_meta('total_processed') or 0)
+
+        if is_new:
+            self._import_legacy_progress()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        if key in self._pending_meta:
+            return self._pending_meta[key]
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _import_legacy_progress(self):
+        """Однократно переносит данные из старого progress.json"""
+        if not os.path.exists(LEGACY_PROGRESS_PATH):
+            return
+
+        with open(LEGACY_PROGRESS_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        for url in data.get('parsed_urls', []):
+            app_id = extract_app_id(url)
+            if app_id:
+                self.mark_processed(app_id, url)
+        if data.get('last_page_url'):
+            self.set_cursor(data['last_page_url'])
+        self.flush()
+        print(f"📥 Перенесен прогресс из {LEGACY_PROGRESS_PATH}: {self.total_processed} игр")
+
+    @property
+    def last_cursor(self) -> Optional[str]:
+        """Последняя сохраненная позиция списка (URL страницы)"""
+        return self._get_meta('last_page_url')
+
+    def is_processed(self, app_id: int) -> bool:
+        """Проверка по первичному ключу, без загрузки всей истории в память"""
+        if app_id in self._pending:
+            return True
+        return self.conn.execute("SELECT 1 FROM processed WHERE app_id = ?", (app_id,)).fetchone() is not None
+
+    def load_processed_set(self, app_ids) -> bool:
+        """
+        Загружает сохраненное множество обработанных app_id одним чтением из meta.
+        True, если оно покрывает весь журнал; иначе (сбой до сохранения, другой вид множества)
+        промахи нужно сверять с is_processed
+        """
+        if not self.total_processed:
+            return True
+        params, bits = self._get_meta('processed_set'), self._get_meta('processed_set_bits')
+        if params is None or bits is None or not restore_app_id_set(app_ids, params, bits):
+            return False
+        return self._get_meta('processed_set_total') == str(self.total_processed)
+
+    def save_processed_set(self, app_ids, complete: bool) -> bool:
+        """
+        Сохраняет множество обработанных app_id (записывается при flush).
+        Неполное множество один раз дополняется из журнала, чтобы следующий запуск загрузил его целиком
+        """
+        if not complete:
+            app_ids.update(self.processed_app_ids())
+        params, bits = dump_app_id_set(app_ids)
+        self._pending_meta['processed_set'] = params
+        self._pending_meta['processed_set_bits'] = bits
+        self.flush()
+        return True
+
+    def processed_app_ids(self) -> Iterator[int]:
+        """Все обработанные app_id (потоково)"""
+        self.flush()
+        for (app_id,) in self.conn.execute("SELECT app_id FROM processed"):
+            yield app_id
+
+    def mark_processed(self, app_id: int, url: str = ''):
+        """Добавляет app_id в журнал и убирает из фронтира (запись на диск - пачкой)"""
+        if app_id in self._pending:
+            return
+        self._pending[app_id] = (url, time.time())
+        self._frontier_done.add(app_id)
+        self._maybe_flush()
+
+    def add_to_frontier(self, app_id: int, url: str, game: Dict):
+        """Запоминает найденную в списке игру вместе с данными карточки (цены, картинка)"""
+        if app_id in self._pending_frontier:
+            return
+        self._pending_frontier[app_id] = (url, json.dumps(game, ensure_ascii=False, default=str), time.time())
+        self._maybe_flush()
+
+    def drop_from_frontier(self, app_id: int):
+        """Убирает игру из фронтира без отметки об обработке (например, после ошибки)"""
+        self._frontier_done.add(app_id)
+        self._maybe_flush()
+
+    def frontier_size(self) -> int:
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    def load_frontier(self, limit: Optional[int] = None) -> List[Tuple[Dict, str]]:
+        """Необработанные игры фронтира в порядке обнаружения: [(game, url)]"""
+        self.flush()
+        rows = self.conn.execute(
+            "SELECT url, data FROM frontier ORDER BY added_at LIMIT ?",
+            (limit if limit is not None else -1,)
+        )
+        return [(json.loads(data), url) for url, data in rows]
+
+    def set_cursor(self, page_url: str):
+        """Запоминает позицию списка"""
+        self._pending_meta['last_page_url'] = page_url
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._pending) >= self.batch_size or time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Записывает накопленные изменения одной транзакцией"""
+        if not (self._pending or self._pending_meta or self._pending_frontier or self._frontier_done):
+            return
+
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO processed (app_id, url, processed_at) VALUES (?, ?, ?)",
+                [(app_id, url, ts) for app_id, (url, ts) in self._pending.items()]
+            )
+            self.total_processed += max(cursor.rowcount, 0)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (app_id, url, data, added_at) VALUES (?, ?, ?, ?)",
+                [(app_id, url, data, ts) for app_id, (url, data, ts) in self._pending_frontier.items()]
+            )
+            self.conn.executemany(
+                "DELETE FROM frontier WHERE app_id = ?",
+                [(app_id,) for app_id in self._frontier_done]
+            )
+            self._pending_meta['total_processed'] = str(self.total_processed)
+            if 'processed_set_bits' in self._pending_meta:
+                self._pending_meta['processed_set_total'] = str(self.total_processed)
+            self.conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                list(self._pending_meta.items())
+            )
+
+        self._pending.clear()
+        self._pending_meta.clear()
+        self._pending_frontier.clear()
+        self._frontier_done.clear()
+        self._last_flush = time.time()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def clear_progress(path: str = CHECKPOINT_PATH):
     """Очищает прогресс"""
-    if os.path.exists('progress.json'):
-        os.remove('progress.json')
-    print("🧹 Прогресс очищен")
\ No newline at end of file
+    for file_path in (path, f"{path}-wal", f"{path}-shm", LEGACY_PROGRESS_PATH):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    print("🧹 Прогресс очищен")
@@ -0,0 +1,19 @@
+"""
+Разбор URL магазина Steam, общий для парсера, чекпоинта и базы.
+Один и тот же app_id должен получаться из ссылки карточки списка, страницы игры и записи в базе
+"""
+import re
+from typing import Optional
+
+# app_id за /app/: дальше конец ссылки, путь, параметры или якорь
+# (/app/620, /app/620/Portal_2/, /app/620?snr=...), но не /app/620abc
+APP_ID_PATTERN = re.compile(r'/app/(\d+)(?=[/?#]|$)')
+
+
+def extract_app_id(url: Optional[str]) -> Optional[int]:
+    """
+    app_id из URL игры Steam
+    Пример: https://store.steampowered.com/app/123456/Game_Name/ -> 123456; None, если это не страница игры
+    """
+    match = APP_ID_PATTERN.search(url or '')
+    return int(match.group(1)) if match else None